@@ -1,14 +1,58 @@
 import os
+from celery.schedules import crontab
 from flask import Flask
 from config import config
-from app.extensions import db, migrate, bcrypt, jwt, cors, csrf, limiter
+from app.extensions import db, migrate, bcrypt, jwt, cors, csrf, limiter, celery
 
-def create_app(config_name=None):
+def init_celery(app):
+    celery.conf.update(
+        broker_url=app.config['CELERY_BROKER_URL'],
+        result_backend=app.config['CELERY_RESULT_BACKEND'],
+        task_always_eager=app.config.get('CELERY_TASK_ALWAYS_EAGER', False),
+        include=['app.tasks.ocr', 'app.tasks.inventory', 'app.tasks.invoices', 'app.tasks.social', 'app.tasks.clients', 'app.tasks.dashboard'],
+        beat_schedule={
+            'inventory.scan-low-stock': {
+                'task': 'inventory.scan_low_stock',
+                'schedule': app.config['LOW_STOCK_SCAN_INTERVAL']
+            },
+            'inventory.snapshot-stock': {
+                'task': 'inventory.snapshot_stock',
+                'schedule': crontab(hour=0, minute=15)
+            },
+            'invoices.mark-overdue': {
+                'task': 'invoices.mark_overdue',
+                'schedule': app.config['OVERDUE_SWEEP_INTERVAL']
+            },
+            'dashboard.reconcile-stats': {
+                'task': 'dashboard.reconcile_stats',
+                'schedule': app.config['DASHBOARD_RECONCILE_INTERVAL']
+            },
+            'ocr.requeue-stale-receipts': {
+                'task': 'ocr.requeue_stale_receipts',
+                'schedule': app.config['OCR_REQUEUE_INTERVAL']
+            },
+            'social.dispatch-due-posts': {
+                'task': 'social.dispatch_due_posts',
+                'schedule': app.config['SOCIAL_DISPATCH_INTERVAL']
+            }
+        }
+    )
+    
+    class ContextTask(celery.Task):
+        def __call__(self, *args, **kwargs):
+            with app.app_context():
+                return self.run(*args, **kwargs)
+    
+    celery.Task = ContextTask
+
+def create_app(config_name=None, config_overrides=None):
     if config_name is None:
         config_name = os.environ.get('FLASK_ENV', 'default')
         
     app = Flask(__name__)
     app.config.from_object(config[config_name])
+    if config_overrides:
+        app.config.update(config_overrides)
     
     # Initialize extensions
     db.init_app(app)
@@ -18,6 +62,7 @@ def create_app(config_name=None):
     cors.init_app(app)
     csrf.init_app(app)
     limiter.init_app(app)
+    init_celery(app)
     
     # Register blueprints
     from app.blueprints.auth import auth_bp
@@ -28,6 +73,8 @@ def create_app(config_name=None):
     from app.blueprints.reports import reports_bp
     from app.blueprints.social import social_bp
     from app.blueprints.dashboard import dashboard_bp
+    from app.blueprints.search import search_bp
+    from app.blueprints.company import company_bp
     
     app.register_blueprint(auth_bp, url_prefix='/api/v1/auth')
     app.register_blueprint(portal_bp, url_prefix='/api/v1/portal')
@@ -37,9 +84,22 @@ def create_app(config_name=None):
     app.register_blueprint(reports_bp, url_prefix='/api/v1/reports')
     app.register_blueprint(social_bp, url_prefix='/api/v1/social')
     app.register_blueprint(dashboard_bp, url_prefix='/api/v1/dashboard')
+    app.register_blueprint(search_bp, url_prefix='/api/v1/search')
+    app.register_blueprint(company_bp, url_prefix='/api/v1/company')
+    
+    from app.services.passwords import password_hasher, PasswordHasherBusy
+    
+    @app.errorhandler(429)
+    def rate_limit_exceeded(e):
+        # Retry-After and X-RateLimit-* headers are added by the limiter
+        return {'message': f'Rate limit exceeded: {e.description}'}, 429
+    
+    @app.errorhandler(PasswordHasherBusy)
+    def password_hasher_busy(e):
+        return {'message': 'Too many login attempts in progress, please retry'}, 503, {'Retry-After': '1'}
     
     @app.route('/health')
     def health_check():
-        return {'status': 'healthy'}, 200
+        return {'status': 'healthy', 'password_hashing': password_hasher.stats()}, 200
         
     return app
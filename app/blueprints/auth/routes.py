@@ -1,8 +1,11 @@
 from flask import request, jsonify
-from flask_jwt_extended import jwt_required, get_jwt_identity, create_access_token
-from app.extensions import db
+from flask_jwt_extended import jwt_required, create_access_token
+from app.extensions import db, limiter
 from app.models.user import User
 from app.models.company import Company
+from app.services.passwords import password_hasher
+from app.utils.security import get_current_principal
+from app.utils.rate_limits import configured, login_email_key
 from . import auth_bp
 
 @auth_bp.route('/register', methods=['POST'])
@@ -48,6 +51,8 @@ def register():
     }), 201
 
 @auth_bp.route('/login', methods=['POST'])
+@limiter.limit(configured('RATE_LIMIT_LOGIN'))
+@limiter.limit(configured('RATE_LIMIT_LOGIN_EMAIL'), key_func=login_email_key, deduct_when=lambda response: response.status_code == 401)
 def login():
     data = request.get_json()
     
@@ -57,6 +62,11 @@ def login():
         if user.status != 'active':
             return jsonify({"message": "Account is not active"}), 403
             
+        # Upgrade hashes made with an older cost factor while we have the plaintext
+        if password_hasher.needs_rehash(user.password_hash):
+            user.set_password(data.get('password'))
+            db.session.commit()
+            
         tokens = user.get_tokens()
         return jsonify({
             "message": "Login successful",
@@ -74,8 +84,7 @@ def login():
 @auth_bp.route('/me', methods=['GET'])
 @jwt_required()
 def me():
-    user_id = get_jwt_identity()
-    user = User.query.get(user_id)
+    user = get_current_principal().user
     return jsonify({
         "id": user.id,
         "email": user.email,
@@ -1,50 +1,109 @@
-from flask import request, jsonify
-from flask_jwt_extended import jwt_required, get_jwt_identity
-from app.extensions import db
-from app.models.booking import Service, Booking, Availability
-from app.utils.security import require_permission
+from datetime import date, datetime, timedelta, timezone
+from flask import request, jsonify, current_app
+from flask_jwt_extended import jwt_required
+from sqlalchemy.exc import OperationalError
+from app.extensions import db, limiter
+from app.models.booking import Service, Booking
+from app.utils.security import require_permission, require_module, get_current_principal
+from app.utils.pagination import paginate
+from app.utils.export import stream_export
+from app.utils.rate_limits import configured
+from app.services.slots import slot_engine
+from app.services.bookings import reserve_booking, SlotUnavailable, StaffNotFound
+from app.services.response_cache import response_cache
 from . import bookings_bp
 
 @bookings_bp.route('/services', methods=['GET'])
+@limiter.exempt # Anonymous widget traffic; skips evaluating limits on the cached path
+@require_module('bookings', public=True)
+@response_cache.cached('services')
 def get_services():
     company_id = request.args.get('company_id')
-    services = Service.query.filter_by(company_id=company_id, is_active=True).all()
-    return jsonify([{
-        "id": s.id,
-        "name": s.name,
-        "description": s.description,
-        "duration": s.duration,
-        "price": str(s.price)
-    } for s in services]), 200
+    services = Service.query.filter_by(company_id=company_id, is_active=True)
+    return jsonify(paginate(services, {
+        "id": Service.id,
+        "name": Service.name,
+        "description": Service.description,
+        "duration": Service.duration,
+        "price": Service.price
+    }, keyset=[Service.id])), 200
+
+@bookings_bp.route('/slots', methods=['GET'])
+@require_module('bookings', public=True)
+def get_slots():
+    company_id = request.args.get('company_id', type=int)
+    service_id = request.args.get('service_id', type=int)
+    service = Service.query.filter_by(id=service_id, company_id=company_id, is_active=True).first()
+    if not service:
+        return jsonify({"message": "Service not found"}), 404
+        
+    try:
+        start = date.fromisoformat(request.args['start'])
+        end = date.fromisoformat(request.args['end']) if 'end' in request.args else start + timedelta(days=6)
+    except (KeyError, ValueError):
+        return jsonify({"message": "start (and optional end) must be YYYY-MM-DD dates"}), 400
+    if end < start or (end - start).days >= current_app.config['SLOT_MAX_RANGE_DAYS']:
+        return jsonify({"message": "Invalid date range"}), 400
+        
+    slots = slot_engine.find_slots(company_id, service, start, end, staff_id=request.args.get('staff_id', type=int))
+    return jsonify({
+        "service_id": service.id,
+        "duration": service.duration,
+        "slots": [{
+            "staff_id": staff_id,
+            "times": [t.isoformat() for t in times]
+        } for staff_id, times in slots.items()]
+    }), 200
 
 @bookings_bp.route('/book', methods=['POST'])
+@limiter.limit(configured('RATE_LIMIT_BOOKING'))
+@require_module('bookings', public=True)
 def create_booking():
     data = request.get_json()
+    
+    try:
+        booking_time = datetime.fromisoformat(data['booking_time'])
+    except (KeyError, TypeError, ValueError):
+        return jsonify({"message": "booking_time must be an ISO 8601 datetime"}), 400
+    if booking_time.tzinfo:
+        booking_time = booking_time.astimezone(timezone.utc).replace(tzinfo=None)
+        
+    service = Service.query.filter_by(id=data['service_id'], company_id=data['company_id'], is_active=True).first()
+    if not service:
+        return jsonify({"message": "Service not found"}), 404
+    if not isinstance(data.get('staff_id'), int) or isinstance(data['staff_id'], bool):
+        return jsonify({"message": "staff_id must be an integer"}), 400
+        
     # Simple guest booking for now
-    booking = Booking(
-        company_id=data['company_id'],
-        service_id=data['service_id'],
-        staff_id=data['staff_id'],
-        booking_time=data['booking_time'],
-        client_name=data['client_name'],
-        client_email=data['client_email'],
-        status='pending'
-    )
-    db.session.add(booking)
-    db.session.commit()
+    try:
+        booking = reserve_booking(
+            service,
+            data['staff_id'],
+            booking_time,
+            client_name=data['client_name'],
+            client_email=data['client_email']
+        )
+    except StaffNotFound:
+        return jsonify({"message": "Staff member not found"}), 404
+    except SlotUnavailable:
+        return jsonify({"message": "This time slot is no longer available"}), 409
+    except OperationalError:
+        # Lock wait timed out behind other bookings for the same staff member
+        db.session.rollback()
+        return jsonify({"message": "This time slot is no longer available"}), 409
+        
     return jsonify({"message": "Booking request received", "id": booking.id}), 201
 
 @bookings_bp.route('/staff/services', methods=['POST'])
 @jwt_required()
+@require_module('bookings')
 @require_permission('bookings.manage')
 def create_service():
-    from app.models.user import User
-    user_id = get_jwt_identity()
-    user = User.query.get(user_id)
+    principal = get_current_principal()
     data = request.get_json()
     
     service = Service(
-        company_id=user.company_id,
+        company_id=principal.company_id,
         name=data['name'],
         description=data.get('description'),
         duration=data['duration'],
@@ -53,3 +112,23 @@ def create_service():
     db.session.add(service)
     db.session.commit()
     return jsonify({"message": "Service created", "id": service.id}), 201
+
+@bookings_bp.route('/staff/bookings/export', methods=['GET'])
+@jwt_required()
+@require_module('bookings')
+@require_permission('bookings.export')
+def export_bookings():
+    principal = get_current_principal()
+    bookings = Booking.query.filter_by(company_id=principal.company_id).order_by(Booking.id)
+    return stream_export(bookings, {
+        "id": Booking.id,
+        "service_id": Booking.service_id,
+        "staff_id": Booking.staff_id,
+        "client_id": Booking.client_id,
+        "booking_time": Booking.booking_time,
+        "status": Booking.status,
+        "client_name": Booking.client_name,
+        "client_email": Booking.client_email,
+        "client_phone": Booking.client_phone,
+        "created_at": Booking.created_at
+    }, filename='bookings')
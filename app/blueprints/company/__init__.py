@@ -0,0 +1,5 @@
+from flask import Blueprint
+
+company_bp = Blueprint('company', __name__)
+
+from . import routes
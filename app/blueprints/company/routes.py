@@ -0,0 +1,33 @@
+from flask import request, jsonify
+from flask_jwt_extended import jwt_required
+from app.extensions import db
+from app.models.company import Company
+from app.services.company_settings import module_flags, update_modules
+from app.utils.security import require_permission, get_current_principal
+from . import company_bp
+
+@company_bp.route('/modules', methods=['GET'])
+@jwt_required()
+def get_modules():
+    principal = get_current_principal()
+    company = db.session.get(Company, principal.company_id)
+    return jsonify(module_flags(company)), 200
+
+@company_bp.route('/modules', methods=['PATCH'])
+@jwt_required()
+@require_permission('company.manage')
+def update_company_modules():
+    principal = get_current_principal()
+    data = request.get_json(silent=True)
+    if not isinstance(data, dict) or not data:
+        return jsonify({"message": "Expected an object of module names to true or false"}), 400
+        
+    company = db.session.get(Company, principal.company_id)
+    try:
+        update_modules(company, data)
+    except ValueError as e:
+        return jsonify({"message": str(e)}), 400
+    # Committing drops the cached flags in every worker
+    db.session.commit()
+    
+    return jsonify(module_flags(company)), 200
@@ -1,53 +1,173 @@
-from flask import request, jsonify
-from flask_jwt_extended import jwt_required, get_jwt_identity
-from app.extensions import db
-from app.models.inventory import Product, Category, StockMovement
-from app.utils.security import require_permission
+from datetime import datetime, timezone
+from decimal import Decimal
+from flask import request, jsonify, current_app
+from flask_jwt_extended import jwt_required
+from app.models.inventory import Product, StockMovement
+from app.utils.security import require_permission, require_module, get_current_principal
+from app.utils.pagination import paginate
+from app.utils.export import stream_export
+from app.services.stock_snapshots import stock_as_of
+from app.services.stock import apply_stock_changes, parse_movements, parse_prevent_negative, low_stock_query, ProductNotFound, InsufficientStock
 from . import inventory_bp
 
 @inventory_bp.route('/products', methods=['GET'])
 @jwt_required()
+@require_module('inventory')
 def get_products():
-    from app.models.user import User
-    user_id = get_jwt_identity()
-    user = User.query.get(user_id)
-    products = Product.query.filter_by(company_id=user.company_id).all()
-    return jsonify([{
-        "id": p.id,
-        "name": p.name,
-        "sku": p.sku,
-        "stock": str(p.current_stock),
-        "price": str(p.unit_price)
-    } for p in products]), 200
+    principal = get_current_principal()
+    products = Product.query.filter_by(company_id=principal.company_id)
+    return jsonify(paginate(products, {
+        "id": Product.id,
+        "name": Product.name,
+        "sku": Product.sku,
+        "stock": Product.current_stock,
+        "price": Product.unit_price
+    }, keyset=[Product.id])), 200
+
+@inventory_bp.route('/products/low-stock', methods=['GET'])
+@jwt_required()
+@require_module('inventory')
+def get_low_stock_products():
+    principal = get_current_principal()
+    products = low_stock_query(principal.company_id).order_by(None)
+    return jsonify(paginate(products, {
+        "id": Product.id,
+        "name": Product.name,
+        "sku": Product.sku,
+        "stock": Product.current_stock,
+        "min_stock_level": Product.min_stock_level
+    }, keyset=[Product.id])), 200
 
 @inventory_bp.route('/stock/update', methods=['POST'])
 @jwt_required()
+@require_module('inventory')
 @require_permission('inventory.manage')
 def update_stock():
     data = request.get_json()
-    product = Product.query.get(data['product_id'])
+    principal = get_current_principal()
     
-    if not product:
+    try:
+        movements = parse_movements([data])
+        new_stock = apply_stock_changes(
+            principal.company_id,
+            principal.user_id,
+            movements,
+            prevent_negative=parse_prevent_negative(data)
+        )
+    except ValueError as e:
+        return jsonify({"message": str(e)}), 400
+    except ProductNotFound:
         return jsonify({"message": "Product not found"}), 404
+    except InsufficientStock:
+        return jsonify({"message": "Insufficient stock"}), 409
         
-    from app.models.user import User
-    user_id = get_jwt_identity()
-    user = User.query.get(user_id)
-    
-    # Update current stock
-    product.current_stock += data['change_amount']
-    
-    # Record movement
-    movement = StockMovement(
-        product_id=product.id,
-        user_id=user.id,
-        change_amount=data['change_amount'],
-        reason=data.get('reason', 'Manual Update')
-    )
-    db.session.add(movement)
-    db.session.commit()
+    return jsonify({
+        "message": "Stock updated successfully",
+        "new_stock": str(new_stock[movements[0][0]])
+    }), 200
+
+@inventory_bp.route('/stock/bulk-update', methods=['POST'])
+@jwt_required()
+@require_module('inventory')
+@require_permission('inventory.manage')
+def bulk_update_stock():
+    data = request.get_json()
+    items = data.get('movements') or []
+    if not items:
+        return jsonify({"message": "No movements given"}), 400
+    if len(items) > current_app.config['STOCK_BULK_MAX_MOVEMENTS']:
+        return jsonify({"message": "Too many movements in one request"}), 400
+        
+    principal = get_current_principal()
     
+    # All movements land in one transaction; any failure rolls back the whole batch
+    try:
+        new_stock = apply_stock_changes(
+            principal.company_id,
+            principal.user_id,
+            parse_movements(items),
+            prevent_negative=parse_prevent_negative(data)
+        )
+    except ValueError as e:
+        return jsonify({"message": str(e)}), 400
+    except ProductNotFound as e:
+        return jsonify({"message": "Products not found", "product_ids": e.product_ids}), 404
+    except InsufficientStock as e:
+        return jsonify({"message": "Insufficient stock", "product_id": e.product_id}), 409
+        
     return jsonify({
         "message": "Stock updated successfully",
-        "new_stock": str(product.current_stock)
+        "movements": len(items),
+        "new_stock": {str(product_id): str(stock) for product_id, stock in new_stock.items()}
+    }), 200
+
+@inventory_bp.route('/products/export', methods=['GET'])
+@jwt_required()
+@require_module('inventory')
+@require_permission('inventory.export')
+def export_products():
+    principal = get_current_principal()
+    products = Product.query.filter_by(company_id=principal.company_id).order_by(Product.id)
+    return stream_export(products, {
+        "id": Product.id,
+        "name": Product.name,
+        "sku": Product.sku,
+        "category_id": Product.category_id,
+        "unit_price": Product.unit_price,
+        "current_stock": Product.current_stock,
+        "min_stock_level": Product.min_stock_level,
+        "is_active": Product.is_active
+    }, filename='products')
+
+@inventory_bp.route('/stock/movements/export', methods=['GET'])
+@jwt_required()
+@require_module('inventory')
+@require_permission('inventory.export')
+def export_stock_movements():
+    principal = get_current_principal()
+    movements = StockMovement.query.join(Product).filter(Product.company_id == principal.company_id).order_by(StockMovement.id)
+    return stream_export(movements, {
+        "id": StockMovement.id,
+        "product_id": StockMovement.product_id,
+        "sku": Product.sku,
+        "user_id": StockMovement.user_id,
+        "change_amount": StockMovement.change_amount,
+        "reason": StockMovement.reason,
+        "created_at": StockMovement.created_at
+    }, filename='stock_movements')
+
+@inventory_bp.route('/valuation', methods=['GET'])
+@jwt_required()
+@require_module('inventory')
+@require_permission('inventory.valuation')
+def get_valuation():
+    principal = get_current_principal()
+    as_of = request.args.get('as_of')
+    
+    try:
+        as_of = datetime.fromisoformat(as_of) if as_of else datetime.utcnow()
+    except ValueError:
+        return jsonify({"message": "as_of must be an ISO 8601 datetime"}), 400
+    if as_of.tzinfo:
+        as_of = as_of.astimezone(timezone.utc).replace(tzinfo=None)
+        
+    # Valued at current unit prices; the catalog keeps no price history
+    items = []
+    total = Decimal('0.00')
+    for product, stock in stock_as_of(principal.company_id, as_of):
+        value = (stock * product.unit_price).quantize(Decimal('0.01'))
+        total += value
+        items.append({
+            "product_id": product.id,
+            "sku": product.sku,
+            "name": product.name,
+            "stock": str(stock),
+            "unit_price": str(product.unit_price),
+            "value": str(value)
+        })
+        
+    return jsonify({
+        "as_of": as_of.isoformat(),
+        "items": items,
+        "total_value": str(total)
     }), 200
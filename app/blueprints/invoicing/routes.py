@@ -1,54 +1,221 @@
-from flask import request, jsonify
-from flask_jwt_extended import jwt_required, get_jwt_identity
-from app.extensions import db
-from app.models.invoice import Invoice, Receipt
-from app.services.ai_ocr import ocr_service
-from app.utils.security import require_permission
+import os
+import uuid
+from datetime import datetime, timedelta, timezone
+from decimal import Decimal, InvalidOperation, ROUND_HALF_UP
+from flask import request, jsonify, current_app, send_file
+from werkzeug.utils import secure_filename
+from flask_jwt_extended import jwt_required
+from app.extensions import db, limiter
+from app.models.invoice import Invoice, InvoiceItem, Receipt
+from app.models.client import Client
+from app.services.ocr_cache import ocr_cache, save_and_hash
+from app.services.invoice_totals import recompute_invoices, CENT
+from app.services.invoice_numbers import allocate_invoice_numbers
+from app.services.invoice_pdf import cached_pdf, render_queue
+from app.tasks.ocr import enqueue_receipts, apply_ocr_result
+from app.tasks.invoices import render_invoice_pdfs
+from app.utils.security import require_permission, require_module, get_current_principal
+from app.utils.pagination import paginate
+from app.utils.export import stream_export
+from app.utils.rate_limits import configured, tenant_key, no_tenant, receipt_files
 from . import invoicing_bp
 
 @invoicing_bp.route('/invoices', methods=['GET'])
 @jwt_required()
+@require_module('invoicing')
 def get_invoices():
-    from app.models.user import User
-    user_id = get_jwt_identity()
-    user = User.query.get(user_id)
-    invoices = Invoice.query.filter_by(company_id=user.company_id).all()
-    return jsonify([{
-        "id": i.id,
-        "invoice_number": i.invoice_number,
-        "status": i.status,
-        "total_amount": str(i.total_amount)
-    } for i in invoices]), 200
+    principal = get_current_principal()
+    invoices = Invoice.query.filter_by(company_id=principal.company_id)
+    return jsonify(paginate(invoices, {
+        "id": Invoice.id,
+        "invoice_number": Invoice.invoice_number,
+        "status": Invoice.status,
+        "total_amount": Invoice.total_amount
+    }, keyset=[Invoice.id])), 200
+
+@invoicing_bp.route('/invoices', methods=['POST'])
+@jwt_required()
+@require_module('invoicing')
+@require_permission('invoicing.manage')
+def create_invoice():
+    data = request.get_json() or {}
+    principal = get_current_principal()
+    
+    try:
+        items = [InvoiceItem(
+            description=item['description'],
+            quantity=Decimal(str(item.get('quantity', 1))).quantize(CENT, rounding=ROUND_HALF_UP),
+            unit_price=Decimal(str(item['unit_price'])).quantize(CENT, rounding=ROUND_HALF_UP)
+        ) for item in data.get('items') or []]
+        tax_rate = Decimal(str(data.get('tax_rate') or 0))
+        due_date = datetime.fromisoformat(data['due_date']) if data.get('due_date') else None
+    except (KeyError, TypeError, ValueError, InvalidOperation):
+        return jsonify({"message": "Invalid invoice data"}), 400
+    if due_date and due_date.tzinfo:
+        due_date = due_date.astimezone(timezone.utc).replace(tzinfo=None)
+        
+    client_id = data.get('client_id')
+    if client_id and not Client.query.filter_by(id=client_id, company_id=principal.company_id).first():
+        return jsonify({"message": "Client not found"}), 404
+        
+    # Numbered inside this transaction, so a failed insert doesn't leave a gap
+    invoice = Invoice(
+        company_id=principal.company_id,
+        client_id=client_id,
+        invoice_number=allocate_invoice_numbers(principal.company_id)[0],
+        status='draft',
+        due_date=due_date,
+        tax_rate=tax_rate,
+        notes=data.get('notes'),
+        items=items
+    )
+    db.session.add(invoice)
+    db.session.commit()
+    
+    return jsonify({
+        "id": invoice.id,
+        "invoice_number": invoice.invoice_number,
+        "tax_amount": str(invoice.tax_amount),
+        "total_amount": str(invoice.total_amount)
+    }), 201
+
+@invoicing_bp.route('/invoices/recompute-totals', methods=['POST'])
+@jwt_required()
+@require_module('invoicing')
+@require_permission('invoicing.manage')
+def recompute_invoice_totals():
+    principal = get_current_principal()
+    changed = recompute_invoices(principal.company_id)
+    return jsonify({"message": "Invoice totals recomputed", "changed": changed}), 200
+
+@invoicing_bp.route('/invoices/<int:invoice_id>/pdf', methods=['GET'])
+@jwt_required()
+@require_module('invoicing')
+def get_invoice_pdf(invoice_id):
+    principal = get_current_principal()
+    invoice = Invoice.query.filter_by(id=invoice_id, company_id=principal.company_id).first()
+    
+    if not invoice:
+        return jsonify({"message": "Invoice not found"}), 404
+        
+    path, digest = cached_pdf(invoice)
+    if path is None:
+        # Rendering happens on the workers; the client retries until the PDF is ready
+        if render_queue.claim(invoice.id, digest):
+            render_invoice_pdfs.delay([invoice.id])
+        path, digest = cached_pdf(invoice, digest)
+        if path is None:
+            return jsonify({"message": "PDF is being rendered"}), 202, {'Retry-After': '2'}
+            
+    # The file name carries the content hash, so the hash is a strong ETag
+    return send_file(
+        path,
+        mimetype='application/pdf',
+        download_name=f"invoice-{secure_filename(invoice.invoice_number) or invoice.id}.pdf",
+        etag=digest,
+        conditional=True
+    )
 
 @invoicing_bp.route('/receipts/scan', methods=['POST'])
+# Each uploaded file counts against the company's OCR budget
+@limiter.limit(configured('RATE_LIMIT_RECEIPT_SCAN'), key_func=tenant_key, exempt_when=no_tenant, cost=receipt_files)
 @jwt_required()
+@require_module('invoicing')
 @require_permission('invoicing.scan')
 def scan_receipt():
-    # Placeholder for file upload handling
-    # file = request.files['receipt']
-    # path = save_file(file)
+    files = request.files.getlist('receipt') + request.files.getlist('receipts')
+    if not files:
+        return jsonify({"message": "No receipt files uploaded"}), 400
+    if len(files) > current_app.config['OCR_MAX_UPLOAD_FILES']:
+        return jsonify({"message": "Too many files in one upload"}), 400
+        
+    principal = get_current_principal()
+    upload_dir = os.path.join(current_app.config['RECEIPT_UPLOAD_DIR'], str(principal.company_id))
+    os.makedirs(upload_dir, exist_ok=True)
     
-    path = "placeholder/path/to/receipt.jpg"
-    data = ocr_service.scan_receipt(path)
+    # Receipts whose job never runs are picked up again by the stale sweep
+    lease_until = datetime.utcnow() + timedelta(seconds=current_app.config['OCR_CLAIM_LEASE'])
+    receipts = []
+    for file in files:
+        path = os.path.join(upload_dir, f"{uuid.uuid4().hex}_{secure_filename(file.filename)}")
+        content_hash = save_and_hash(file, path)
+        receipt = Receipt(
+            company_id=principal.company_id,
+            user_id=principal.user_id,
+            file_path=path,
+            content_hash=content_hash,
+            ocr_status='pending',
+            ocr_lease_until=lease_until
+        )
+        
+        # Re-uploads of a file we've already scanned are answered from the cache
+        cached = ocr_cache.get(principal.company_id, content_hash)
+        if cached is not None:
+            apply_ocr_result(receipt, cached)
+        receipts.append(receipt)
+    db.session.add_all(receipts)
+    db.session.commit()
     
-    from app.models.user import User
-    user_id = get_jwt_identity()
-    user = User.query.get(user_id)
+    # OCR runs on the Celery workers; clients poll /receipts/<id> for the result
+    enqueue_receipts([r.id for r in receipts if r.ocr_status == 'pending'])
     
-    receipt = Receipt(
-        company_id=user.company_id,
-        user_id=user.id,
-        file_path=path,
-        vendor_name=data['vendor_name'],
-        total_amount=data['total_amount'],
-        currency=data['currency'],
-        ocr_status='completed',
-        raw_ocr_data=data
-    )
-    db.session.add(receipt)
-    db.session.commit()
+    return jsonify({
+        "message": "Receipts queued for scanning",
+        "receipts": [{"id": r.id, "ocr_status": r.ocr_status} for r in receipts]
+    }), 202
+
+@invoicing_bp.route('/receipts/<int:receipt_id>', methods=['GET'])
+@jwt_required()
+@require_module('invoicing')
+def get_receipt(receipt_id):
+    principal = get_current_principal()
+    receipt = Receipt.query.filter_by(id=receipt_id, company_id=principal.company_id).first()
     
+    if not receipt:
+        return jsonify({"message": "Receipt not found"}), 404
+        
     return jsonify({
-        "message": "Receipt scanned successfully",
-        "data": data
-    }), 201
+        "id": receipt.id,
+        "ocr_status": receipt.ocr_status,
+        "vendor_name": receipt.vendor_name,
+        "date": receipt.date.isoformat() if receipt.date else None,
+        "total_amount": str(receipt.total_amount) if receipt.total_amount is not None else None,
+        "currency": receipt.currency,
+        "data": receipt.raw_ocr_data
+    }), 200
+
+@invoicing_bp.route('/invoices/export', methods=['GET'])
+@jwt_required()
+@require_module('invoicing')
+@require_permission('invoicing.export')
+def export_invoices():
+    principal = get_current_principal()
+    invoices = Invoice.query.filter_by(company_id=principal.company_id).order_by(Invoice.id)
+    return stream_export(invoices, {
+        "id": Invoice.id,
+        "invoice_number": Invoice.invoice_number,
+        "client_id": Invoice.client_id,
+        "status": Invoice.status,
+        "due_date": Invoice.due_date,
+        "tax_rate": Invoice.tax_rate,
+        "total_amount": Invoice.total_amount,
+        "tax_amount": Invoice.tax_amount,
+        "created_at": Invoice.created_at
+    }, filename='invoices')
+
+@invoicing_bp.route('/invoice-items/export', methods=['GET'])
+@jwt_required()
+@require_module('invoicing')
+@require_permission('invoicing.export')
+def export_invoice_items():
+    principal = get_current_principal()
+    items = InvoiceItem.query.join(Invoice).filter(Invoice.company_id == principal.company_id).order_by(InvoiceItem.id)
+    return stream_export(items, {
+        "id": InvoiceItem.id,
+        "invoice_id": InvoiceItem.invoice_id,
+        "invoice_number": Invoice.invoice_number,
+        "description": InvoiceItem.description,
+        "quantity": InvoiceItem.quantity,
+        "unit_price": InvoiceItem.unit_price,
+        "total_price": InvoiceItem.total_price
+    }, filename='invoice_items')
@@ -1,10 +1,21 @@
-from flask import request, jsonify
+import os
+import uuid
+from flask import current_app, request, jsonify
 from flask_jwt_extended import jwt_required, get_jwt_identity
-from app.extensions import db
-from app.models.client import Client, ProjectUpdate, File
+from werkzeug.utils import secure_filename
+from app.extensions import db, limiter
+from app.models.client import Client, ClientImport, ProjectUpdate
+from app.utils.pagination import paginate
+from app.services.passwords import password_hasher
+from app.services.client_import import detect_format, import_progress
+from app.tasks.clients import import_clients
+from app.utils.rate_limits import configured, login_email_key
+from app.utils.security import check_module, require_module
 from . import portal_bp
 
 @portal_bp.route('/login', methods=['POST'])
+@limiter.limit(configured('RATE_LIMIT_LOGIN'))
+@limiter.limit(configured('RATE_LIMIT_LOGIN_EMAIL'), key_func=login_email_key, deduct_when=lambda response: response.status_code == 401)
 def login():
     data = request.get_json()
     client = Client.query.filter_by(email=data.get('email')).first()
@@ -12,6 +23,11 @@ def login():
     if client and client.check_password(data.get('password')):
         if client.status != 'active':
             return jsonify({"message": "Client account is deactivated"}), 403
+        check_module(client.company_id, 'client_portal')
+            
+        if password_hasher.needs_rehash(client.password_hash):
+            client.set_password(data.get('password'))
+            db.session.commit()
             
         return jsonify({
             "tokens": client.get_tokens(),
@@ -22,6 +38,7 @@ def login():
 
 @portal_bp.route('/me', methods=['GET'])
 @jwt_required()
+@require_module('client_portal')
 def me():
     client_id = get_jwt_identity()
     client = Client.query.get(client_id)
@@ -34,69 +51,116 @@ def me():
 
 @portal_bp.route('/updates', methods=['GET'])
 @jwt_required()
+@require_module('client_portal')
 def get_updates():
     client_id = get_jwt_identity()
-    updates = ProjectUpdate.query.filter_by(client_id=client_id).order_by(ProjectUpdate.created_at.desc()).all()
-    return jsonify([{
-        "id": u.id,
-        "title": u.title,
-        "content": u.content,
-        "status": u.status,
-        "created_at": u.created_at
-    } for u in updates]), 200
+    updates = ProjectUpdate.query.filter_by(client_id=client_id)
+    return jsonify(paginate(updates, {
+        "id": ProjectUpdate.id,
+        "title": ProjectUpdate.title,
+        "content": ProjectUpdate.content,
+        "status": ProjectUpdate.status,
+        "created_at": ProjectUpdate.created_at
+    }, keyset=[ProjectUpdate.created_at, ProjectUpdate.id], descending=True)), 200
 
 # Staff Routes (Requires staff role)
-from app.utils.security import require_permission
+from app.utils.security import require_permission, get_current_principal
 
 @portal_bp.route('/staff/clients', methods=['GET'])
 @jwt_required()
+@require_module('client_portal')
 @require_permission('portal.view')
 def staff_get_clients():
-    from app.models.user import User
-    user_id = get_jwt_identity()
-    user = User.query.get(user_id)
-    clients = Client.query.filter_by(company_id=user.company_id).all()
-    return jsonify([{
-        "id": c.id,
-        "email": c.email,
-        "name": c.name,
-        "status": c.status
-    } for c in clients]), 200
+    principal = get_current_principal()
+    clients = Client.query.filter_by(company_id=principal.company_id)
+    return jsonify(paginate(clients, {
+        "id": Client.id,
+        "email": Client.email,
+        "name": Client.name,
+        "status": Client.status
+    }, keyset=[Client.id])), 200
 
 @portal_bp.route('/staff/clients', methods=['POST'])
 @jwt_required()
+@require_module('client_portal')
 @require_permission('portal.create')
 def staff_create_client():
-    from app.models.user import User
-    user_id = get_jwt_identity()
-    user = User.query.get(user_id)
+    principal = get_current_principal()
     data = request.get_json()
     
     if Client.query.filter_by(email=data.get('email')).first():
         return jsonify({"message": "Client email already exists"}), 400
         
     client = Client(
-        company_id=user.company_id,
+        company_id=principal.company_id,
         email=data['email'],
         name=data.get('name')
     )
-    client.set_password(data.get('password', 'ChangeMe123!')) # Default password
+    client.set_password(data.get('password', current_app.config['CLIENT_DEFAULT_PASSWORD']))
     db.session.add(client)
     db.session.commit()
     
     return jsonify({"message": "Client created successfully", "id": client.id}), 201
 
+@portal_bp.route('/staff/clients/import', methods=['POST'])
+@jwt_required()
+@require_module('client_portal')
+@require_permission('portal.create')
+def staff_import_clients():
+    file = request.files.get('file')
+    if not file or not file.filename:
+        return jsonify({"message": "No file uploaded"}), 400
+        
+    file_format = detect_format(file.filename, request.form.get('format'))
+    if not file_format:
+        return jsonify({"message": "Upload a .csv or .ndjson file"}), 400
+        
+    principal = get_current_principal()
+    upload_dir = os.path.join(current_app.config['CLIENT_IMPORT_DIR'], str(principal.company_id))
+    os.makedirs(upload_dir, exist_ok=True)
+    path = os.path.join(upload_dir, f"{uuid.uuid4().hex}_{secure_filename(file.filename)}")
+    file.save(path)
+    
+    # Hashed once here; rows without their own password share it
+    default_password = request.form.get('default_password') or current_app.config['CLIENT_DEFAULT_PASSWORD']
+    job = ClientImport(
+        company_id=principal.company_id,
+        user_id=principal.user_id,
+        file_path=path,
+        file_format=file_format,
+        default_password_hash=password_hasher.hash(default_password)
+    )
+    db.session.add(job)
+    db.session.commit()
+    
+    # Runs on the Celery workers; poll /staff/clients/import/<id> for progress
+    import_clients.delay(job.id)
+    
+    return jsonify({"message": "Client import queued", "id": job.id}), 202
+
+@portal_bp.route('/staff/clients/import/<int:import_id>', methods=['GET'])
+@jwt_required()
+@require_module('client_portal')
+@require_permission('portal.view')
+def staff_get_client_import(import_id):
+    principal = get_current_principal()
+    job = ClientImport.query.filter_by(id=import_id, company_id=principal.company_id).first()
+    
+    if not job:
+        return jsonify({"message": "Import not found"}), 404
+        
+    return jsonify(import_progress(job)), 200
+
 @portal_bp.route('/staff/updates', methods=['POST'])
 @jwt_required()
+@require_module('client_portal')
 @require_permission('portal.create')
 def staff_create_update():
-    from app.models.user import User
-    user_id = get_jwt_identity()
-    user = User.query.get(user_id)
+    principal = get_current_principal()
     data = request.get_json()
     
     update = ProjectUpdate(
-        company_id=user.company_id,
+        company_id=principal.company_id,
         client_id=data['client_id'],
         title=data['title'],
         content=data['content'],
@@ -1,21 +1,23 @@
 from flask import request, jsonify
-from flask_jwt_extended import jwt_required, get_jwt_identity
-from app.extensions import db
+from flask_jwt_extended import jwt_required
+from app.extensions import db, limiter
 from app.models.reports import FieldReport, Survey, SurveyResponse
-from app.utils.security import require_permission
+from app.services.survey_rollups import survey_results, answer_errors
+from app.services.response_cache import response_cache
+from app.utils.security import require_module, check_module, get_current_principal
+from app.utils.pagination import paginate
 from . import reports_bp
 
 @reports_bp.route('/field-reports', methods=['POST'])
 @jwt_required()
+@require_module('field_reports')
 def create_field_report():
-    from app.models.user import User
-    user_id = get_jwt_identity()
-    user = User.query.get(user_id)
+    principal = get_current_principal()
     data = request.get_json()
     
     report = FieldReport(
-        company_id=user.company_id,
-        user_id=user.id,
+        company_id=principal.company_id,
+        user_id=principal.user_id,
         title=data['title'],
         content=data['content'],
         location=data.get('location')
@@ -26,19 +28,33 @@ def create_field_report():
     return jsonify({"message": "Field report submitted"}), 201
 
 @reports_bp.route('/surveys', methods=['GET'])
+@limiter.exempt # Anonymous widget traffic; skips evaluating limits on the cached path
+@require_module('surveys', public=True)
+@response_cache.cached('surveys')
 def get_surveys():
     company_id = request.args.get('company_id')
-    surveys = Survey.query.filter_by(company_id=company_id, is_active=True).all()
-    return jsonify([{
-        "id": s.id,
-        "title": s.title,
-        "description": s.description
-    } for s in surveys]), 200
+    surveys = Survey.query.filter_by(company_id=company_id, is_active=True)
+    return jsonify(paginate(surveys, {
+        "id": Survey.id,
+        "title": Survey.title,
+        "description": Survey.description
+    }, keyset=[Survey.id])), 200
 
 @reports_bp.route('/surveys/<int:survey_id>/respond', methods=['POST'])
 def submit_survey(survey_id):
     data = request.get_json()
+    survey = Survey.query.filter_by(id=survey_id, is_active=True).first()
     
+    if not survey:
+        return jsonify({"message": "Survey not found"}), 404
+    # The company only becomes known once the survey is loaded
+    check_module(survey.company_id, 'surveys')
+    if not isinstance(data.get('answers'), list):
+        return jsonify({"message": "answers must be a list"}), 400
+    error = answer_errors(survey, data['answers'])
+    if error:
+        return jsonify({"message": error}), 400
+        
     response = SurveyResponse(
         survey_id=survey_id,
         client_id=data.get('client_id'),
@@ -48,3 +64,19 @@ def submit_survey(survey_id):
     db.session.commit()
     
     return jsonify({"message": "Survey submitted successfully"}), 201
+
+@reports_bp.route('/surveys/<int:survey_id>/results', methods=['GET'])
+@jwt_required()
+@require_module('surveys')
+def get_survey_results(survey_id):
+    principal = get_current_principal()
+    survey = Survey.query.filter_by(id=survey_id, company_id=principal.company_id).first()
+    
+    if not survey:
+        return jsonify({"message": "Survey not found"}), 404
+        
+    return jsonify({
+        "survey_id": survey.id,
+        "title": survey.title,
+        "questions": survey_results(survey)
+    }), 200
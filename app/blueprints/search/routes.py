@@ -0,0 +1,29 @@
+from flask import current_app, request, jsonify
+from flask_jwt_extended import jwt_required
+from app.services.search import SEARCHABLE, search
+from app.utils.security import get_current_principal
+from . import search_bp
+
+@search_bp.route('', methods=['GET'])
+@jwt_required()
+def search_records():
+    principal = get_current_principal()
+    query = request.args.get('q', '').strip()
+    if not query:
+        return jsonify({"message": "q is required"}), 400
+        
+    kinds = [kind for kind in request.args.get('types', '').split(',') if kind]
+    unknown = [kind for kind in kinds if kind not in SEARCHABLE]
+    if unknown:
+        return jsonify({"message": "Unknown search types", "types": unknown}), 400
+        
+    try:
+        limit = int(request.args.get('limit', 20))
+    except ValueError:
+        return jsonify({"message": "limit must be an integer"}), 400
+    limit = max(1, min(limit, current_app.config['SEARCH_MAX_RESULTS']))
+    
+    return jsonify({
+        "query": query,
+        "results": search(principal.company_id, query, kinds, limit)
+    }), 200
@@ -1,26 +1,50 @@
-from flask import request, jsonify
-from flask_jwt_extended import jwt_required, get_jwt_identity
+from datetime import datetime, timedelta, timezone
+from flask import request, jsonify, current_app
+from sqlalchemy import func
+from flask_jwt_extended import jwt_required
 from app.extensions import db
-from app.models.social import SocialPost, SocialPlatform
-from app.utils.security import require_permission
+from app.models.social import SocialPost, SocialPostTarget, SocialPlatform
+from app.utils.security import require_permission, require_module, get_current_principal
+from app.utils.pagination import paginate
 from . import social_bp
 
 @social_bp.route('/posts', methods=['POST'])
 @jwt_required()
+@require_module('social_scheduler')
 @require_permission('social.manage')
 def schedule_post():
-    from app.models.user import User
-    user_id = get_jwt_identity()
-    user = User.query.get(user_id)
+    principal = get_current_principal()
     data = request.get_json()
     
+    try:
+        scheduled_for = datetime.fromisoformat(data['scheduled_for'])
+    except (KeyError, TypeError, ValueError):
+        return jsonify({"message": "scheduled_for must be an ISO 8601 datetime"}), 400
+    if scheduled_for.tzinfo:
+        # The dispatcher compares against naive UTC
+        scheduled_for = scheduled_for.astimezone(timezone.utc).replace(tzinfo=None)
+        
+    content = data.get('content')
+    if not isinstance(content, str) or not content.strip():
+        return jsonify({"message": "content is required"}), 400
+        
+    platform_ids = data.get('platform_ids')
+    if not isinstance(platform_ids, list) or not all(isinstance(pid, int) and not isinstance(pid, bool) for pid in platform_ids):
+        return jsonify({"message": "platform_ids must list this company's platforms"}), 400
+    platform_ids = set(platform_ids)
+    known = {pid for (pid,) in db.session.query(SocialPlatform.id).filter(
+        SocialPlatform.id.in_(platform_ids), SocialPlatform.company_id == principal.company_id
+    )} if platform_ids else set()
+    if not platform_ids or known != platform_ids:
+        return jsonify({"message": "platform_ids must list this company's platforms"}), 400
+        
     post = SocialPost(
-        company_id=user.company_id,
-        user_id=user.id,
-        content=data['content'],
+        company_id=principal.company_id,
+        user_id=principal.user_id,
+        content=content,
         media_urls=data.get('media_urls', []),
-        scheduled_for=data['scheduled_for'],
-        platform_ids=data['platform_ids']
+        scheduled_for=scheduled_for,
+        targets=[SocialPostTarget(platform_id=pid) for pid in sorted(platform_ids)]
     )
     db.session.add(post)
     db.session.commit()
@@ -29,14 +53,84 @@ def schedule_post():
 
 @social_bp.route('/platforms', methods=['GET'])
 @jwt_required()
+@require_module('social_scheduler')
 def get_platforms():
-    from app.models.user import User
-    user_id = get_jwt_identity()
-    user = User.query.get(user_id)
-    platforms = SocialPlatform.query.filter_by(company_id=user.company_id).all()
-    return jsonify([{
-        "id": p.id,
-        "platform_name": p.platform_name,
-        "account_name": p.account_name,
-        "is_connected": p.is_connected
-    } for p in platforms]), 200
+    principal = get_current_principal()
+    platforms = SocialPlatform.query.filter_by(company_id=principal.company_id)
+    return jsonify(paginate(platforms, {
+        "id": SocialPlatform.id,
+        "platform_name": SocialPlatform.platform_name,
+        "account_name": SocialPlatform.account_name,
+        "is_connected": SocialPlatform.is_connected
+    }, keyset=[SocialPlatform.id])), 200
+
+def _calendar_range():
+    """Parses ?start=&end= (ISO dates, end inclusive) into a datetime range, or returns None."""
+    try:
+        start = datetime.fromisoformat(request.args['start'])
+        end = datetime.fromisoformat(request.args['end']) + timedelta(days=1)
+    except (KeyError, ValueError):
+        return None
+    if end <= start or end - start > timedelta(days=current_app.config['SOCIAL_CALENDAR_MAX_DAYS']):
+        return None
+    return start, end
+
+@social_bp.route('/calendar', methods=['GET'])
+@jwt_required()
+@require_module('social_scheduler')
+def get_calendar():
+    date_range = _calendar_range()
+    if date_range is None:
+        return jsonify({"message": "Invalid date range"}), 400
+        
+    principal = get_current_principal()
+    # One indexed range scan on posts, joined to their targets by post_id
+    entries = db.session.query(
+        SocialPost.id, SocialPost.scheduled_for, SocialPost.status, SocialPost.content,
+        SocialPostTarget.platform_id, SocialPostTarget.status
+    ).join(SocialPostTarget, SocialPostTarget.post_id == SocialPost.id).filter(
+        SocialPost.company_id == principal.company_id,
+        SocialPost.scheduled_for >= date_range[0],
+        SocialPost.scheduled_for < date_range[1]
+    )
+    platform_id = request.args.get('platform_id', type=int)
+    if platform_id:
+        entries = entries.filter(SocialPostTarget.platform_id == platform_id)
+        
+    posts = {}
+    for post_id, scheduled_for, status, content, target_platform, target_status in entries.order_by(SocialPost.scheduled_for, SocialPost.id):
+        post = posts.setdefault(post_id, {
+            "id": post_id,
+            "scheduled_for": scheduled_for.isoformat(),
+            "status": status,
+            "content": content,
+            "targets": []
+        })
+        post["targets"].append({"platform_id": target_platform, "status": target_status})
+        
+    return jsonify({"posts": list(posts.values())}), 200
+
+@social_bp.route('/calendar/summary', methods=['GET'])
+@jwt_required()
+@require_module('social_scheduler')
+def get_calendar_summary():
+    date_range = _calendar_range()
+    if date_range is None:
+        return jsonify({"message": "Invalid date range"}), 400
+        
+    principal = get_current_principal()
+    day = func.date(SocialPost.scheduled_for)
+    counts = db.session.query(
+        day, SocialPostTarget.platform_id, SocialPostTarget.status, func.count()
+    ).join(SocialPostTarget, SocialPostTarget.post_id == SocialPost.id).filter(
+        SocialPost.company_id == principal.company_id,
+        SocialPost.scheduled_for >= date_range[0],
+        SocialPost.scheduled_for < date_range[1]
+    ).group_by(day, SocialPostTarget.platform_id, SocialPostTarget.status).order_by(day)
+    
+    return jsonify({"days": [{
+        "date": str(date),
+        "platform_id": platform_id,
+        "status": status,
+        "posts": count
+    } for date, platform_id, status, count in counts]}), 200
@@ -3,9 +3,10 @@ from flask_migrate import Migrate
 from flask_bcrypt import Bcrypt
 from flask_jwt_extended import JWTManager
 from flask_cors import CORS
-from flask_limiter import Limiter
-from flask_limiter.util import get_remote_address
+from flask_limiter import ApplicationLimit, Limiter
 from flask_wtf.csrf import CSRFProtect
+from celery import Celery
+from app.utils.rate_limits import rate_limit_key, tenant_key, tenant_quota, no_tenant
 
 db = SQLAlchemy()
 migrate = Migrate()
@@ -13,4 +14,9 @@ bcrypt = Bcrypt()
 jwt = JWTManager()
 cors = CORS()
 csrf = CSRFProtect()
-limiter = Limiter(key_func=get_remote_address)
+limiter = Limiter(
+    key_func=rate_limit_key,
+    # One bucket per company across every route, sized by the company's quota tier
+    application_limits=[ApplicationLimit(tenant_quota, key_function=tenant_key, scope='tenant', exempt_when=no_tenant)]
+)
+celery = Celery(__name__)
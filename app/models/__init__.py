@@ -1,8 +1,9 @@
-from app.models.company import Company
+from app.models.company import Company, CompanyStats
 from app.models.user import User
-from app.models.client import Client, File, ProjectUpdate
+from app.models.client import Client, ClientImport, File, ProjectUpdate
 from app.models.booking import Service, Availability, Booking
-from app.models.invoice import Invoice, InvoiceItem, Receipt
-from app.models.inventory import Product, Category, StockMovement
-from app.models.reports import FieldReport, Survey, SurveyQuestion, SurveyResponse
-from app.models.social import SocialPlatform, SocialPost
+from app.models.invoice import Invoice, InvoiceSequence, InvoiceItem, Receipt, OcrResult
+from app.models.inventory import Product, Category, StockMovement, StockSnapshot
+from app.models.reports import FieldReport, Survey, SurveyQuestion, SurveyResponse, SurveyQuestionStats, SurveyAnswerCount
+from app.models.social import SocialPlatform, SocialPost, SocialPostTarget
+from app.models.search import SearchDocument
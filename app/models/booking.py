@@ -3,6 +3,9 @@ from datetime import datetime
 
 class Service(db.Model):
     __tablename__ = 'services'
+    __table_args__ = (
+        db.Index('ix_services_company_id_is_active', 'company_id', 'is_active'),
+    )
     
     id = db.Column(db.Integer, primary_key=True)
     company_id = db.Column(db.Integer, db.ForeignKey('companies.id'), nullable=False)
@@ -16,6 +19,9 @@ class Service(db.Model):
 
 class Availability(db.Model):
     __tablename__ = 'availability'
+    __table_args__ = (
+        db.Index('ix_availability_company_id_staff_id_day_of_week', 'company_id', 'staff_id', 'day_of_week'),
+    )
     
     id = db.Column(db.Integer, primary_key=True)
     company_id = db.Column(db.Integer, db.ForeignKey('companies.id'), nullable=False)
@@ -27,6 +33,10 @@ class Availability(db.Model):
 
 class Booking(db.Model):
     __tablename__ = 'bookings'
+    __table_args__ = (
+        db.Index('ix_bookings_company_id_status', 'company_id', 'status'),
+        db.Index('ix_bookings_staff_id_booking_time', 'staff_id', 'booking_time'),
+    )
     
     id = db.Column(db.Integer, primary_key=True)
     company_id = db.Column(db.Integer, db.ForeignKey('companies.id'), nullable=False)
@@ -35,7 +45,8 @@ class Booking(db.Model):
     staff_id = db.Column(db.Integer, db.ForeignKey('users.id'), nullable=False)
     
     booking_time = db.Column(db.DateTime, nullable=False)
-    status = db.Column(db.Enum('pending', 'confirmed', 'completed', 'cancelled', 'no-show', name='booking_status'), default='pending')
+    # active_history so dashboard counters always see the previous status
+    status = db.column_property(db.Column(db.Enum('pending', 'confirmed', 'completed', 'cancelled', 'no-show', name='booking_status'), default='pending'), active_history=True)
     
     client_name = db.Column(db.String(100)) # For guest bookings
     client_email = db.Column(db.String(120))
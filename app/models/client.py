@@ -1,9 +1,13 @@
-from app.extensions import db, bcrypt
+from app.extensions import db
+from app.services.passwords import password_hasher
 from datetime import datetime
 from flask_jwt_extended import create_access_token, create_refresh_token
 
 class Client(db.Model):
     __tablename__ = 'clients'
+    __table_args__ = (
+        db.Index('ix_clients_company_id_status', 'company_id', 'status'),
+    )
     
     id = db.Column(db.Integer, primary_key=True)
     company_id = db.Column(db.Integer, db.ForeignKey('companies.id'), nullable=False)
@@ -14,14 +18,14 @@ class Client(db.Model):
     created_at = db.Column(db.DateTime, default=datetime.utcnow)
     
     def set_password(self, password):
-        self.password_hash = bcrypt.generate_password_hash(password, rounds=12).decode('utf-8')
+        self.password_hash = password_hasher.hash(password)
         
     def check_password(self, password):
-        return bcrypt.check_password_hash(self.password_hash, password)
+        return password_hasher.check(self.password_hash, password)
     
     def get_tokens(self):
         # Using a custom claim to distinguish clients from staff
-        additional_claims = {"is_client": True}
+        additional_claims = {"is_client": True, "company_id": self.company_id}
         access_token = create_access_token(identity=self.id, additional_claims=additional_claims)
         refresh_token = create_refresh_token(identity=self.id, additional_claims=additional_claims)
         return {
@@ -32,8 +36,37 @@ class Client(db.Model):
     def __repr__(self):
         return f'<Client {self.email}>'
 
+class ClientImport(db.Model):
+    __tablename__ = 'client_imports'
+    __table_args__ = (
+        db.Index('ix_client_imports_company_id_created_at', 'company_id', 'created_at'),
+    )
+    
+    # Bulk client import job, run by app.tasks.clients
+    id = db.Column(db.Integer, primary_key=True)
+    company_id = db.Column(db.Integer, db.ForeignKey('companies.id'), nullable=False)
+    user_id = db.Column(db.Integer, db.ForeignKey('users.id'), nullable=False) # Staff who uploaded
+    
+    file_path = db.Column(db.String(512)) # Removed once the import finishes
+    file_format = db.Column(db.Enum('csv', 'ndjson', name='client_import_format'), nullable=False)
+    default_password_hash = db.Column(db.String(128), nullable=False) # For rows without a password
+    
+    status = db.Column(db.Enum('pending', 'running', 'completed', 'failed', name='client_import_status'), default='pending')
+    total_rows = db.Column(db.Integer)
+    processed_rows = db.Column(db.Integer, nullable=False, default=0)
+    created_count = db.Column(db.Integer, nullable=False, default=0)
+    error_count = db.Column(db.Integer, nullable=False, default=0)
+    errors = db.Column(db.JSON) # [{"row": n, "email": ..., "error": ...}], capped
+    
+    created_at = db.Column(db.DateTime, default=datetime.utcnow)
+    started_at = db.Column(db.DateTime)
+    finished_at = db.Column(db.DateTime)
+
 class File(db.Model):
     __tablename__ = 'files'
+    __table_args__ = (
+        db.Index('ix_files_company_id_client_id', 'company_id', 'client_id'),
+    )
     
     id = db.Column(db.Integer, primary_key=True)
     company_id = db.Column(db.Integer, db.ForeignKey('companies.id'), nullable=False)
@@ -48,6 +81,10 @@ class File(db.Model):
 
 class ProjectUpdate(db.Model):
     __tablename__ = 'project_updates'
+    __table_args__ = (
+        db.Index('ix_project_updates_client_id_created_at', 'client_id', 'created_at'),
+        db.Index('ix_project_updates_company_id_created_at', 'company_id', 'created_at'),
+    )
     
     id = db.Column(db.Integer, primary_key=True)
     company_id = db.Column(db.Integer, db.ForeignKey('companies.id'), nullable=False)
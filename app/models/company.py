@@ -9,18 +9,31 @@ class Company(db.Model):
     slug = db.Column(db.String(100), unique=True, nullable=False)
     status = db.Column(db.Enum('pending', 'active', 'suspended', 'deactivated', name='company_status'), default='pending')
     created_at = db.Column(db.DateTime, default=datetime.utcnow)
+    quota_tier = db.Column(db.String(20), nullable=False, default='standard', server_default='standard') # Key of RATE_LIMIT_TIERS
     
-    # Module activation (from PRD 5.2)
+    # Module activation (from PRD 5.2), enforced by app.utils.security.require_module.
+    # Modules that were usable before enforcement default to on; owners switch them off.
     client_portal = db.Column(db.Boolean, default=True)
     bookings = db.Column(db.Boolean, default=True)
     invoicing = db.Column(db.Boolean, default=True)
-    inventory = db.Column(db.Boolean, default=False)
+    inventory = db.Column(db.Boolean, default=True)
     team_onboarding = db.Column(db.Boolean, default=False)
-    field_reports = db.Column(db.Boolean, default=False)
-    surveys = db.Column(db.Boolean, default=False)
-    social_scheduler = db.Column(db.Boolean, default=False)
+    field_reports = db.Column(db.Boolean, default=True)
+    surveys = db.Column(db.Boolean, default=True)
+    social_scheduler = db.Column(db.Boolean, default=True)
     
     users = db.relationship('User', backref='company', lazy=True)
 
     def __repr__(self):
         return f'<Company {self.name}>'
+
+class CompanyStats(db.Model):
+    __tablename__ = 'company_stats'
+    
+    # Dashboard counters, maintained incrementally by app.services.dashboard_stats
+    company_id = db.Column(db.Integer, db.ForeignKey('companies.id'), primary_key=True)
+    clients = db.Column(db.Integer, nullable=False, default=0)
+    pending_bookings = db.Column(db.Integer, nullable=False, default=0)
+    unpaid_invoices = db.Column(db.Integer, nullable=False, default=0)
+    overdue_invoices = db.Column(db.Integer, nullable=False, default=0)
+    updated_at = db.Column(db.DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
@@ -3,6 +3,9 @@ from datetime import datetime
 
 class Category(db.Model):
     __tablename__ = 'categories'
+    __table_args__ = (
+        db.Index('ix_categories_company_id', 'company_id'),
+    )
     
     id = db.Column(db.Integer, primary_key=True)
     company_id = db.Column(db.Integer, db.ForeignKey('companies.id'), nullable=False)
@@ -13,6 +16,13 @@ class Category(db.Model):
 
 class Product(db.Model):
     __tablename__ = 'products'
+    __table_args__ = (
+        db.Index('ix_products_company_id_is_active', 'company_id', 'is_active'),
+        # Partial index: holds only products below their reorder threshold
+        db.Index('ix_products_low_stock', 'company_id', 'id',
+                 postgresql_where=db.text('current_stock < min_stock_level'),
+                 sqlite_where=db.text('current_stock < min_stock_level')),
+    )
     
     id = db.Column(db.Integer, primary_key=True)
     company_id = db.Column(db.Integer, db.ForeignKey('companies.id'), nullable=False)
@@ -32,6 +42,9 @@ class Product(db.Model):
 
 class StockMovement(db.Model):
     __tablename__ = 'stock_movements'
+    __table_args__ = (
+        db.Index('ix_stock_movements_product_id_created_at', 'product_id', 'created_at'),
+    )
     
     id = db.Column(db.Integer, primary_key=True)
     product_id = db.Column(db.Integer, db.ForeignKey('products.id'), nullable=False)
@@ -41,3 +54,18 @@ class StockMovement(db.Model):
     reason = db.Column(db.String(255)) # Sale, Restock, Damage, Correction
     
     created_at = db.Column(db.DateTime, default=datetime.utcnow)
+
+class StockSnapshot(db.Model):
+    __tablename__ = 'stock_snapshots'
+    __table_args__ = (
+        db.UniqueConstraint('product_id', 'taken_at', name='uq_stock_snapshots_product_id_taken_at'),
+        db.Index('ix_stock_snapshots_company_id_taken_at', 'company_id', 'taken_at'),
+    )
+    
+    id = db.Column(db.Integer, primary_key=True)
+    company_id = db.Column(db.Integer, db.ForeignKey('companies.id'), nullable=False)
+    product_id = db.Column(db.Integer, db.ForeignKey('products.id'), nullable=False)
+    
+    # Stock after every movement created before taken_at
+    taken_at = db.Column(db.DateTime, nullable=False)
+    stock = db.Column(db.Numeric(10, 2), nullable=False)
@@ -3,15 +3,23 @@ from datetime import datetime
 
 class Invoice(db.Model):
     __tablename__ = 'invoices'
+    __table_args__ = (
+        db.Index('ix_invoices_company_id_status', 'company_id', 'status'),
+        db.Index('ix_invoices_status_due_date', 'status', 'due_date'),
+        db.Index('ix_invoices_company_id_invoice_number', 'company_id', 'invoice_number', unique=True),
+    )
     
     id = db.Column(db.Integer, primary_key=True)
     company_id = db.Column(db.Integer, db.ForeignKey('companies.id'), nullable=False)
     client_id = db.Column(db.Integer, db.ForeignKey('clients.id'), nullable=True)
     
-    invoice_number = db.Column(db.String(50), nullable=False)
-    status = db.Column(db.Enum('draft', 'sent', 'paid', 'overdue', 'cancelled', name='invoice_status'), default='draft')
+    invoice_number = db.Column(db.String(50), nullable=False) # Allocated on insert when left empty
+    # active_history so dashboard counters always see the previous status
+    status = db.column_property(db.Column(db.Enum('draft', 'sent', 'paid', 'overdue', 'cancelled', name='invoice_status'), default='draft'), active_history=True)
     due_date = db.Column(db.DateTime)
-    total_amount = db.Column(db.Numeric(10, 2), default=0.00)
+    # Totals are maintained by app.services.invoice_totals
+    tax_rate = db.Column(db.Numeric(5, 2), default=0.00) # Percent of the subtotal
+    total_amount = db.Column(db.Numeric(10, 2), default=0.00) # Including tax
     tax_amount = db.Column(db.Numeric(10, 2), default=0.00)
     
     notes = db.Column(db.Text)
@@ -19,8 +27,18 @@ class Invoice(db.Model):
     
     items = db.relationship('InvoiceItem', backref='invoice', lazy=True, cascade="all, delete-orphan")
 
+class InvoiceSequence(db.Model):
+    __tablename__ = 'invoice_sequences'
+    
+    # Per-company invoice counter, see app.services.invoice_numbers
+    company_id = db.Column(db.Integer, db.ForeignKey('companies.id'), primary_key=True)
+    last_number = db.Column(db.Integer, nullable=False, default=0)
+
 class InvoiceItem(db.Model):
     __tablename__ = 'invoice_items'
+    __table_args__ = (
+        db.Index('ix_invoice_items_invoice_id', 'invoice_id'),
+    )
     
     id = db.Column(db.Integer, primary_key=True)
     invoice_id = db.Column(db.Integer, db.ForeignKey('invoices.id'), nullable=False)
@@ -32,12 +50,18 @@ class InvoiceItem(db.Model):
 
 class Receipt(db.Model):
     __tablename__ = 'receipts'
+    __table_args__ = (
+        db.Index('ix_receipts_company_id_created_at', 'company_id', 'created_at'),
+        db.Index('ix_receipts_company_id_content_hash', 'company_id', 'content_hash'),
+        db.Index('ix_receipts_ocr_status_ocr_lease_until', 'ocr_status', 'ocr_lease_until'),
+    )
     
     id = db.Column(db.Integer, primary_key=True)
     company_id = db.Column(db.Integer, db.ForeignKey('companies.id'), nullable=False)
     user_id = db.Column(db.Integer, db.ForeignKey('users.id'), nullable=False) # Staff who uploaded
     
     file_path = db.Column(db.String(512), nullable=False)
+    content_hash = db.Column(db.String(64)) # SHA-256 of the uploaded file
     vendor_name = db.Column(db.String(255))
     date = db.Column(db.DateTime)
     total_amount = db.Column(db.Numeric(10, 2))
@@ -45,5 +69,20 @@ class Receipt(db.Model):
     
     ocr_status = db.Column(db.Enum('pending', 'processing', 'completed', 'failed', name='ocr_status'), default='pending')
     raw_ocr_data = db.Column(db.JSON)
+    ocr_lease_until = db.Column(db.DateTime) # Re-queued by the stale sweep if still unfinished after this
+    ocr_attempts = db.Column(db.Integer, nullable=False, default=0, server_default='0')
     
     created_at = db.Column(db.DateTime, default=datetime.utcnow)
+
+class OcrResult(db.Model):
+    __tablename__ = 'ocr_results'
+    __table_args__ = (
+        db.UniqueConstraint('company_id', 'content_hash', name='uq_ocr_results_company_id_content_hash'),
+    )
+    
+    # OCR output cached by file content, reused for identical uploads within a company
+    id = db.Column(db.Integer, primary_key=True)
+    company_id = db.Column(db.Integer, db.ForeignKey('companies.id'), nullable=False)
+    content_hash = db.Column(db.String(64), nullable=False)
+    data = db.Column(db.JSON, nullable=False)
+    created_at = db.Column(db.DateTime, default=datetime.utcnow)
@@ -3,6 +3,9 @@ from datetime import datetime
 
 class FieldReport(db.Model):
     __tablename__ = 'field_reports'
+    __table_args__ = (
+        db.Index('ix_field_reports_company_id_created_at', 'company_id', 'created_at'),
+    )
     
     id = db.Column(db.Integer, primary_key=True)
     company_id = db.Column(db.Integer, db.ForeignKey('companies.id'), nullable=False)
@@ -17,6 +20,9 @@ class FieldReport(db.Model):
 
 class Survey(db.Model):
     __tablename__ = 'surveys'
+    __table_args__ = (
+        db.Index('ix_surveys_company_id_is_active', 'company_id', 'is_active'),
+    )
     
     id = db.Column(db.Integer, primary_key=True)
     company_id = db.Column(db.Integer, db.ForeignKey('companies.id'), nullable=False)
@@ -30,6 +36,9 @@ class Survey(db.Model):
 
 class SurveyQuestion(db.Model):
     __tablename__ = 'survey_questions'
+    __table_args__ = (
+        db.Index('ix_survey_questions_survey_id', 'survey_id'),
+    )
     
     id = db.Column(db.Integer, primary_key=True)
     survey_id = db.Column(db.Integer, db.ForeignKey('surveys.id'), nullable=False)
@@ -40,6 +49,9 @@ class SurveyQuestion(db.Model):
 
 class SurveyResponse(db.Model):
     __tablename__ = 'survey_responses'
+    __table_args__ = (
+        db.Index('ix_survey_responses_survey_id_created_at', 'survey_id', 'created_at'),
+    )
     
     id = db.Column(db.Integer, primary_key=True)
     survey_id = db.Column(db.Integer, db.ForeignKey('surveys.id'), nullable=False)
@@ -47,3 +59,28 @@ class SurveyResponse(db.Model):
     
     answers = db.Column(db.JSON) # List of answers
     created_at = db.Column(db.DateTime, default=datetime.utcnow)
+
+class SurveyQuestionStats(db.Model):
+    __tablename__ = 'survey_question_stats'
+    __table_args__ = (
+        db.Index('ix_survey_question_stats_survey_id', 'survey_id'),
+    )
+    
+    # Per-question rollup, maintained incrementally by app.services.survey_rollups
+    question_id = db.Column(db.Integer, db.ForeignKey('survey_questions.id'), primary_key=True)
+    survey_id = db.Column(db.Integer, db.ForeignKey('surveys.id'), nullable=False)
+    answers = db.Column(db.Integer, nullable=False, default=0) # Responses that answered this question
+    total = db.Column(db.Numeric(14, 2), nullable=False, default=0) # Sum of ratings
+    updated_at = db.Column(db.DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
+
+class SurveyAnswerCount(db.Model):
+    __tablename__ = 'survey_answer_counts'
+    __table_args__ = (
+        db.Index('ix_survey_answer_counts_survey_id', 'survey_id'),
+    )
+    
+    # Rating histogram bucket or multiple choice option, with how often it was picked
+    question_id = db.Column(db.Integer, db.ForeignKey('survey_questions.id'), primary_key=True)
+    bucket = db.Column(db.String(255), primary_key=True)
+    survey_id = db.Column(db.Integer, db.ForeignKey('surveys.id'), nullable=False)
+    count = db.Column(db.Integer, nullable=False, default=0)
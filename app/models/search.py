@@ -0,0 +1,55 @@
+from app.extensions import db
+from datetime import datetime
+from sqlalchemy import DDL, event
+
+class SearchDocument(db.Model):
+    __tablename__ = 'search_documents'
+    __table_args__ = (
+        db.UniqueConstraint('kind', 'object_id', name='uq_search_documents_kind_object_id'),
+        db.Index('ix_search_documents_company_id_kind', 'company_id', 'kind'),
+    )
+    
+    # One row per searchable record, maintained by app.services.search.
+    # The full-text index itself is dialect specific, see SEARCH_INDEX_DDL.
+    id = db.Column(db.Integer, primary_key=True)
+    company_id = db.Column(db.Integer, db.ForeignKey('companies.id'), nullable=False)
+    kind = db.Column(db.String(32), nullable=False) # client / product / project_update / field_report
+    object_id = db.Column(db.Integer, nullable=False)
+    
+    title = db.Column(db.String(255), nullable=False)
+    body = db.Column(db.Text)
+    
+    updated_at = db.Column(db.DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
+
+SEARCH_INDEX_DDL = {
+    # Weighted tsvector kept current by PostgreSQL itself, GIN indexed
+    'postgresql': [
+        "ALTER TABLE search_documents ADD COLUMN search_vector tsvector GENERATED ALWAYS AS ("
+        "setweight(to_tsvector('simple', coalesce(title, '')), 'A') || "
+        "setweight(to_tsvector('simple', coalesce(body, '')), 'B')) STORED",
+        "CREATE INDEX ix_search_documents_search_vector ON search_documents USING gin (search_vector)",
+    ],
+    # Contentless FTS5 table fed by triggers; the tenant column holds 't<company_id>'
+    # so the tenant filter is resolved inside the full-text index
+    'sqlite': [
+        "CREATE VIRTUAL TABLE search_documents_fts USING fts5("
+        "tenant, title, body, content='', prefix='2 3', tokenize='unicode61 remove_diacritics 2')",
+        "CREATE TRIGGER search_documents_ai AFTER INSERT ON search_documents BEGIN "
+        "INSERT INTO search_documents_fts (rowid, tenant, title, body) "
+        "VALUES (new.id, 't' || new.company_id, new.title, new.body); END",
+        "CREATE TRIGGER search_documents_ad AFTER DELETE ON search_documents BEGIN "
+        "INSERT INTO search_documents_fts (search_documents_fts, rowid, tenant, title, body) "
+        "VALUES ('delete', old.id, 't' || old.company_id, old.title, old.body); END",
+        "CREATE TRIGGER search_documents_au AFTER UPDATE ON search_documents BEGIN "
+        "INSERT INTO search_documents_fts (search_documents_fts, rowid, tenant, title, body) "
+        "VALUES ('delete', old.id, 't' || old.company_id, old.title, old.body); "
+        "INSERT INTO search_documents_fts (rowid, tenant, title, body) "
+        "VALUES (new.id, 't' || new.company_id, new.title, new.body); END",
+    ],
+}
+
+for _dialect, _statements in SEARCH_INDEX_DDL.items():
+    for _statement in _statements:
+        event.listen(SearchDocument.__table__, 'after_create', DDL(_statement).execute_if(dialect=_dialect))
+event.listen(SearchDocument.__table__, 'before_drop',
+                DDL("DROP TABLE IF EXISTS search_documents_fts").execute_if(dialect='sqlite'))
@@ -3,6 +3,9 @@ from datetime import datetime
 
 class SocialPlatform(db.Model):
     __tablename__ = 'social_platforms'
+    __table_args__ = (
+        db.Index('ix_social_platforms_company_id', 'company_id'),
+    )
     
     id = db.Column(db.Integer, primary_key=True)
     company_id = db.Column(db.Integer, db.ForeignKey('companies.id'), nullable=False)
@@ -16,6 +19,10 @@ class SocialPlatform(db.Model):
 
 class SocialPost(db.Model):
     __tablename__ = 'social_posts'
+    __table_args__ = (
+        db.Index('ix_social_posts_company_id_scheduled_for', 'company_id', 'scheduled_for'),
+        db.Index('ix_social_posts_status_scheduled_for', 'status', 'scheduled_for'),
+    )
     
     id = db.Column(db.Integer, primary_key=True)
     company_id = db.Column(db.Integer, db.ForeignKey('companies.id'), nullable=False)
@@ -26,6 +33,34 @@ class SocialPost(db.Model):
     
     scheduled_for = db.Column(db.DateTime, nullable=False)
     status = db.Column(db.Enum('draft', 'scheduled', 'posted', 'failed', name='post_status'), default='scheduled')
-    platform_ids = db.Column(db.JSON) # List of platform IDs to post to
+    
+    # Dispatcher bookkeeping, see app.services.social_dispatch
+    attempts = db.Column(db.Integer, nullable=False, default=0)
+    next_attempt_at = db.Column(db.DateTime) # Lease while publishing, then retry time
+    last_error = db.Column(db.Text)
+    posted_at = db.Column(db.DateTime)
     
     created_at = db.Column(db.DateTime, default=datetime.utcnow)
+    
+    targets = db.relationship('SocialPostTarget', backref='post', lazy=True, cascade="all, delete-orphan")
+    
+    @property
+    def platform_ids(self):
+        return [target.platform_id for target in self.targets]
+
+class SocialPostTarget(db.Model):
+    __tablename__ = 'social_post_targets'
+    __table_args__ = (
+        db.UniqueConstraint('post_id', 'platform_id', name='uq_social_post_targets_post_id_platform_id'),
+        db.Index('ix_social_post_targets_platform_id_status', 'platform_id', 'status'),
+    )
+    
+    # One row per platform a post goes to, so each can succeed or fail on its own
+    id = db.Column(db.Integer, primary_key=True)
+    post_id = db.Column(db.Integer, db.ForeignKey('social_posts.id'), nullable=False)
+    platform_id = db.Column(db.Integer, db.ForeignKey('social_platforms.id'), nullable=False)
+    
+    status = db.Column(db.Enum('pending', 'posted', 'failed', name='post_target_status'), nullable=False, default='pending')
+    external_id = db.Column(db.String(255)) # Post id returned by the platform
+    error = db.Column(db.Text)
+    posted_at = db.Column(db.DateTime)
@@ -1,9 +1,13 @@
-from app.extensions import db, bcrypt
+from app.extensions import db
+from app.services.passwords import password_hasher
 from datetime import datetime
 from flask_jwt_extended import create_access_token, create_refresh_token
 
 class User(db.Model):
     __tablename__ = 'users'
+    __table_args__ = (
+        db.Index('ix_users_company_id', 'company_id'),
+    )
     
     id = db.Column(db.Integer, primary_key=True)
     company_id = db.Column(db.Integer, db.ForeignKey('companies.id'), nullable=False)
@@ -17,11 +21,11 @@ class User(db.Model):
     activated_at = db.Column(db.DateTime, nullable=True)
     
     def set_password(self, password):
-        # Using cost factor 12 as per PRD 3.1
-        self.password_hash = bcrypt.generate_password_hash(password, rounds=12).decode('utf-8')
+        # Cost factor comes from BCRYPT_LOG_ROUNDS (12 in production as per PRD 3.1)
+        self.password_hash = password_hasher.hash(password)
         
     def check_password(self, password):
-        return bcrypt.check_password_hash(self.password_hash, password)
+        return password_hasher.check(self.password_hash, password)
     
     def get_tokens(self):
         access_token = create_access_token(identity=self.id)
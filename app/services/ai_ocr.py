@@ -1,6 +1,7 @@
 import os
 import anthropic
 import json
+from concurrent.futures import ThreadPoolExecutor
 
 class AIOCRService:
     def __init__(self):
@@ -22,4 +23,38 @@ class AIOCRService:
             "currency": "USD"
         }
 
+    def scan_batch(self, file_paths, max_concurrency=4):
+        """
+        Scans several receipts, running at most max_concurrency model calls at once.
+        Returns one result per path, in order; a failed scan yields the exception instead.
+        """
+        def scan(path):
+            try:
+                return self.scan_receipt(path)
+            except Exception as e:
+                return e
+
+        with ThreadPoolExecutor(max_workers=max(1, min(max_concurrency, len(file_paths)))) as pool:
+            return list(pool.map(scan, file_paths))
+
+class StubOCRService(AIOCRService):
+    """Offline backend for tests and local development. Never calls a model."""
+
+    def __init__(self):
+        self.client = None
+        self.scanned = []
+
+    def scan_receipt(self, file_path):
+        self.scanned.append(file_path)
+        return {
+            "vendor_name": "Stub Vendor",
+            "date": "2023-10-27",
+            "total_amount": 10.00,
+            "currency": "USD"
+        }
+
 ocr_service = AIOCRService()
+stub_ocr_service = StubOCRService()
+
+def get_ocr_service(backend):
+    return stub_ocr_service if backend == 'stub' else ocr_service
@@ -0,0 +1,70 @@
+from datetime import timedelta
+from sqlalchemy import select, text
+from app.extensions import db
+from app.models.booking import Service, Booking
+from app.models.user import User
+from app.services.slots import RELEASED_STATUSES
+
+# First key of the two-key PostgreSQL advisory lock; the second is the staff id
+BOOKING_LOCK_NAMESPACE = 7301
+
+class SlotUnavailable(Exception):
+    """The requested time overlaps an existing booking for that staff member."""
+
+class StaffNotFound(Exception):
+    """The staff member doesn't exist, isn't active, or belongs to another company."""
+
+def _lock_staff(company_id, staff_id):
+    """
+    Serializes reservations for one staff member until the transaction ends,
+    so the overlap check below can't race another request. Returns False when
+    company_id has no active staff member staff_id.
+    """
+    users = User.__table__
+    staff = (users.c.id == staff_id, users.c.company_id == company_id, users.c.status == 'active')
+    if db.engine.dialect.name == 'postgresql':
+        if db.session.execute(select(users.c.id).where(*staff)).first() is None:
+            return False
+        db.session.execute(
+            text('SELECT pg_advisory_xact_lock(:namespace, :staff_id)'),
+            {'namespace': BOOKING_LOCK_NAMESPACE, 'staff_id': staff_id}
+        )
+        return True
+    # A no-op write takes the row lock (or SQLite's database write lock); matching
+    # no row would take no lock at all
+    return db.session.execute(users.update().where(*staff).values(id=users.c.id)).rowcount == 1
+
+def reserve_booking(service, staff_id, booking_time, **fields):
+    """
+    Books service with staff_id at booking_time, or raises StaffNotFound or
+    SlotUnavailable. Commits on success and rolls back otherwise.
+    """
+    length = timedelta(minutes=service.duration + (service.buffer_time or 0))
+    if not _lock_staff(service.company_id, staff_id):
+        db.session.rollback()
+        raise StaffNotFound()
+
+    nearby = db.session.query(
+        Booking.booking_time, Service.duration, Service.buffer_time
+    ).join(Service, Booking.service_id == Service.id).filter(
+        Booking.staff_id == staff_id,
+        Booking.booking_time >= booking_time - timedelta(days=1),
+        Booking.booking_time < booking_time + length,
+        Booking.status.notin_(RELEASED_STATUSES)
+    )
+    for start, duration, buffer_time in nearby:
+        if start + timedelta(minutes=duration + (buffer_time or 0)) > booking_time:
+            db.session.rollback()
+            raise SlotUnavailable()
+
+    booking = Booking(
+        company_id=service.company_id,
+        service_id=service.id,
+        staff_id=staff_id,
+        booking_time=booking_time,
+        status='pending',
+        **fields
+    )
+    db.session.add(booking)
+    db.session.commit()
+    return booking
@@ -0,0 +1,185 @@
+import csv
+import json
+import os
+import re
+from concurrent.futures import ProcessPoolExecutor
+from contextlib import nullcontext
+from datetime import datetime
+from flask import current_app
+from sqlalchemy.exc import IntegrityError
+from app.extensions import db
+from app.models.client import Client, ClientImport
+from app.services.passwords import password_hasher
+
+clients_table = Client.__table__
+imports_table = ClientImport.__table__
+
+EMAIL_RE = re.compile(r'^[^@\s]+@[^@\s]+\.[^@\s]+$')
+FORMATS = {'csv': 'csv', 'ndjson': 'ndjson', 'jsonl': 'ndjson'}
+
+def detect_format(filename, declared=None):
+    """Returns 'csv' or 'ndjson' from the declared format or the file extension, else None."""
+    name = (declared or os.path.splitext(filename or '')[1].lstrip('.')).lower()
+    return FORMATS.get(name)
+
+def read_rows(path, file_format):
+    """
+    Streams the file and yields (line, row) where row is a dict of lower-cased
+    fields, or an error message when the line can't be parsed.
+    """
+    with open(path, newline='', encoding='utf-8-sig') as f:
+        if file_format == 'csv':
+            reader = csv.DictReader(f)
+            for row in reader:
+                yield reader.line_num, {k.strip().lower(): (v or '').strip() for k, v in row.items() if isinstance(k, str)}
+            return
+
+        for line, text in enumerate(f, start=1):
+            if not text.strip():
+                continue
+            try:
+                row = json.loads(text)
+            except ValueError:
+                yield line, "Invalid JSON"
+                continue
+            if not isinstance(row, dict):
+                yield line, "Expected a JSON object"
+                continue
+            yield line, {str(k).lower(): str(v).strip() for k, v in row.items() if v is not None}
+
+def _validate(row, seen):
+    email = row.get('email', '')
+    if not email:
+        return "Email is required"
+    if len(email) > clients_table.c.email.type.length or not EMAIL_RE.match(email):
+        return "Invalid email"
+    if len(row.get('name', '')) > clients_table.c.name.type.length:
+        return "Name is too long"
+    if email in seen:
+        return "Duplicate email in file"
+    return None
+
+def _existing_emails(emails):
+    # Emails are unique across all companies, so the check isn't tenant scoped
+    if not emails:
+        return set()
+    return {email for (email,) in db.session.query(Client.email).filter(Client.email.in_(emails))}
+
+def _record_errors(job, errors):
+    if not errors:
+        return
+    job.error_count += len(errors)
+    kept = list(job.errors or [])
+    room = current_app.config['CLIENT_IMPORT_MAX_ERRORS'] - len(kept)
+    kept.extend({"line": line, "email": email, "error": error} for line, email, error in errors[:max(room, 0)])
+    job.errors = kept
+
+def _import_batch(job, batch, seen, pool):
+    errors, valid = [], []
+    for line, row in batch:
+        if isinstance(row, str):
+            errors.append((line, None, row))
+            continue
+        error = _validate(row, seen)
+        if error:
+            errors.append((line, row.get('email') or None, error))
+            continue
+        seen.add(row['email'])
+        valid.append((line, row))
+
+    taken = _existing_emails([row['email'] for _, row in valid])
+    errors.extend((line, row['email'], "Email already exists") for line, row in valid if row['email'] in taken)
+    valid = [(line, row) for line, row in valid if row['email'] not in taken]
+
+    hashes = iter(password_hasher.hash_many([row['password'] for _, row in valid if row.get('password')], pool))
+    pending = [(line, Client(
+        company_id=job.company_id,
+        email=row['email'],
+        name=row.get('name') or None,
+        password_hash=next(hashes) if row.get('password') else job.default_password_hash
+    )) for line, row in valid]
+
+    # Inserted through the session, not bulk_insert_mappings, so the flush hooks
+    # keep dashboard counters and search documents in step
+    while True:
+        db.session.add_all(client for _, client in pending)
+        try:
+            db.session.flush()
+            break
+        except IntegrityError:
+            # Another request created one of these emails since the check
+            db.session.rollback()
+            taken = _existing_emails([client.email for _, client in pending])
+            if not taken:
+                raise
+            errors.extend((line, client.email, "Email already exists") for line, client in pending if client.email in taken)
+            pending = [(line, client) for line, client in pending if client.email not in taken]
+
+    job.processed_rows += len(batch)
+    job.created_count += len(pending)
+    _record_errors(job, sorted(errors, key=lambda error: error[0]))
+    db.session.commit()
+
+def _claim(import_id):
+    claimed = imports_table.update().where(
+        imports_table.c.id == import_id, imports_table.c.status == 'pending'
+    ).values(status='running', started_at=datetime.utcnow())
+    if not db.session.execute(claimed).rowcount:
+        db.session.rollback()
+        return None
+    db.session.commit()
+    return db.session.get(ClientImport, import_id)
+
+def run_import(import_id):
+    """
+    Imports a pending ClientImport batch by batch, committing progress after
+    each one, and returns the number of clients created. Rows that fail
+    validation or collide with an existing email are reported, not fatal.
+    """
+    job = _claim(import_id)
+    if job is None:
+        return None
+
+    batch_size = current_app.config['CLIENT_IMPORT_BATCH_SIZE']
+    workers = current_app.config['CLIENT_IMPORT_HASH_WORKERS']
+    seen = set()
+    try:
+        job.total_rows = sum(1 for _ in read_rows(job.file_path, job.file_format))
+        db.session.commit()
+
+        with (ProcessPoolExecutor(max_workers=workers) if workers else nullcontext()) as pool:
+            batch = []
+            for line, row in read_rows(job.file_path, job.file_format):
+                batch.append((line, row))
+                if len(batch) >= batch_size:
+                    _import_batch(job, batch, seen, pool)
+                    batch = []
+            if batch:
+                _import_batch(job, batch, seen, pool)
+        job.status = 'completed'
+    except Exception as e:
+        db.session.rollback()
+        job.status = 'failed'
+        _record_errors(job, [(None, None, str(e) or type(e).__name__)])
+    finally:
+        # The upload may hold plaintext passwords
+        if job.file_path and os.path.exists(job.file_path):
+            os.remove(job.file_path)
+        job.file_path = None
+        job.finished_at = datetime.utcnow()
+        db.session.commit()
+    return job.created_count
+
+def import_progress(job):
+    return {
+        "id": job.id,
+        "status": job.status,
+        "total_rows": job.total_rows,
+        "processed_rows": job.processed_rows,
+        "created": job.created_count,
+        "error_count": job.error_count,
+        "errors": job.errors or [],
+        "progress": round(job.processed_rows / job.total_rows * 100, 1) if job.total_rows else None,
+        "created_at": job.created_at.isoformat() if job.created_at else None,
+        "finished_at": job.finished_at.isoformat() if job.finished_at else None
+    }
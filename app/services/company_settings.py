@@ -0,0 +1,102 @@
+import threading
+import time
+from collections import namedtuple
+from flask import current_app
+from sqlalchemy import event, inspect
+from sqlalchemy.orm import Session
+from app.extensions import db
+from app.models.company import Company
+from app.utils.invalidation import InvalidationChannel
+
+# Company columns that switch a product module on or off
+MODULES = ('client_portal', 'bookings', 'invoicing', 'inventory', 'team_onboarding', 'field_reports', 'surveys', 'social_scheduler')
+
+CompanySettings = namedtuple('CompanySettings', ['modules', 'quota_tier'])
+
+class CompanySettingsCache:
+    """
+    Per-process copy of each company's enabled modules and quota tier, so the
+    checks made on every request cost no query. Committed changes drop the local
+    copy at once and are announced on a Redis channel (COMPANY_SETTINGS_REDIS_URL)
+    that every worker listens to; COMPANY_SETTINGS_TTL bounds staleness when a
+    message is missed.
+    """
+
+    def __init__(self):
+        self._entries = {}   # company_id -> (expires_at, CompanySettings)
+        self._version = 0    # Bumped by every invalidation
+        self._lock = threading.Lock()
+        self._channel = InvalidationChannel('COMPANY_SETTINGS_REDIS_URL', 'COMPANY_SETTINGS_CHANNEL', self.invalidate, self.clear)
+
+    def get(self, company_id):
+        """CompanySettings for company_id, or None when the company doesn't exist."""
+        cached = self._entries.get(company_id)
+        if cached and cached[0] > time.monotonic():
+            return cached[1]
+
+        self._channel.listen()
+        version = self._version
+        row = db.session.query(Company.quota_tier, *(getattr(Company, m) for m in MODULES)).filter_by(id=company_id).first()
+        if row is None:
+            return None
+        settings = CompanySettings(frozenset(m for m, enabled in zip(MODULES, row[1:]) if enabled), row[0])
+        with self._lock:
+            # An invalidation that landed during the query may be newer than what we read
+            if self._version == version:
+                self._entries[company_id] = (time.monotonic() + current_app.config['COMPANY_SETTINGS_TTL'], settings)
+        return settings
+
+    def invalidate(self, company_id):
+        with self._lock:
+            self._version += 1
+            self._entries.pop(company_id, None)
+
+    def clear(self):
+        with self._lock:
+            self._version += 1
+            self._entries.clear()
+
+    def publish(self, company_ids):
+        """Invalidates company_ids here and in every worker subscribed to the channel."""
+        for company_id in company_ids:
+            self.invalidate(company_id)
+        self._channel.publish(company_ids)
+
+company_settings = CompanySettingsCache()
+
+def module_flags(company):
+    return {module: bool(getattr(company, module)) for module in MODULES}
+
+def update_modules(company, changes):
+    """
+    Switches modules on company from a {module: bool} mapping; raises ValueError
+    for unknown modules or non-boolean values. Committing publishes the change.
+    """
+    unknown = sorted(set(changes) - set(MODULES))
+    if unknown:
+        raise ValueError(f"Unknown modules: {', '.join(unknown)}")
+    invalid = sorted(module for module, enabled in changes.items() if not isinstance(enabled, bool))
+    if invalid:
+        raise ValueError(f"Expected true or false for: {', '.join(invalid)}")
+    for module, enabled in changes.items():
+        setattr(company, module, enabled)
+
+_watched = MODULES + ('quota_tier',)
+
+@event.listens_for(Session, 'after_flush')
+def _collect_changes(session, flush_context):
+    changed = {obj.id for obj in session.deleted if isinstance(obj, Company)}
+    for obj in session.dirty:
+        if isinstance(obj, Company):
+            state = inspect(obj)
+            if any(state.attrs[name].history.has_changes() for name in _watched):
+                changed.add(obj.id)
+    if changed:
+        session.info.setdefault('company_settings', set()).update(changed)
+
+@event.listens_for(Session, 'after_commit')
+def _publish_changes(session):
+    # After commit, so a worker reloading on the message reads the new values
+    changed = session.info.pop('company_settings', None)
+    if changed:
+        company_settings.publish(sorted(changed))
@@ -0,0 +1,147 @@
+from collections import defaultdict
+from datetime import datetime
+from sqlalchemy import event, func, inspect, select
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.orm import Session
+from app.extensions import db
+from app.models.company import Company, CompanyStats
+from app.models.client import Client
+from app.models.booking import Booking
+from app.models.invoice import Invoice
+
+# counter -> (model, predicate on the row's status)
+COUNTERS = {
+    'clients': (Client, lambda status: True),
+    'pending_bookings': (Booking, lambda status: status == 'pending'),
+    'unpaid_invoices': (Invoice, lambda status: status != 'paid'),
+    'overdue_invoices': (Invoice, lambda status: status == 'overdue'),
+}
+
+stats_table = CompanyStats.__table__
+
+def _status(obj):
+    status = getattr(obj, 'status', None)
+    if status is None:
+        # Column defaults are only applied at INSERT time
+        status = type(obj).__table__.c.status.default.arg
+    return status
+
+def _count_query(counter):
+    model, _ = COUNTERS[counter]
+    query = select(model.company_id, func.count()).group_by(model.company_id)
+    if counter == 'pending_bookings':
+        query = query.where(Booking.status == 'pending')
+    elif counter == 'unpaid_invoices':
+        query = query.where(Invoice.status != 'paid')
+    elif counter == 'overdue_invoices':
+        query = query.where(Invoice.status == 'overdue')
+    return query
+
+def _full_counts(conn, company_id):
+    counts = {}
+    for counter, (model, _) in COUNTERS.items():
+        row = conn.execute(_count_query(counter).where(model.company_id == company_id)).first()
+        counts[counter] = row[1] if row else 0
+    return counts
+
+def _collect_deltas(session):
+    deltas = defaultdict(lambda: defaultdict(int))
+
+    for counter, (model, counts) in COUNTERS.items():
+        for obj in session.new:
+            if isinstance(obj, model) and counts(_status(obj)):
+                deltas[obj.company_id][counter] += 1
+
+        for obj in session.deleted:
+            if isinstance(obj, model) and counts(_status(obj)):
+                deltas[obj.company_id][counter] -= 1
+
+        if model is Client:
+            continue
+        for obj in session.dirty:
+            if not isinstance(obj, model):
+                continue
+            history = inspect(obj).attrs.status.history
+            if not history.has_changes():
+                continue
+            before = counts(history.deleted[0]) if history.deleted else False
+            after = counts(history.added[0]) if history.added else False
+            if before != after:
+                deltas[obj.company_id][counter] += 1 if after else -1
+
+    return deltas
+
+def apply_counter_deltas(conn, deltas, seed=True):
+    """
+    Adds {company_id: {counter: delta}} to the stored counters with atomic
+    increments. Also used by bulk jobs whose UPDATEs bypass the ORM; those
+    run after the change is written, so they pass seed=False and leave missing
+    rows to be seeded from the tables on first read.
+    """
+    now = datetime.utcnow()
+    for company_id, changes in deltas.items():
+        changes = {k: v for k, v in changes.items() if v}
+        if not changes:
+            continue
+        increment = (
+            stats_table.update()
+            .where(stats_table.c.company_id == company_id)
+            .values(updated_at=now, **{k: stats_table.c[k] + v for k, v in changes.items()})
+        )
+        if conn.execute(increment).rowcount or not seed:
+            continue
+
+        # First write for this company: seed from the rows already in the database
+        seeded = _full_counts(conn, company_id)
+        for k, v in changes.items():
+            seeded[k] += v
+        try:
+            with conn.begin_nested():
+                conn.execute(stats_table.insert().values(company_id=company_id, updated_at=now, **seeded))
+        except IntegrityError:
+            # A concurrent transaction seeded the row first
+            conn.execute(increment)
+
+@event.listens_for(Session, 'before_flush')
+def _track_counters(session, flush_context, instances):
+    deltas = _collect_deltas(session)
+    if deltas:
+        apply_counter_deltas(session.connection(), deltas)
+
+def reconcile_company_stats(company_id=None):
+    """
+    Recomputes counters from the source tables and repairs any drift, e.g.
+    from bulk UPDATEs that bypass ORM events. Returns the number of
+    companies whose counters changed.
+    """
+    company_ids = [company_id] if company_id else [c for (c,) in db.session.query(Company.id)]
+    actual = defaultdict(dict)
+    for counter in COUNTERS:
+        query = _count_query(counter)
+        if company_id:
+            query = query.where(COUNTERS[counter][0].company_id == company_id)
+        for cid, count in db.session.execute(query):
+            actual[cid][counter] = count
+
+    existing = {s.company_id: s for s in CompanyStats.query.filter(CompanyStats.company_id.in_(company_ids))}
+    repaired = 0
+    for cid in company_ids:
+        values = {counter: actual[cid].get(counter, 0) for counter in COUNTERS}
+        stats = existing.get(cid)
+        if stats is None:
+            db.session.add(CompanyStats(company_id=cid, **values))
+            repaired += 1
+        elif any(getattr(stats, k) != v for k, v in values.items()):
+            for k, v in values.items():
+                setattr(stats, k, v)
+            repaired += 1
+
+    db.session.commit()
+    return repaired
+
+def get_company_stats(company_id):
+    stats = db.session.get(CompanyStats, company_id)
+    if stats is None:
+        reconcile_company_stats(company_id)
+        stats = db.session.get(CompanyStats, company_id)
+    return stats
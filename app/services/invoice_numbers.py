@@ -0,0 +1,87 @@
+import re
+from collections import defaultdict
+from datetime import datetime
+from flask import current_app
+from sqlalchemy import event, select
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.orm import Session
+from app.extensions import db
+from app.models.invoice import Invoice, InvoiceSequence
+
+sequences_table = InvoiceSequence.__table__
+invoices_table = Invoice.__table__
+
+# Trailing digits of an invoice number, however it was formatted
+NUMBER_RE = re.compile(r'(\d+)\D*$')
+MAX_NUMBER = 2**31 - 1
+
+def _highest_number(conn, company_id):
+    """Largest number the company's existing invoices end in, 0 when none does."""
+    highest = 0
+    rows = conn.execute(select(invoices_table.c.invoice_number).where(invoices_table.c.company_id == company_id))
+    for (number,) in rows:
+        match = NUMBER_RE.search(number or '')
+        if match and int(match.group(1)) <= MAX_NUMBER:
+            highest = max(highest, int(match.group(1)))
+    return highest
+
+def _bump(conn, company_id, count):
+    """Advances the counter by count and returns the new last_number, or None if there is no row."""
+    bump = sequences_table.update().where(
+        sequences_table.c.company_id == company_id
+    ).values(last_number=sequences_table.c.last_number + count)
+
+    if conn.dialect.update_returning:
+        return conn.execute(bump.returning(sequences_table.c.last_number)).scalar()
+
+    # No RETURNING (SQLite < 3.35): the UPDATE already holds the write lock, so the read-back is ours
+    if not conn.execute(bump).rowcount:
+        return None
+    return conn.execute(
+        select(sequences_table.c.last_number).where(sequences_table.c.company_id == company_id)
+    ).scalar()
+
+def allocate_numbers(conn, company_id, count=1):
+    """
+    Reserves count consecutive invoice numbers for the company and returns them
+    as ints. The counter row stays locked until the transaction ends, so
+    concurrent allocations queue instead of colliding, and a rollback hands the
+    numbers back: as long as the invoices are inserted in the same transaction,
+    the sequence has no gaps.
+    """
+    last = _bump(conn, company_id, count)
+    if last is None:
+        # First invoice under the allocator: continue after the highest number already used
+        existing = _highest_number(conn, company_id)
+        try:
+            with conn.begin_nested():
+                conn.execute(sequences_table.insert().values(company_id=company_id, last_number=existing + count))
+            last = existing + count
+        except IntegrityError:
+            # A concurrent transaction created the row first
+            last = _bump(conn, company_id, count)
+    return list(range(last - count + 1, last + 1))
+
+def format_number(number):
+    return current_app.config['INVOICE_NUMBER_FORMAT'].format(number=number)
+
+def allocate_invoice_numbers(company_id, count=1):
+    """Block allocation for bulk imports; returns formatted numbers. Commit with the invoices."""
+    return [format_number(n) for n in allocate_numbers(db.session.connection(), company_id, count)]
+
+@event.listens_for(Session, 'before_flush')
+def _number_new_invoices(session, flush_context, instances):
+    pending = defaultdict(list)
+    for obj in session.new:
+        if isinstance(obj, Invoice) and not obj.invoice_number:
+            pending[obj.company_id].append(obj)
+    if not pending:
+        return
+
+    conn = session.connection()
+    # Sorted so concurrent flushes lock counter rows in the same order
+    for company_id in sorted(pending):
+        # Oldest first, invoices without a timestamp last; the key has one type either way
+        invoices = sorted(pending[company_id], key=lambda invoice: (invoice.created_at is None, invoice.created_at or datetime.min))
+        for invoice, number in zip(invoices, allocate_numbers(conn, company_id, len(invoices))):
+            invoice.invoice_number = format_number(number)
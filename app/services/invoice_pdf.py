@@ -0,0 +1,155 @@
+import glob
+import hashlib
+import json
+import os
+import tempfile
+import threading
+import time
+import redis
+from collections import OrderedDict
+from datetime import datetime
+from flask import current_app, render_template
+from app.extensions import db
+from app.models.company import Company
+from app.models.client import Client
+from app.models.invoice import Invoice
+
+# Bump when invoice.html changes so every cached PDF is re-rendered
+TEMPLATE_VERSION = 1
+
+def _parties(invoice):
+    company = db.session.get(Company, invoice.company_id)
+    client = db.session.get(Client, invoice.client_id) if invoice.client_id else None
+    return company, client
+
+def fingerprint(invoice):
+    """SHA-256 of everything that appears on the rendered invoice."""
+    company, client = _parties(invoice)
+    content = {
+        'template': TEMPLATE_VERSION,
+        'company': company.name if company else None,
+        'client': [client.name, client.email] if client else None,
+        'number': invoice.invoice_number,
+        'status': invoice.status,
+        'date': invoice.created_at.date().isoformat() if invoice.created_at else None,
+        'due_date': invoice.due_date.isoformat() if invoice.due_date else None,
+        'tax_rate': str(invoice.tax_rate),
+        'tax_amount': str(invoice.tax_amount),
+        'total_amount': str(invoice.total_amount),
+        'notes': invoice.notes,
+        'items': [
+            [item.id, item.description, str(item.quantity), str(item.unit_price), str(item.total_price)]
+            for item in sorted(invoice.items, key=lambda item: item.id)
+        ]
+    }
+    return hashlib.sha256(json.dumps(content, sort_keys=True).encode('utf-8')).hexdigest()
+
+def _pdf_dir(company_id):
+    # Absolute so send_file doesn't resolve it against the app package
+    return os.path.join(os.path.abspath(current_app.config['INVOICE_PDF_DIR']), str(company_id))
+
+def cached_pdf(invoice, digest=None):
+    """Returns (path, digest); path is None until this version has been rendered."""
+    digest = digest or fingerprint(invoice)
+    path = os.path.join(_pdf_dir(invoice.company_id), f"{invoice.id}-{digest}.pdf")
+    return (path if os.path.exists(path) else None), digest
+
+class RenderQueue:
+    """
+    Remembers which invoice versions already have a render job queued, so
+    clients polling for a PDF enqueue one job per version rather than one per
+    poll. Markers expire after INVOICE_PDF_RENDER_TTL, in case the job is lost;
+    with INVOICE_PDF_REDIS_URL set they are shared by every worker.
+    """
+
+    def __init__(self):
+        self._local = OrderedDict()  # (invoice_id, digest) -> expires_at
+        self._lock = threading.Lock()
+        self._redis = None
+        self._redis_url = None
+
+    def _get_redis(self):
+        url = current_app.config.get('INVOICE_PDF_REDIS_URL')
+        if not url:
+            return None
+        if self._redis is None or self._redis_url != url:
+            self._redis = redis.Redis.from_url(url, socket_timeout=0.1)
+            self._redis_url = url
+        return self._redis
+
+    def claim(self, invoice_id, digest):
+        """True when the caller should enqueue the render for this version."""
+        ttl = current_app.config['INVOICE_PDF_RENDER_TTL']
+        client = self._get_redis()
+        if client is not None:
+            try:
+                return bool(client.set(f"invoice-pdf:rendering:{invoice_id}:{digest}", 1, nx=True, ex=ttl))
+            except redis.RedisError:
+                # Fall back to this worker's markers; at worst each worker queues one render
+                pass
+
+        now = time.monotonic()
+        with self._lock:
+            # Every marker has the same TTL, so the oldest expire first
+            while self._local and next(iter(self._local.values())) <= now:
+                self._local.popitem(last=False)
+            if (invoice_id, digest) in self._local:
+                return False
+            self._local[(invoice_id, digest)] = now + ttl
+            return True
+
+render_queue = RenderQueue()
+
+def render_invoice_html(invoice):
+    subtotal = sum((item.total_price for item in invoice.items), 0)
+    company, client = _parties(invoice)
+    return render_template(
+        'invoices/invoice.html',
+        invoice=invoice,
+        items=sorted(invoice.items, key=lambda item: item.id),
+        subtotal=subtotal,
+        company=company,
+        client=client
+    )
+
+def render_invoice_pdf(invoice_id):
+    """
+    Renders the invoice unless the current version is already on disk, and
+    returns its path. Older versions of the same invoice are removed.
+    """
+    invoice = db.session.get(Invoice, invoice_id)
+    if invoice is None:
+        return None
+    path, digest = cached_pdf(invoice)
+    if path:
+        return path
+
+    # weasyprint pulls in pango/cairo, so only the render workers import it
+    from weasyprint import HTML
+    pdf = HTML(string=render_invoice_html(invoice)).write_pdf()
+
+    directory = _pdf_dir(invoice.company_id)
+    os.makedirs(directory, exist_ok=True)
+    path = os.path.join(directory, f"{invoice.id}-{digest}.pdf")
+    # Write then rename, so readers never see a half-written file
+    fd, tmp_path = tempfile.mkstemp(dir=directory, suffix='.tmp')
+    with os.fdopen(fd, 'wb') as out:
+        out.write(pdf)
+    os.replace(tmp_path, path)
+
+    for stale in glob.glob(os.path.join(directory, f"{invoice.id}-*.pdf")):
+        if stale != path:
+            os.remove(stale)
+    return path
+
+def sent_invoice_ids(year, month, company_id=None):
+    start = datetime(year, month, 1)
+    end = datetime(year + month // 12, month % 12 + 1, 1)
+    query = db.session.query(Invoice.id).filter(
+        Invoice.status == 'sent',
+        Invoice.created_at >= start,
+        Invoice.created_at < end
+    ).order_by(Invoice.id)
+    if company_id is not None:
+        query = query.filter(Invoice.company_id == company_id)
+    return [invoice_id for (invoice_id,) in query]
@@ -0,0 +1,143 @@
+from decimal import Decimal, ROUND_HALF_UP
+from sqlalchemy import bindparam, event, inspect, select
+from sqlalchemy.orm import Session
+from sqlalchemy.orm.attributes import set_committed_value
+from app.extensions import db
+from app.models.invoice import Invoice, InvoiceItem
+
+CENT = Decimal('0.01')
+ZERO = Decimal('0.00')
+
+invoices_table = Invoice.__table__
+items_table = InvoiceItem.__table__
+
+def _money(value):
+    return value.quantize(CENT, rounding=ROUND_HALF_UP)
+
+def _decimal(value, default=ZERO):
+    # SQLite hands numerics back as floats on raw connections
+    return default if value is None else Decimal(str(value))
+
+def line_total(quantity, unit_price):
+    return _money(_decimal(quantity, Decimal('1')) * _decimal(unit_price))
+
+def invoice_totals(line_totals, tax_rate):
+    """
+    Returns (tax_amount, total_amount) for an invoice. Tax is tax_rate percent of
+    the rounded subtotal; total_amount includes tax.
+    """
+    subtotal = sum(line_totals, ZERO)
+    tax = _money(subtotal * _decimal(tax_rate) / 100)
+    return tax, subtotal + tax
+
+def _recompute(conn, invoice_ids):
+    """
+    Recomputes line and invoice totals for invoice_ids in one read per table and
+    writes back only rows that changed. Returns {invoice_id: (tax, total)} for changed invoices.
+    """
+    items = conn.execute(
+        select(items_table.c.id, items_table.c.invoice_id, items_table.c.quantity,
+               items_table.c.unit_price, items_table.c.total_price)
+        .where(items_table.c.invoice_id.in_(invoice_ids))
+    )
+    lines = {invoice_id: [] for invoice_id in invoice_ids}
+    item_updates = []
+    for item_id, invoice_id, quantity, unit_price, stored in items:
+        total = line_total(quantity, unit_price)
+        lines[invoice_id].append(total)
+        if stored is None or _decimal(stored) != total:
+            item_updates.append({'b_id': item_id, 'total_price': total})
+
+    invoices = conn.execute(
+        select(invoices_table.c.id, invoices_table.c.tax_rate,
+               invoices_table.c.tax_amount, invoices_table.c.total_amount)
+        .where(invoices_table.c.id.in_(invoice_ids))
+    )
+    changed = {}
+    for invoice_id, tax_rate, stored_tax, stored_total in invoices:
+        tax, total = invoice_totals(lines[invoice_id], tax_rate)
+        if _decimal(stored_tax, None) != tax or _decimal(stored_total, None) != total:
+            changed[invoice_id] = (tax, total)
+
+    if item_updates:
+        conn.execute(
+            items_table.update().where(items_table.c.id == bindparam('b_id')),
+            item_updates
+        )
+    if changed:
+        conn.execute(
+            invoices_table.update().where(invoices_table.c.id == bindparam('b_id')),
+            [{'b_id': i, 'tax_amount': tax, 'total_amount': total} for i, (tax, total) in changed.items()]
+        )
+    return changed
+
+def recompute_invoices(company_id=None, batch_size=1000):
+    """
+    Recomputes every invoice (optionally one company's) in id-ordered batches,
+    committing per batch. Returns the number of invoices whose totals changed.
+    """
+    query = db.session.query(Invoice.id).order_by(Invoice.id)
+    if company_id is not None:
+        query = query.filter(Invoice.company_id == company_id)
+
+    changed = 0
+    last_id = 0
+    while True:
+        ids = [i for (i,) in query.filter(Invoice.id > last_id).limit(batch_size)]
+        if not ids:
+            break
+        changed += len(_recompute(db.session.connection(), ids))
+        db.session.commit()
+        last_id = ids[-1]
+    return changed
+
+@event.listens_for(Session, 'before_flush')
+def _track_invoice_edits(session, flush_context, instances):
+    touched = session.info.setdefault('invoice_totals', set())
+
+    for obj in list(session.new) + list(session.dirty):
+        if isinstance(obj, InvoiceItem):
+            state = inspect(obj)
+            if obj.total_price is None or state.attrs.quantity.history.has_changes() \
+                    or state.attrs.unit_price.history.has_changes():
+                obj.total_price = line_total(obj.quantity, obj.unit_price)
+                touched.add(obj)
+            elif obj in session.new or state.attrs.invoice_id.history.has_changes() \
+                    or state.attrs.invoice.history.has_changes():
+                touched.add(obj)
+        elif isinstance(obj, Invoice):
+            state = inspect(obj)
+            if obj in session.new or state.attrs.tax_rate.history.has_changes() \
+                    or state.attrs['items'].history.has_changes():
+                touched.add(obj)
+
+    for obj in session.deleted:
+        if isinstance(obj, InvoiceItem):
+            touched.add(obj)
+
+@event.listens_for(Session, 'after_flush')
+def _update_invoice_totals(session, flush_context):
+    touched = session.info.pop('invoice_totals', None)
+    if not touched:
+        return
+
+    invoice_ids = set()
+    for obj in touched:
+        if isinstance(obj, Invoice):
+            invoice_ids.add(obj.id)
+        else:
+            # Covers both the item's current invoice and the one it was moved from
+            history = inspect(obj).attrs.invoice_id.history
+            invoice_ids.update(i for i in history.sum() if i is not None)
+            if obj.invoice is not None:
+                invoice_ids.add(obj.invoice.id)
+    invoice_ids.discard(None)
+    if not invoice_ids:
+        return
+
+    changed = _recompute(session.connection(), sorted(invoice_ids))
+    for invoice_id, (tax, total) in changed.items():
+        invoice = session.identity_map.get(session.identity_key(Invoice, invoice_id))
+        if invoice is not None:
+            set_committed_value(invoice, 'tax_amount', tax)
+            set_committed_value(invoice, 'total_amount', total)
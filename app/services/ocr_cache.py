@@ -0,0 +1,73 @@
+import hashlib
+import threading
+from collections import OrderedDict
+from flask import current_app
+from sqlalchemy.exc import IntegrityError
+from app.extensions import db
+from app.models.invoice import OcrResult
+
+CHUNK_SIZE = 64 * 1024
+
+class OCRResultCache:
+    """
+    OCR results keyed by (company_id, content hash). A small in-process LRU
+    sits in front of the ocr_results table so repeat uploads skip the query too.
+    """
+
+    def __init__(self):
+        self._lru = OrderedDict()
+        self._lock = threading.Lock()
+
+    def _remember(self, key, data):
+        max_size = current_app.config.get('OCR_RESULT_CACHE_SIZE', 0)
+        if not max_size:
+            return
+        with self._lock:
+            self._lru[key] = data
+            self._lru.move_to_end(key)
+            while len(self._lru) > max_size:
+                self._lru.popitem(last=False)
+
+    def get(self, company_id, content_hash):
+        if not content_hash:
+            return None
+        key = (company_id, content_hash)
+        with self._lock:
+            if key in self._lru:
+                self._lru.move_to_end(key)
+                return self._lru[key]
+
+        result = OcrResult.query.filter_by(company_id=company_id, content_hash=content_hash).first()
+        if result is None:
+            return None
+        self._remember(key, result.data)
+        return result.data
+
+    def put(self, company_id, content_hash, data):
+        if not content_hash:
+            return
+        try:
+            with db.session.begin_nested():
+                db.session.add(OcrResult(company_id=company_id, content_hash=content_hash, data=data))
+        except IntegrityError:
+            # Another worker stored the same file first; its result is just as good
+            pass
+        self._remember((company_id, content_hash), data)
+
+    def clear(self):
+        with self._lock:
+            self._lru.clear()
+
+ocr_cache = OCRResultCache()
+
+def save_and_hash(file, path):
+    """Streams an uploaded file to path and returns its SHA-256 hex digest."""
+    digest = hashlib.sha256()
+    with open(path, 'wb') as out:
+        while True:
+            chunk = file.stream.read(CHUNK_SIZE)
+            if not chunk:
+                break
+            digest.update(chunk)
+            out.write(chunk)
+    return digest.hexdigest()
@@ -0,0 +1,66 @@
+from collections import defaultdict
+from datetime import datetime
+from blinker import Namespace
+from sqlalchemy import select
+from app.extensions import db
+from app.models.invoice import Invoice
+from app.services.dashboard_stats import apply_counter_deltas
+
+signals = Namespace()
+
+# Sent once per company and batch with invoice_ids=[...], after the batch commits
+invoices_overdue = signals.signal('invoices-overdue')
+
+invoices_table = Invoice.__table__
+
+def _sweep_batch(now, batch_size):
+    """Flips one batch of past-due sent invoices to overdue. Returns [(id, company_id)] it changed."""
+    due = select(invoices_table.c.id).where(
+        invoices_table.c.status == 'sent',
+        invoices_table.c.due_date < now
+    ).order_by(invoices_table.c.id).limit(batch_size)
+    if db.engine.dialect.name == 'postgresql':
+        # Concurrent sweepers take disjoint batches instead of queueing on the same rows
+        due = due.with_for_update(skip_locked=True)
+
+    # status = 'sent' is re-checked by the UPDATE itself, so a row another
+    # worker already flipped is never returned twice
+    update = invoices_table.update().where(
+        invoices_table.c.id.in_(due),
+        invoices_table.c.status == 'sent'
+    ).values(status='overdue').returning(invoices_table.c.id, invoices_table.c.company_id)
+
+    try:
+        rows = db.session.execute(update).all()
+        deltas = defaultdict(lambda: defaultdict(int))
+        for _, company_id in rows:
+            deltas[company_id]['overdue_invoices'] += 1
+        apply_counter_deltas(db.session.connection(), deltas, seed=False)
+        db.session.commit()
+    except Exception:
+        db.session.rollback()
+        raise
+    return rows
+
+def mark_overdue_invoices(batch_size=1000, now=None):
+    """
+    Moves every sent invoice past its due date to overdue, one indexed
+    UPDATE per batch. Returns the number of invoices changed.
+    """
+    now = now or datetime.utcnow()
+    changed = 0
+    while True:
+        rows = _sweep_batch(now, batch_size)
+        if not rows:
+            break
+        changed += len(rows)
+
+        by_company = defaultdict(list)
+        for invoice_id, company_id in rows:
+            by_company[company_id].append(invoice_id)
+        for company_id, invoice_ids in by_company.items():
+            invoices_overdue.send(company_id, invoice_ids=invoice_ids)
+
+        if len(rows) < batch_size:
+            break
+    return changed
@@ -0,0 +1,111 @@
+import os
+import threading
+import time
+from concurrent.futures import ProcessPoolExecutor
+import bcrypt
+from flask import current_app
+
+class PasswordHasherBusy(Exception):
+    """Raised when too many hashes are already queued for this worker."""
+
+def _hash(password, rounds):
+    return bcrypt.hashpw(password.encode('utf-8'), bcrypt.gensalt(rounds)).decode('utf-8')
+
+def _check(password_hash, password):
+    return bcrypt.checkpw(password.encode('utf-8'), password_hash.encode('utf-8'))
+
+class PasswordHasher:
+    """
+    Runs bcrypt off the request thread in a bounded process pool so a burst
+    of logins can't starve the worker that serves other requests.
+    Pool size and queue bound come from PASSWORD_HASH_WORKERS and
+    PASSWORD_HASH_MAX_QUEUE; 0 workers hashes inline.
+    """
+
+    def __init__(self):
+        self._pool = None
+        self._pool_pid = None
+        self._pool_size = None
+        self._lock = threading.Lock()
+        self.reset_stats()
+
+    def reset_stats(self):
+        self.in_flight = 0
+        self.completed = 0
+        self.rejected = 0
+        self.total_latency = 0.0
+        self.max_latency = 0.0
+
+    @property
+    def rounds(self):
+        return current_app.config.get('BCRYPT_LOG_ROUNDS', 12)
+
+    def _get_pool(self, size):
+        # Pools don't survive a fork, so pre-forking servers get one per worker process
+        if self._pool is None or self._pool_pid != os.getpid() or self._pool_size != size:
+            if self._pool is not None and self._pool_pid == os.getpid():
+                self._pool.shutdown(wait=False)
+            self._pool = ProcessPoolExecutor(max_workers=size)
+            self._pool_pid = os.getpid()
+            self._pool_size = size
+        return self._pool
+
+    def _run(self, fn, *args):
+        workers = current_app.config.get('PASSWORD_HASH_WORKERS', 0)
+        max_queue = current_app.config.get('PASSWORD_HASH_MAX_QUEUE', 64)
+
+        with self._lock:
+            if self.in_flight >= max_queue:
+                self.rejected += 1
+                raise PasswordHasherBusy()
+            self.in_flight += 1
+            pool = self._get_pool(workers) if workers else None
+
+        started = time.perf_counter()
+        try:
+            return pool.submit(fn, *args).result() if pool else fn(*args)
+        finally:
+            elapsed = time.perf_counter() - started
+            with self._lock:
+                self.in_flight -= 1
+                self.completed += 1
+                self.total_latency += elapsed
+                self.max_latency = max(self.max_latency, elapsed)
+
+    def hash(self, password):
+        return self._run(_hash, password, self.rounds)
+
+    def hash_many(self, passwords, pool=None):
+        """
+        Hashes a batch for bulk jobs, spread over pool (a ProcessPoolExecutor
+        owned by the caller) or inline without one. Not subject to the request
+        queue bound, so never call it from a request handler.
+        """
+        rounds = self.rounds
+        if pool is None:
+            return [_hash(password, rounds) for password in passwords]
+        return list(pool.map(_hash, passwords, [rounds] * len(passwords), chunksize=16))
+
+    def check(self, password_hash, password):
+        if not password or not password_hash:
+            return False
+        return self._run(_check, password_hash, password)
+
+    def needs_rehash(self, password_hash):
+        # bcrypt hashes look like $2b$<cost>$<salt+digest>
+        try:
+            return int(password_hash.split('$')[2]) != self.rounds
+        except (IndexError, ValueError):
+            return True
+
+    def stats(self):
+        with self._lock:
+            return {
+                "queue_depth": self.in_flight,
+                "completed": self.completed,
+                "rejected": self.rejected,
+                "avg_latency_ms": round(self.total_latency / self.completed * 1000, 2) if self.completed else 0.0,
+                "max_latency_ms": round(self.max_latency * 1000, 2)
+            }
+
+password_hasher = PasswordHasher()
@@ -0,0 +1,169 @@
+import hashlib
+import threading
+import time
+import redis
+from collections import OrderedDict
+from functools import wraps
+from flask import current_app, make_response, request
+from sqlalchemy import event
+from sqlalchemy.orm import Session, object_session
+from app.models.booking import Service
+from app.models.reports import Survey
+
+class ResponseCache:
+    """
+    Serialized responses of public read endpoints, keyed by namespace, company
+    and query string. Each worker keeps an LRU with a short TTL; an optional
+    Redis tier (PUBLIC_CACHE_REDIS_URL) is shared by every worker. Writes bump a
+    per-(namespace, company) generation, so entries from before the change are
+    never served again, even by requests that were already in flight.
+    """
+
+    def __init__(self):
+        self._lru = OrderedDict()  # (namespace, company_id, generation, query) -> (expires_at, etag, body)
+        self._generations = {}     # (namespace, company_id) -> int
+        self._lock = threading.Lock()
+        self._redis = None
+        self._redis_url = None
+        self._models = {}          # model -> namespace
+
+    def _get_redis(self):
+        url = current_app.config.get('PUBLIC_CACHE_REDIS_URL')
+        if not url:
+            return None
+        if self._redis is None or self._redis_url != url:
+            self._redis = redis.Redis.from_url(url, socket_timeout=0.1)
+            self._redis_url = url
+        return self._redis
+
+    @staticmethod
+    def _redis_key(namespace, company_id, generation, query):
+        digest = hashlib.sha256(repr(query).encode('utf-8')).hexdigest()[:32]
+        return f"response-cache:{namespace}:{company_id}:{generation}:{digest}"
+
+    def lookup(self, namespace, company_id, query):
+        """Returns ((etag, body) or None, token); pass the token back to store()."""
+        now = time.monotonic()
+        with self._lock:
+            generation = self._generations.get((namespace, company_id), 0)
+            key = (namespace, company_id, generation, query)
+            cached = self._lru.get(key)
+            if cached and cached[0] > now:
+                self._lru.move_to_end(key)
+                return cached[1:], (generation, None)
+
+        client = self._get_redis()
+        if client is None:
+            return None, (generation, None)
+        try:
+            shared = int(client.get(f"response-cache:gen:{namespace}:{company_id}") or 0)
+            stored = client.get(self._redis_key(namespace, company_id, shared, query))
+        except redis.RedisError:
+            # The shared tier is an optimisation; fall through to the database
+            return None, (generation, None)
+        if stored is None:
+            return None, (generation, shared)
+        etag, body = stored.split(b'\n', 1)
+        entry = (etag.decode('ascii'), body)
+        self._remember(namespace, company_id, generation, query, entry)
+        return entry, (generation, None)
+
+    def _remember(self, namespace, company_id, generation, query, entry):
+        max_size = current_app.config['PUBLIC_CACHE_SIZE']
+        with self._lock:
+            self._lru[(namespace, company_id, generation, query)] = (time.monotonic() + current_app.config['PUBLIC_CACHE_TTL'],) + entry
+            self._lru.move_to_end((namespace, company_id, generation, query))
+            while len(self._lru) > max_size:
+                self._lru.popitem(last=False)
+
+    def store(self, namespace, company_id, query, token, body):
+        """Caches body under the generations seen by lookup() and returns (etag, body)."""
+        generation, shared = token
+        entry = (hashlib.sha256(body).hexdigest()[:32], body)
+        self._remember(namespace, company_id, generation, query, entry)
+        client = self._get_redis() if shared is not None else None
+        if client is not None:
+            try:
+                client.setex(self._redis_key(namespace, company_id, shared, query),
+                             current_app.config['PUBLIC_CACHE_REDIS_TTL'], entry[0].encode('ascii') + b'\n' + body)
+            except redis.RedisError:
+                pass
+        return entry
+
+    def invalidate(self, namespace, company_id):
+        with self._lock:
+            self._generations[(namespace, company_id)] = self._generations.get((namespace, company_id), 0) + 1
+        client = self._get_redis()
+        if client is not None:
+            try:
+                client.incr(f"response-cache:gen:{namespace}:{company_id}")
+            except redis.RedisError:
+                # Other workers catch up when their local copies expire
+                pass
+
+    def clear(self):
+        with self._lock:
+            self._lru.clear()
+            self._generations.clear()
+
+    def watch(self, model, namespace):
+        """Invalidates namespace for a company whenever one of its model rows changes."""
+        self._models[model] = namespace
+        # active_history loads the old value, which is the only record of a row's previous company
+        event.listen(model.company_id, 'set', _company_changed, active_history=True)
+
+    def cached(self, namespace):
+        """
+        Decorator for public views scoped by the company_id query param. 200
+        responses are cached with a strong ETag; matching If-None-Match gets 304.
+        """
+        def decorator(f):
+            @wraps(f)
+            def decorated(*args, **kwargs):
+                company_id = request.args.get('company_id', type=int)
+                if company_id is None:
+                    return f(*args, **kwargs)
+
+                query = tuple(sorted(request.args.items(multi=True)))
+                entry, token = self.lookup(namespace, company_id, query)
+                if entry is None:
+                    response = make_response(f(*args, **kwargs))
+                    if response.status_code != 200:
+                        return response
+                    entry = self.store(namespace, company_id, query, token, response.get_data())
+
+                etag, body = entry
+                response = current_app.response_class(body, mimetype='application/json')
+                response.set_etag(etag)
+                response.cache_control.public = True
+                response.cache_control.max_age = current_app.config['PUBLIC_CACHE_MAX_AGE']
+                return response.make_conditional(request)
+            return decorated
+        return decorator
+
+response_cache = ResponseCache()
+
+def _company_changed(target, value, oldvalue, initiator):
+    # A row moving between companies changes the old company's pages too
+    session = object_session(target)
+    if session is not None and isinstance(oldvalue, int) and oldvalue != value:
+        session.info.setdefault('response_cache', set()).add((response_cache._models[type(target)], oldvalue))
+
+@event.listens_for(Session, 'after_flush')
+def _collect_changes(session, flush_context):
+    changed = set()
+    for obj in list(session.new) + list(session.dirty) + list(session.deleted):
+        namespace = response_cache._models.get(type(obj))
+        if namespace is not None and (obj not in session.dirty or session.is_modified(obj)):
+            changed.add((namespace, obj.company_id))
+    if changed:
+        session.info.setdefault('response_cache', set()).update(changed)
+
+@event.listens_for(Session, 'after_commit')
+def _invalidate_changes(session):
+    # After commit, so a concurrent reader can't re-cache the old rows
+    for namespace, company_id in session.info.pop('response_cache', ()):
+        response_cache.invalidate(namespace, company_id)
+
+response_cache.watch(Service, 'services')
+response_cache.watch(Survey, 'surveys')
@@ -0,0 +1,149 @@
+import re
+from datetime import datetime
+from sqlalchemy import event, inspect, text
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.orm import Session
+from app.extensions import db
+from app.models.client import Client, ProjectUpdate
+from app.models.inventory import Product
+from app.models.reports import FieldReport
+from app.models.search import SearchDocument
+
+documents_table = SearchDocument.__table__
+
+# kind -> (model, fields that feed the document, (title, body) builder)
+SEARCHABLE = {
+    'client': (Client, ('name', 'email'),
+               lambda c: (c.name or c.email, c.email)),
+    'product': (Product, ('name', 'sku', 'description'),
+                lambda p: (p.name, ' '.join(filter(None, (p.sku, p.description))))),
+    'project_update': (ProjectUpdate, ('title', 'content'),
+                       lambda u: (u.title, u.content)),
+    'field_report': (FieldReport, ('title', 'content', 'location'),
+                     lambda r: (r.title, ' '.join(filter(None, (r.content, r.location))))),
+}
+_kinds = {model: kind for kind, (model, _, _) in SEARCHABLE.items()}
+
+MAX_TERMS = 8
+
+def _document(kind, obj):
+    title, body = SEARCHABLE[kind][2](obj)
+    return {'company_id': obj.company_id, 'title': (title or '')[:255], 'body': body, 'updated_at': datetime.utcnow()}
+
+def _upsert(conn, kind, object_id, values):
+    match = (documents_table.c.kind == kind, documents_table.c.object_id == object_id)
+    if conn.execute(documents_table.update().where(*match).values(**values)).rowcount:
+        return
+    try:
+        with conn.begin_nested():
+            conn.execute(documents_table.insert().values(kind=kind, object_id=object_id, **values))
+    except IntegrityError:
+        # A concurrent flush indexed the record first
+        conn.execute(documents_table.update().where(*match).values(**values))
+
+def _changed(obj, fields):
+    state = inspect(obj)
+    return any(state.attrs[field].history.has_changes() for field in fields)
+
+@event.listens_for(Session, 'after_flush')
+def _sync_search_documents(session, flush_context):
+    added, changed, removed = [], [], []
+    for obj in session.new:
+        kind = _kinds.get(type(obj))
+        if kind is not None:
+            added.append(dict(_document(kind, obj), kind=kind, object_id=obj.id))
+    for obj in session.dirty:
+        kind = _kinds.get(type(obj))
+        if kind is not None and _changed(obj, SEARCHABLE[kind][1] + ('company_id',)):
+            changed.append((kind, obj.id, _document(kind, obj)))
+    for obj in session.deleted:
+        kind = _kinds.get(type(obj))
+        if kind is not None:
+            removed.append((kind, obj.id))
+    if not added and not changed and not removed:
+        return
+
+    conn = session.connection()
+    if added:
+        conn.execute(documents_table.insert(), added)
+    for kind, object_id, values in changed:
+        _upsert(conn, kind, object_id, values)
+    for kind, object_id in removed:
+        conn.execute(documents_table.delete().where(
+            documents_table.c.kind == kind, documents_table.c.object_id == object_id
+        ))
+
+def reindex(company_id=None, batch_size=1000):
+    """
+    Rebuilds search documents from the source tables, for backfills and after
+    bulk loads that bypass the ORM. Returns the number of documents written.
+    """
+    stale = SearchDocument.query
+    if company_id is not None:
+        stale = stale.filter_by(company_id=company_id)
+    stale.delete(synchronize_session=False)
+
+    written = 0
+    for kind, (model, fields, _) in SEARCHABLE.items():
+        # Plain rows: the builders only read the listed fields
+        columns = [model.id, model.company_id] + [getattr(model, field) for field in fields]
+        rows = db.session.query(*columns).order_by(model.id)
+        if company_id is not None:
+            rows = rows.filter(model.company_id == company_id)
+        batch = []
+        for obj in rows.execution_options(yield_per=batch_size):
+            batch.append(dict(_document(kind, obj), kind=kind, object_id=obj.id))
+            if len(batch) >= batch_size:
+                db.session.execute(documents_table.insert(), batch)
+                written += len(batch)
+                batch = []
+        if batch:
+            db.session.execute(documents_table.insert(), batch)
+            written += len(batch)
+    db.session.commit()
+    return written
+
+def _terms(query):
+    return re.findall(r'\w+', query.lower())[:MAX_TERMS]
+
+def _kind_filter(kinds, params):
+    if not kinds:
+        return ''
+    params.update({f'kind_{i}': kind for i, kind in enumerate(kinds)})
+    return ' AND d.kind IN (' + ', '.join(f':kind_{i}' for i in range(len(kinds))) + ')'
+
+def search(company_id, query, kinds=None, limit=20):
+    """
+    Ranked, tenant-scoped search; every term matches as a prefix and all terms
+    must match. Titles weigh more than bodies. Returns [] when query has no words.
+    """
+    terms = _terms(query)
+    if not terms:
+        return []
+
+    params = {'company_id': company_id, 'limit': limit}
+    if db.engine.dialect.name == 'postgresql':
+        params['query'] = ' & '.join(f'{term}:*' for term in terms)
+        sql = (
+            "SELECT d.kind, d.object_id, d.title, d.body, ts_rank(d.search_vector, q) AS score "
+            "FROM search_documents d, to_tsquery('simple', :query) q "
+            "WHERE d.company_id = :company_id AND d.search_vector @@ q" + _kind_filter(kinds, params) +
+            " ORDER BY score DESC, d.id LIMIT :limit"
+        )
+    else:
+        params['query'] = f'tenant : "t{company_id}" AND {{title body}} : (' + ' AND '.join(f'"{term}"*' for term in terms) + ')'
+        # bm25 is lower-is-better; weights are (tenant, title, body)
+        sql = (
+            "SELECT d.kind, d.object_id, d.title, d.body, -bm25(search_documents_fts, 0.0, 10.0, 1.0) AS score "
+            "FROM search_documents_fts JOIN search_documents d ON d.id = search_documents_fts.rowid "
+            "WHERE search_documents_fts MATCH :query AND d.company_id = :company_id" + _kind_filter(kinds, params) +
+            " ORDER BY score DESC, d.id LIMIT :limit"
+        )
+
+    return [{
+        "kind": kind,
+        "id": object_id,
+        "title": title,
+        "excerpt": (body or '')[:200],
+        "score": round(float(score), 4)
+    } for kind, object_id, title, body, score in db.session.execute(text(sql), params)]
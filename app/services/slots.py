@@ -0,0 +1,246 @@
+import threading
+import time
+from collections import OrderedDict, defaultdict
+from datetime import datetime, timedelta
+from flask import current_app
+from sqlalchemy import event, inspect
+from sqlalchemy.orm import Session
+from app.extensions import db
+from app.models.booking import Service, Availability, Booking
+from app.models.user import User
+
+# Bookings in these states no longer hold their slot
+RELEASED_STATUSES = ('cancelled', 'no-show')
+
+def _subtract(start, end, blocked):
+    """
+    Yields the sub-ranges of [start, end] not covered by any open interval in blocked.
+    blocked must be sorted by start.
+    """
+    cursor = start
+    for b_start, b_end in blocked:
+        if b_end <= cursor:
+            continue
+        if b_start >= end:
+            break
+        if b_start >= cursor:
+            yield cursor, b_start
+        cursor = max(cursor, b_end)
+    if cursor <= end:
+        yield cursor, end
+
+class SlotEngine:
+    """
+    Computes bookable slots by sweeping each staff member's availability
+    windows against their sorted busy intervals. Busy intervals are cached
+    per staff member and day, and invalidated once changes to bookings,
+    availability, services or staff are committed. Both caches are LRUs
+    bounded by SLOT_CACHE_SIZE, since their keys come from public requests.
+    """
+
+    def __init__(self):
+        self._busy = OrderedDict()     # (company_id, staff_id, day) -> (expires_at, [(start, end)])
+        self._windows = OrderedDict()  # company_id -> (expires_at, {staff_id: {weekday: [(start, end)]}})
+        self._version = 0              # Bumped by every invalidation
+        self._lock = threading.Lock()
+
+    def _ttl(self):
+        # Bounds staleness across worker processes; local changes invalidate immediately
+        return current_app.config.get('SLOT_CACHE_TTL', 60)
+
+    def _lookup(self, cache, key, now):
+        with self._lock:
+            cached = cache.get(key)
+            if cached and cached[0] > now:
+                cache.move_to_end(key)
+                return cached[1]
+        return None
+
+    def _remember(self, cache, entries, version):
+        max_size = current_app.config['SLOT_CACHE_SIZE']
+        with self._lock:
+            # A change committed while we were querying makes what we read stale
+            if self._version != version:
+                return
+            for key, value in entries:
+                cache[key] = value
+                cache.move_to_end(key)
+            while len(cache) > max_size:
+                cache.popitem(last=False)
+
+    def _get_windows(self, company_id):
+        now = time.monotonic()
+        cached = self._lookup(self._windows, company_id, now)
+        if cached is not None:
+            return cached
+        version = self._version
+
+        rows = db.session.query(
+            Availability.staff_id, Availability.day_of_week, Availability.start_time, Availability.end_time
+        ).filter_by(company_id=company_id, is_active=True)
+
+        windows = defaultdict(lambda: defaultdict(list))
+        for staff_id, weekday, start, end in rows:
+            windows[staff_id][weekday].append((start, end))
+
+        # Only active staff can be booked. Company-wide hours (no staff_id)
+        # apply to those without their own schedule
+        general = windows.pop(None, None)
+        active = {staff_id for (staff_id,) in db.session.query(User.id).filter_by(company_id=company_id, status='active')}
+        if general:
+            for staff_id in active:
+                windows.setdefault(staff_id, general)
+
+        result = {staff_id: dict(days) for staff_id, days in windows.items() if staff_id in active}
+        self._remember(self._windows, [(company_id, (now + self._ttl(), result))], version)
+        return result
+
+    def _get_busy(self, company_id, staff_ids, days):
+        now = time.monotonic()
+        busy = {}
+        missing = False
+        for staff_id in staff_ids:
+            for day in days:
+                cached = self._lookup(self._busy, (company_id, staff_id, day), now)
+                if cached is not None:
+                    busy[(staff_id, day)] = cached
+                else:
+                    missing = True
+        if not missing:
+            return busy
+        version = self._version
+
+        # One indexed range query fills every (staff, day) in the request
+        range_start = datetime.combine(days[0], datetime.min.time())
+        range_end = datetime.combine(days[-1], datetime.min.time()) + timedelta(days=1)
+        fresh = {(staff_id, day): [] for staff_id in staff_ids for day in days}
+        rows = db.session.query(
+            Booking.staff_id, Booking.booking_time, Service.duration, Service.buffer_time
+        ).join(Service, Booking.service_id == Service.id).filter(
+            Booking.staff_id.in_(staff_ids),
+            Booking.booking_time >= range_start - timedelta(days=1),
+            Booking.booking_time < range_end,
+            Booking.status.notin_(RELEASED_STATUSES)
+        )
+        for staff_id, start, duration, buffer_time in rows:
+            end = start + timedelta(minutes=duration + (buffer_time or 0))
+            day = start.date()
+            # A booking that runs past midnight also blocks the next day
+            while datetime.combine(day, datetime.min.time()) < end:
+                if (staff_id, day) in fresh:
+                    fresh[(staff_id, day)].append((start, end))
+                day += timedelta(days=1)
+
+        expires_at = now + self._ttl()
+        for intervals in fresh.values():
+            intervals.sort()
+        self._remember(self._busy, [((company_id,) + key, (expires_at, intervals)) for key, intervals in fresh.items()], version)
+        return fresh
+
+    def find_slots(self, company_id, service, start_day, end_day, staff_id=None):
+        """Returns {staff_id: [slot start datetimes]} for service between start_day and end_day inclusive."""
+        step = timedelta(minutes=current_app.config.get('SLOT_STEP_MINUTES', 15))
+        duration = timedelta(minutes=service.duration)
+        buffer_time = timedelta(minutes=service.buffer_time or 0)
+        earliest = datetime.utcnow()
+
+        windows = self._get_windows(company_id)
+        staff_ids = sorted(s for s in windows if staff_id is None or s == staff_id)
+        # Past days have no bookable slots, so they are neither queried nor cached
+        start_day = max(start_day, earliest.date())
+        days = [start_day + timedelta(days=i) for i in range((end_day - start_day).days + 1)]
+        if not staff_ids or not days:
+            return {}
+        busy = self._get_busy(company_id, staff_ids, days)
+
+        slots = {}
+        for sid in staff_ids:
+            found = []
+            for day in days:
+                # A new booking starting at t conflicts with [s, e] when s - duration - buffer < t < e
+                blocked = [(s - duration - buffer_time, e) for s, e in busy[(sid, day)]]
+                for w_start, w_end in sorted(windows[sid].get(day.weekday(), [])):
+                    anchor = datetime.combine(day, w_start)
+                    last_start = datetime.combine(day, w_end) - duration
+                    for free_start, free_end in _subtract(max(anchor, earliest), last_start, blocked):
+                        offset = -((anchor - free_start) // step)
+                        t = anchor + offset * step
+                        while t <= free_end:
+                            found.append(t)
+                            t += step
+            if found:
+                slots[sid] = found
+        return slots
+
+    def invalidate_staff(self, staff_id, day=None):
+        with self._lock:
+            self._version += 1
+            for key in list(self._busy):
+                if key[1] == staff_id and (day is None or key[2] == day):
+                    self._busy.pop(key, None)
+
+    def invalidate_company(self, company_id):
+        """Drops the company's windows and every busy interval cached for it."""
+        with self._lock:
+            self._version += 1
+            self._windows.pop(company_id, None)
+            for key in list(self._busy):
+                if key[0] == company_id:
+                    self._busy.pop(key, None)
+
+    def clear(self):
+        with self._lock:
+            self._version += 1
+            self._busy.clear()
+            self._windows.clear()
+
+slot_engine = SlotEngine()
+
+def _booking_days(booking_time):
+    """Cached days a booking at booking_time blocks; None means every day."""
+    if not isinstance(booking_time, datetime):
+        return [None]
+    # The day after is included for bookings that run past midnight
+    return [booking_time.date(), booking_time.date() + timedelta(days=1)]
+
+def _changed(obj, *names):
+    state = inspect(obj)
+    return any(state.attrs[name].history.has_changes() for name in names)
+
+def _previous(obj, name):
+    history = inspect(obj).attrs[name].history
+    return set(history.deleted or []) | {getattr(obj, name)}
+
+@event.listens_for(Session, 'after_flush')
+def _collect_slot_changes(session, flush_context):
+    staff = set()      # (staff_id, day or None)
+    companies = set()
+    for obj in session.new | session.deleted:
+        if isinstance(obj, Booking):
+            staff.update((obj.staff_id, day) for day in _booking_days(obj.booking_time))
+        elif isinstance(obj, (Availability, User)):
+            companies.add(obj.company_id)
+    for obj in session.dirty:
+        if isinstance(obj, Booking) and _changed(obj, 'staff_id', 'booking_time', 'status', 'service_id'):
+            staff.update((staff_id, None) for staff_id in _previous(obj, 'staff_id'))
+        elif isinstance(obj, Availability) and session.is_modified(obj):
+            companies.update(_previous(obj, 'company_id'))
+        elif isinstance(obj, Service) and _changed(obj, 'duration', 'buffer_time'):
+            # Every booking of the service now ends at a different time
+            companies.add(obj.company_id)
+        elif isinstance(obj, User) and _changed(obj, 'status', 'company_id'):
+            companies.update(_previous(obj, 'company_id'))
+    if staff or companies:
+        changes = session.info.setdefault('slot_engine', {'staff': set(), 'companies': set()})
+        changes['staff'].update(staff)
+        changes['companies'].update(companies)
+
+@event.listens_for(Session, 'after_commit')
+def _invalidate_slot_changes(session):
+    # After commit, so a request refilling the cache can't re-read the old rows
+    changes = session.info.pop('slot_engine', None)
+    if changes:
+        for staff_id, day in changes['staff']:
+            slot_engine.invalidate_staff(staff_id, day)
+        for company_id in changes['companies']:
+            slot_engine.invalidate_company(company_id)
@@ -0,0 +1,141 @@
+import asyncio
+from datetime import datetime, timedelta
+from flask import current_app
+from sqlalchemy import or_, select
+from sqlalchemy.orm import selectinload
+from app.extensions import db
+from app.models.social import SocialPost, SocialPlatform
+from app.services.social_publishers import PublishError, get_publisher
+
+posts_table = SocialPost.__table__
+
+class _RateLimiter:
+    """Spaces calls to at most rate per second (per worker process)."""
+
+    def __init__(self, rate):
+        self.interval = 1.0 / rate if rate else 0
+        self._next = 0.0
+        self._lock = asyncio.Lock()
+
+    async def acquire(self):
+        loop = asyncio.get_running_loop()
+        async with self._lock:
+            now = loop.time()
+            wait = self._next - now
+            self._next = max(now, self._next) + self.interval
+        if wait > 0:
+            await asyncio.sleep(wait)
+
+def _due(now):
+    return (
+        posts_table.c.status == 'scheduled',
+        posts_table.c.scheduled_for <= now,
+        or_(posts_table.c.next_attempt_at.is_(None), posts_table.c.next_attempt_at <= now)
+    )
+
+def claim_due_posts(batch_size, now=None):
+    """
+    Leases up to batch_size due posts to this worker and returns their ids.
+    The lease pushes next_attempt_at forward, so other workers skip the posts
+    until it expires; a worker that dies mid-batch only delays them.
+    """
+    now = now or datetime.utcnow()
+    due = select(posts_table.c.id).where(*_due(now)).order_by(posts_table.c.scheduled_for).limit(batch_size)
+    if db.engine.dialect.name == 'postgresql':
+        due = due.with_for_update(skip_locked=True)
+
+    claim = posts_table.update().where(posts_table.c.id.in_(due), *_due(now)).values(
+        next_attempt_at=now + timedelta(seconds=current_app.config['SOCIAL_CLAIM_LEASE']),
+        attempts=posts_table.c.attempts + 1
+    ).returning(posts_table.c.id)
+
+    try:
+        post_ids = [post_id for (post_id,) in db.session.execute(claim)]
+        db.session.commit()
+    except Exception:
+        db.session.rollback()
+        raise
+    return post_ids
+
+async def _publish_all(jobs, backend, rate_limits, concurrency, timeout):
+    """jobs is [(post, platform or None, platform_id)]; returns one result or exception per job."""
+    limiters = {}
+    semaphore = asyncio.Semaphore(concurrency)
+
+    async def publish(post, platform, platform_id):
+        if platform is None:
+            raise PublishError(f"Platform {platform_id} is missing or disconnected", retryable=False)
+        name = platform['platform_name']
+        limiter = limiters.setdefault(name, _RateLimiter(rate_limits.get(name)))
+        async with semaphore:
+            await limiter.acquire()
+            return await asyncio.wait_for(get_publisher(backend, name).publish(platform, post), timeout)
+
+    return await asyncio.gather(*(publish(*job) for job in jobs), return_exceptions=True)
+
+def _backoff(attempts):
+    base = current_app.config['SOCIAL_RETRY_BACKOFF']
+    return timedelta(seconds=min(base * 2 ** (attempts - 1), current_app.config['SOCIAL_RETRY_BACKOFF_MAX']))
+
+def publish_posts(post_ids):
+    """Publishes claimed posts to each target still pending and records every outcome."""
+    posts = SocialPost.query.options(selectinload(SocialPost.targets)).filter(SocialPost.id.in_(post_ids)).all()
+    targets = [target for post in posts for target in post.targets if target.status == 'pending']
+    platform_ids = {target.platform_id for target in targets}
+    platforms = {
+        p.id: p for p in SocialPlatform.query.filter(SocialPlatform.id.in_(platform_ids), SocialPlatform.is_connected == True)
+    } if platform_ids else {}
+
+    # Publishers get plain dicts; nothing touches the session inside the event loop
+    jobs = []
+    for target in targets:
+        post = target.post
+        payload = {'id': post.id, 'content': post.content, 'media_urls': post.media_urls or []}
+        platform = platforms.get(target.platform_id)
+        if platform is None or platform.company_id != post.company_id:
+            jobs.append((payload, None, target.platform_id))
+            continue
+        jobs.append((payload, {
+            'id': platform.id,
+            'platform_name': platform.platform_name,
+            'account_name': platform.account_name,
+            'access_token': platform.access_token
+        }, target.platform_id))
+
+    results = asyncio.run(_publish_all(
+        jobs,
+        current_app.config['SOCIAL_PUBLISHER'],
+        current_app.config['SOCIAL_RATE_LIMITS'],
+        current_app.config['SOCIAL_PUBLISH_CONCURRENCY'],
+        current_app.config['SOCIAL_PUBLISH_TIMEOUT']
+    )) if jobs else []
+
+    now = datetime.utcnow()
+    for target, result in zip(targets, results):
+        if not isinstance(result, Exception):
+            target.status = 'posted'
+            target.external_id = result
+            target.error = None
+            target.posted_at = now
+            continue
+        target.error = str(result) or type(result).__name__
+        if not getattr(result, 'retryable', True):
+            target.status = 'failed'
+
+    max_attempts = current_app.config['SOCIAL_MAX_ATTEMPTS']
+    for post in posts:
+        statuses = {target.status for target in post.targets}
+        if 'pending' in statuses and post.attempts < max_attempts:
+            post.next_attempt_at = now + _backoff(post.attempts)
+        else:
+            for target in post.targets:
+                if target.status == 'pending':
+                    target.status = 'failed'
+            post.status = 'failed' if 'failed' in statuses or 'pending' in statuses else 'posted'
+            post.posted_at = now if post.status == 'posted' else None
+            post.next_attempt_at = None
+
+        errors = [f"platform {target.platform_id}: {target.error}" for target in post.targets if target.status != 'posted' and target.error]
+        post.last_error = '; '.join(errors) or None
+    db.session.commit()
+    return {status: sum(1 for post in posts if post.status == status) for status in ('posted', 'scheduled', 'failed')}
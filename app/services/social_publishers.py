@@ -0,0 +1,57 @@
+import asyncio
+import itertools
+
+class PublishError(Exception):
+    """A platform rejected the post. retryable=False marks errors a retry can't fix."""
+
+    def __init__(self, message, retryable=True):
+        super().__init__(message)
+        self.retryable = retryable
+
+class SocialPublisher:
+    """
+    Publishes one post to one connected account and returns the platform's post id.
+    Subclass per platform and register with register_publisher().
+    """
+
+    async def publish(self, platform, post):
+        """
+        Skeleton for platform publishing.
+        In a real scenario, this would call the platform API with platform['access_token'].
+        """
+        raise PublishError(f"No API client configured for {platform['platform_name']}", retryable=False)
+
+class FakePublisher(SocialPublisher):
+    """Offline backend for tests and local development. Records posts instead of sending them."""
+
+    def __init__(self):
+        self.published = []
+        self.fail_platform_ids = set()
+        self.delay = 0
+        self._ids = itertools.count(1)
+
+    async def publish(self, platform, post):
+        if self.delay:
+            await asyncio.sleep(self.delay)
+        if platform['id'] in self.fail_platform_ids:
+            raise PublishError(f"Fake failure for platform {platform['id']}")
+        self.published.append((post['id'], platform['id']))
+        return f"fake-{next(self._ids)}"
+
+    def reset(self):
+        self.published.clear()
+        self.fail_platform_ids.clear()
+        self.delay = 0
+
+default_publisher = SocialPublisher()
+fake_publisher = FakePublisher()
+
+_publishers = {}
+
+def register_publisher(platform_name, publisher):
+    _publishers[platform_name] = publisher
+
+def get_publisher(backend, platform_name):
+    if backend == 'fake':
+        return fake_publisher
+    return _publishers.get(platform_name, default_publisher)
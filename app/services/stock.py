@@ -0,0 +1,115 @@
+from collections import defaultdict
+from itertools import groupby
+from datetime import datetime
+from decimal import Decimal, InvalidOperation
+from sqlalchemy import func
+from app.extensions import db
+from app.models.inventory import Product, StockMovement
+
+class ProductNotFound(Exception):
+    def __init__(self, product_ids):
+        super().__init__(f"Products not found: {product_ids}")
+        self.product_ids = product_ids
+
+class InsufficientStock(Exception):
+    def __init__(self, product_id):
+        super().__init__(f"Product {product_id} would go below zero stock")
+        self.product_id = product_id
+
+def parse_movements(items, default_reason='Manual Update'):
+    """Validates request items into (product_id, Decimal change, reason) tuples."""
+    movements = []
+    for item in items:
+        try:
+            change = Decimal(str(item['change_amount']))
+            product_id = int(item['product_id'])
+        except (KeyError, TypeError, ValueError, InvalidOperation):
+            raise ValueError("Each movement needs a product_id and a numeric change_amount")
+        if not change.is_finite():
+            raise ValueError("change_amount must be finite")
+        movements.append((product_id, change, item.get('reason') or default_reason))
+    return movements
+
+def parse_prevent_negative(data):
+    """The optional prevent_negative flag of a stock request; anything but a JSON boolean is a ValueError."""
+    prevent_negative = data.get('prevent_negative', False)
+    if not isinstance(prevent_negative, bool):
+        raise ValueError("prevent_negative must be true or false")
+    return prevent_negative
+
+def apply_stock_changes(company_id, user_id, movements, prevent_negative=False):
+    """
+    Applies stock movements in one transaction and returns {product_id: new_stock}.
+
+    Deltas are summed per product and applied as a single atomic
+    UPDATE ... SET current_stock = current_stock + :delta, so concurrent
+    writers never lose updates. Products are updated in id order to avoid
+    deadlocks between overlapping batches.
+    """
+    deltas = defaultdict(Decimal)
+    for product_id, change, _ in movements:
+        deltas[product_id] += change
+
+    product_ids = sorted(deltas)
+    found = {pid for (pid,) in db.session.query(Product.id).filter(
+        Product.id.in_(product_ids), Product.company_id == company_id
+    )}
+    missing = [pid for pid in product_ids if pid not in found]
+    if missing:
+        raise ProductNotFound(missing)
+
+    products = Product.__table__
+    stock = func.coalesce(products.c.current_stock, 0)
+    try:
+        for product_id in product_ids:
+            delta = deltas[product_id]
+            update = products.update().where(products.c.id == product_id).values(current_stock=stock + delta)
+            if prevent_negative and delta < 0:
+                update = update.where(stock + delta >= 0)
+            if db.session.execute(update).rowcount == 0:
+                raise InsufficientStock(product_id)
+
+        now = datetime.utcnow()
+        db.session.execute(StockMovement.__table__.insert(), [{
+            'product_id': product_id,
+            'user_id': user_id,
+            'change_amount': change,
+            'reason': reason,
+            'created_at': now
+        } for product_id, change, reason in movements])
+
+        new_stock = dict(db.session.query(Product.id, Product.current_stock).filter(Product.id.in_(product_ids)))
+        db.session.commit()
+    except Exception:
+        db.session.rollback()
+        raise
+    return new_stock
+
+def low_stock_query(company_id=None):
+    """
+    Active products below min_stock_level, ordered by (company_id, id).
+    The predicate matches ix_products_low_stock, so only low rows are read.
+    """
+    query = Product.query.filter(Product.current_stock < Product.min_stock_level, Product.is_active == True)
+    if company_id is not None:
+        query = query.filter(Product.company_id == company_id)
+    return query.order_by(Product.company_id, Product.id)
+
+def reorder_batches(batch_size=500):
+    """Yields (company_id, [item]) for every tenant with low stock, from one cross-tenant scan."""
+    rows = low_stock_query().with_entities(
+        Product.company_id, Product.id, Product.sku, Product.name,
+        Product.current_stock, Product.min_stock_level
+    ).execution_options(yield_per=batch_size)
+
+    for company_id, group in groupby(rows, key=lambda row: row.company_id):
+        items = [{
+            "product_id": row.id,
+            "sku": row.sku,
+            "name": row.name,
+            "current_stock": str(row.current_stock),
+            "min_stock_level": str(row.min_stock_level),
+            "reorder_quantity": str(row.min_stock_level - row.current_stock)
+        } for row in group]
+        for i in range(0, len(items), batch_size):
+            yield company_id, items[i:i + batch_size]
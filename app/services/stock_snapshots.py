@@ -0,0 +1,135 @@
+from datetime import date, datetime, timedelta
+from decimal import Decimal
+from sqlalchemy import func, and_, or_
+from app.extensions import db
+from app.models.inventory import Product, StockMovement, StockSnapshot
+
+# A snapshot taken at cutoff C holds current_stock minus every movement created at or after C,
+# i.e. the stock once all movements before C had landed. Snapshots are written for each day a
+# product moved, so answering "as of T" only reads the first snapshot after T and the movements
+# between the two.
+
+def _midnight(day):
+    return datetime.combine(day, datetime.min.time())
+
+def _as_date(value):
+    # func.date() returns a date on PostgreSQL and an ISO string on SQLite
+    return value if isinstance(value, date) else date.fromisoformat(str(value))
+
+def stock_as_of(company_id, as_of):
+    """
+    Returns [(product, stock)] for the company's products as they stood at as_of,
+    valued by the caller. One statement: two index seeks per product.
+    """
+    next_taken = db.session.query(func.min(StockSnapshot.taken_at)).filter(
+        StockSnapshot.product_id == Product.id,
+        StockSnapshot.taken_at > as_of
+    ).correlate(Product).scalar_subquery()
+
+    trailing = db.session.query(func.coalesce(func.sum(StockMovement.change_amount), 0)).filter(
+        StockMovement.product_id == Product.id,
+        StockMovement.created_at > as_of,
+        or_(next_taken.is_(None), StockMovement.created_at < next_taken)
+    ).correlate(Product).scalar_subquery()
+
+    rows = db.session.query(
+        Product,
+        func.coalesce(StockSnapshot.stock, Product.current_stock, 0) - trailing
+    ).outerjoin(StockSnapshot, and_(
+        StockSnapshot.product_id == Product.id,
+        StockSnapshot.taken_at == next_taken
+    )).filter(
+        Product.company_id == company_id,
+        or_(Product.created_at.is_(None), Product.created_at <= as_of)
+    ).order_by(Product.id)
+
+    return [(product, Decimal(stock)) for product, stock in rows]
+
+def take_snapshots(day):
+    """Snapshots every product that moved on day, at the following midnight. Idempotent."""
+    start = _midnight(day)
+    cutoff = start + timedelta(days=1)
+
+    later = db.session.query(
+        StockMovement.product_id,
+        func.sum(StockMovement.change_amount).label('total')
+    ).filter(StockMovement.created_at >= cutoff).group_by(StockMovement.product_id).subquery()
+
+    moved = db.session.query(StockMovement.product_id).filter(
+        StockMovement.created_at >= start,
+        StockMovement.created_at < cutoff
+    ).distinct()
+
+    rows = db.session.query(
+        Product.id, Product.company_id,
+        func.coalesce(Product.current_stock, 0) - func.coalesce(later.c.total, 0)
+    ).outerjoin(later, later.c.product_id == Product.id).filter(Product.id.in_(moved)).all()
+
+    product_ids = [product_id for product_id, _, _ in rows]
+    if product_ids:
+        StockSnapshot.query.filter(
+            StockSnapshot.product_id.in_(product_ids),
+            StockSnapshot.taken_at == cutoff
+        ).delete(synchronize_session=False)
+        db.session.execute(StockSnapshot.__table__.insert(), [{
+            'company_id': company_id,
+            'product_id': product_id,
+            'taken_at': cutoff,
+            'stock': stock
+        } for product_id, company_id, stock in rows])
+    db.session.commit()
+    return len(rows)
+
+def take_pending_snapshots(today=None):
+    """Snapshots every finished day since the last snapshot run, so a missed run catches up."""
+    today = today or datetime.utcnow().date()
+    latest = db.session.query(func.max(StockSnapshot.taken_at)).scalar()
+    day = latest.date() if latest else today - timedelta(days=1)
+
+    written = 0
+    while day < today:
+        written += take_snapshots(day)
+        day += timedelta(days=1)
+    return written
+
+def rebuild_snapshots(company_id=None):
+    """
+    Drops and recomputes snapshots from the movement ledger: one grouped pass over
+    movements, walked backwards per product from current_stock.
+    """
+    cutoff = _midnight(datetime.utcnow().date())
+    snapshots = StockSnapshot.query
+    products = db.session.query(Product.id, Product.company_id, Product.current_stock)
+    if company_id is not None:
+        snapshots = snapshots.filter_by(company_id=company_id)
+        products = products.filter_by(company_id=company_id)
+    snapshots.delete(synchronize_session=False)
+
+    current = {product_id: (company, stock or 0) for product_id, company, stock in products}
+    day = func.date(StockMovement.created_at)
+    daily = db.session.query(
+        StockMovement.product_id, day, func.sum(StockMovement.change_amount)
+    ).filter(StockMovement.product_id.in_(products.with_entities(Product.id))).group_by(
+        StockMovement.product_id, day
+    ).order_by(StockMovement.product_id, day.desc())
+
+    rows = []
+    last_product, running = None, None
+    for product_id, moved_on, total in daily:
+        if product_id != last_product:
+            last_product, running = product_id, Decimal(current[product_id][1])
+        taken_at = _midnight(_as_date(moved_on)) + timedelta(days=1)
+        # Today's movements are only subtracted; the day gets its snapshot once it is over
+        if taken_at <= cutoff:
+            rows.append({
+                'company_id': current[product_id][0],
+                'product_id': product_id,
+                'taken_at': taken_at,
+                'stock': running
+            })
+        running -= total
+
+    if rows:
+        db.session.execute(StockSnapshot.__table__.insert(), rows)
+    db.session.commit()
+    return len(rows)
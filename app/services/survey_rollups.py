@@ -0,0 +1,229 @@
+from collections import defaultdict
+from datetime import datetime
+from decimal import Decimal, InvalidOperation, ROUND_HALF_UP
+from sqlalchemy import event, select
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.orm import Session
+from app.extensions import db
+from app.models.reports import SurveyQuestion, SurveyResponse, SurveyQuestionStats, SurveyAnswerCount
+
+stats_table = SurveyQuestionStats.__table__
+counts_table = SurveyAnswerCount.__table__
+questions_table = SurveyQuestion.__table__
+
+# Answers are either positional (the n-th answer belongs to the n-th question by id)
+# or objects of the form {"question_id": ..., "answer": ...}.
+
+# Ratings accepted when a rating question doesn't set its own scale in options,
+# either as the allowed values ([1, 2, 3, 4, 5]) or as {"min": ..., "max": ...}
+DEFAULT_RATING_SCALE = (Decimal('0'), Decimal('10'))
+BUCKET_LENGTH = counts_table.c.bucket.type.length
+
+class InvalidAnswer(ValueError):
+    """An answer outside what its question accepts."""
+
+def _load_questions(conn, survey_ids):
+    questions = defaultdict(list)
+    rows = conn.execute(
+        select(questions_table.c.id, questions_table.c.survey_id, questions_table.c.question_type, questions_table.c.options)
+        .where(questions_table.c.survey_id.in_(survey_ids))
+        .order_by(questions_table.c.id)
+    )
+    for question_id, survey_id, question_type, options in rows:
+        questions[survey_id].append((question_id, question_type or 'text', options))
+    return questions
+
+def _decimal(value):
+    try:
+        number = Decimal(str(value))
+    except (InvalidOperation, ValueError):
+        return None
+    return number if number.is_finite() else None
+
+def _rating_scale(options):
+    if isinstance(options, dict):
+        low, high = _decimal(options.get('min')), _decimal(options.get('max'))
+        if low is not None and high is not None:
+            return low, high
+    elif isinstance(options, list):
+        values = [v for v in map(_decimal, options) if v is not None]
+        if values:
+            return min(values), max(values)
+    return DEFAULT_RATING_SCALE
+
+def _answered(answers, questions):
+    """Yields (question or None, value) for each non-empty answer; None when it matches no question."""
+    by_id = {q[0]: q for q in questions}
+    for position, entry in enumerate(answers):
+        if isinstance(entry, dict) and 'question_id' in entry:
+            question = by_id.get(entry['question_id'])
+            value = entry.get('answer')
+        else:
+            question = questions[position] if position < len(questions) else None
+            value = entry
+        if value is None or value == '' or value == []:
+            continue
+        yield question, value
+
+def _score(question, value):
+    """(rating or None, [buckets]) for one answer, or raises InvalidAnswer."""
+    _, question_type, options = question
+    if question_type == 'rating':
+        rating = _decimal(value)
+        if rating is None:
+            raise InvalidAnswer("rating must be a number")
+        low, high = _rating_scale(options)
+        if not low <= rating <= high:
+            raise InvalidAnswer(f"rating must be between {low} and {high}")
+        rating = rating.quantize(Decimal('0.01'), ROUND_HALF_UP)
+        return rating, [str(rating.to_integral_value(ROUND_HALF_UP))]
+    if question_type == 'multiple_choice':
+        picked = list(dict.fromkeys(map(str, value if isinstance(value, list) else [value])))
+        if not options:
+            # Free text would let anyone create buckets; it only counts as answered
+            return None, []
+        allowed = {str(option) for option in options}
+        if any(option not in allowed for option in picked):
+            raise InvalidAnswer("answer is not one of the question's options")
+        return None, [option[:BUCKET_LENGTH] for option in picked]
+    return None, []
+
+def _contributions(answers, questions):
+    """Yields (question_id, rating or None, [buckets]) for each valid answer; invalid ones are skipped."""
+    if not isinstance(answers, list):
+        return
+    for question, value in _answered(answers, questions):
+        if question is None:
+            continue
+        try:
+            rating, buckets = _score(question, value)
+        except InvalidAnswer:
+            continue
+        yield question[0], rating, buckets
+
+def answer_errors(survey, answers):
+    """Error message for the first answer survey doesn't accept, or None."""
+    questions = [(q.id, q.question_type or 'text', q.options) for q in sorted(survey.questions, key=lambda q: q.id)]
+    for question, value in _answered(answers, questions):
+        if question is None:
+            return "Answer doesn't match a question"
+        try:
+            _score(question, value)
+        except InvalidAnswer as e:
+            return f"Question {question[0]}: {e}"
+    return None
+
+def _new_totals():
+    # (survey_id, question_id) -> [answers, rating total]; (survey_id, question_id, bucket) -> count
+    return defaultdict(lambda: [0, Decimal('0')]), defaultdict(int)
+
+def _accumulate(stats, buckets, survey_id, answers, questions, sign=1):
+    for question_id, rating, picked in _contributions(answers, questions):
+        entry = stats[(survey_id, question_id)]
+        entry[0] += sign
+        if rating is not None:
+            entry[1] += sign * rating
+        for bucket in picked:
+            buckets[(survey_id, question_id, bucket)] += sign
+
+def _upsert(conn, table, key, increments, seed):
+    """Atomic increment of one rollup row, creating it on first use."""
+    increment = table.update().where(*(table.c[k] == v for k, v in key.items())).values(
+        **{k: table.c[k] + v for k, v in increments.items()}
+    )
+    if conn.execute(increment).rowcount:
+        return
+    try:
+        with conn.begin_nested():
+            conn.execute(table.insert().values(**key, **seed))
+    except IntegrityError:
+        # A concurrent submission created the row first
+        conn.execute(increment)
+
+def apply_rollup_deltas(conn, stats, buckets):
+    now = datetime.utcnow()
+    for (survey_id, question_id), (answers, total) in sorted(stats.items()):
+        _upsert(conn, stats_table, {'question_id': question_id},
+                {'answers': answers, 'total': total},
+                {'survey_id': survey_id, 'answers': answers, 'total': total, 'updated_at': now})
+    for (survey_id, question_id, bucket), count in sorted(buckets.items()):
+        _upsert(conn, counts_table, {'question_id': question_id, 'bucket': bucket},
+                {'count': count},
+                {'survey_id': survey_id, 'count': count})
+
+@event.listens_for(Session, 'before_flush')
+def _track_responses(session, flush_context, instances):
+    added = [obj for obj in session.new if isinstance(obj, SurveyResponse)]
+    removed = [obj for obj in session.deleted if isinstance(obj, SurveyResponse)]
+    if not added and not removed:
+        return
+
+    conn = session.connection()
+    questions = _load_questions(conn, {r.survey_id for r in added + removed})
+    stats, buckets = _new_totals()
+    for responses, sign in ((added, 1), (removed, -1)):
+        for response in responses:
+            _accumulate(stats, buckets, response.survey_id, response.answers, questions[response.survey_id], sign)
+    apply_rollup_deltas(conn, stats, buckets)
+
+def recompute_survey_rollups(survey_id=None, batch_size=5000):
+    """
+    Rebuilds rollups from the raw responses in one streaming pass, for backfills
+    and after bulk loads that bypass the ORM. Returns the number of responses read.
+    """
+    stats_rows = SurveyQuestionStats.query
+    count_rows = SurveyAnswerCount.query
+    responses = db.session.query(SurveyResponse.survey_id, SurveyResponse.answers)
+    if survey_id is not None:
+        stats_rows = stats_rows.filter_by(survey_id=survey_id)
+        count_rows = count_rows.filter_by(survey_id=survey_id)
+        responses = responses.filter(SurveyResponse.survey_id == survey_id)
+
+    conn = db.session.connection()
+    survey_ids = [survey_id] if survey_id is not None else [s for (s,) in db.session.query(SurveyQuestion.survey_id).distinct()]
+    questions = _load_questions(conn, survey_ids)
+    stats, buckets = _new_totals()
+    read = 0
+    for survey, answers in responses.execution_options(yield_per=batch_size):
+        read += 1
+        _accumulate(stats, buckets, survey, answers, questions.get(survey, []))
+
+    stats_rows.delete(synchronize_session=False)
+    count_rows.delete(synchronize_session=False)
+    now = datetime.utcnow()
+    if stats:
+        db.session.execute(stats_table.insert(), [{
+            'question_id': question_id, 'survey_id': sid, 'answers': answers, 'total': total, 'updated_at': now
+        } for (sid, question_id), (answers, total) in stats.items()])
+    if buckets:
+        db.session.execute(counts_table.insert(), [{
+            'question_id': question_id, 'survey_id': sid, 'bucket': bucket, 'count': count
+        } for (sid, question_id, bucket), count in buckets.items()])
+    db.session.commit()
+    return read
+
+def survey_results(survey):
+    """Per-question results read from the rollups; two indexed queries regardless of response count."""
+    stats = {s.question_id: s for s in SurveyQuestionStats.query.filter_by(survey_id=survey.id)}
+    distributions = defaultdict(dict)
+    for row in SurveyAnswerCount.query.filter_by(survey_id=survey.id):
+        if row.count:
+            distributions[row.question_id][row.bucket] = row.count
+
+    results = []
+    for question in sorted(survey.questions, key=lambda q: q.id):
+        row = stats.get(question.id)
+        answered = row.answers if row else 0
+        result = {
+            "question_id": question.id,
+            "question_text": question.question_text,
+            "question_type": question.question_type,
+            "answers": answered
+        }
+        if question.question_type == 'rating':
+            result["average"] = str((Decimal(row.total) / answered).quantize(Decimal('0.01'))) if answered else None
+            result["histogram"] = distributions.get(question.id, {})
+        elif question.question_type == 'multiple_choice':
+            result["options"] = distributions.get(question.id, {})
+        results.append(result)
+    return results
@@ -0,0 +1 @@
+# Celery tasks. Workers start from celery_worker.py, which creates the app.
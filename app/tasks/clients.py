@@ -0,0 +1,7 @@
+from app.extensions import celery
+from app.services.client_import import run_import
+
+@celery.task(name='clients.import_clients')
+def import_clients(import_id):
+    """Runs one bulk client import; progress is committed to the client_imports row."""
+    return run_import(import_id)
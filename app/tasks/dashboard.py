@@ -0,0 +1,7 @@
+from app.extensions import celery
+from app.services.dashboard_stats import reconcile_company_stats
+
+@celery.task(name='dashboard.reconcile_stats')
+def reconcile_stats():
+    """Periodic: recomputes every company's dashboard counters and repairs drift."""
+    return reconcile_company_stats()
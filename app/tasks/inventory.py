@@ -0,0 +1,27 @@
+from flask import current_app
+from app.extensions import celery
+from app.services.stock import reorder_batches
+from app.services.stock_snapshots import take_pending_snapshots
+
+@celery.task(name='inventory.scan_low_stock')
+def scan_low_stock():
+    """Periodic: one indexed scan across all tenants, one reorder job per company batch."""
+    emitted = 0
+    for company_id, items in reorder_batches(current_app.config['REORDER_BATCH_SIZE']):
+        reorder_batch.delay(company_id, items)
+        emitted += 1
+    return emitted
+
+@celery.task(name='inventory.reorder_batch')
+def reorder_batch(company_id, items):
+    # Hook for purchasing/notifications; for now the batch is logged for the company
+    current_app.logger.info(
+        "Reorder batch for company %s: %s",
+        company_id, ", ".join(f"{item['sku'] or item['product_id']} x{item['reorder_quantity']}" for item in items)
+    )
+    return len(items)
+
+@celery.task(name='inventory.snapshot_stock')
+def snapshot_stock():
+    """Nightly: snapshots the products that moved on each finished day."""
+    return take_pending_snapshots()
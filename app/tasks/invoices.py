@@ -0,0 +1,34 @@
+from datetime import datetime
+from flask import current_app
+from celery import group
+from app.extensions import celery
+from app.services.invoice_pdf import render_invoice_pdf, sent_invoice_ids
+from app.services.overdue import mark_overdue_invoices
+
+@celery.task(name='invoices.render_pdfs')
+def render_invoice_pdfs(invoice_ids):
+    """Renders invoices one after another; already-current PDFs are skipped."""
+    rendered = 0
+    for invoice_id in invoice_ids:
+        if render_invoice_pdf(invoice_id):
+            rendered += 1
+    return rendered
+
+@celery.task(name='invoices.render_month')
+def render_month(year=None, month=None, parallelism=None, company_id=None):
+    """
+    Renders every invoice sent in the month. The ids are split into `parallelism`
+    jobs, so at most that many workers render at once.
+    """
+    today = datetime.utcnow()
+    invoice_ids = sent_invoice_ids(year or today.year, month or today.month, company_id)
+    parallelism = max(1, parallelism or current_app.config['INVOICE_PDF_PARALLELISM'])
+    chunks = [invoice_ids[i::parallelism] for i in range(parallelism) if invoice_ids[i::parallelism]]
+    if chunks:
+        group(render_invoice_pdfs.s(chunk) for chunk in chunks).apply_async()
+    return len(invoice_ids)
+
+@celery.task(name='invoices.mark_overdue')
+def mark_overdue():
+    """Periodic: sent invoices past their due date become overdue."""
+    return mark_overdue_invoices(current_app.config['OVERDUE_SWEEP_BATCH_SIZE'])
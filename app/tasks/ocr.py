@@ -0,0 +1,118 @@
+from datetime import datetime, timedelta
+from flask import current_app
+from sqlalchemy import select
+from app.extensions import db, celery
+from app.models.invoice import Receipt
+from app.services.ai_ocr import get_ocr_service
+from app.services.ocr_cache import ocr_cache
+
+receipts_table = Receipt.__table__
+
+def _lease_until(now):
+    return now + timedelta(seconds=current_app.config['OCR_CLAIM_LEASE'])
+
+def _claim(receipt_ids):
+    """
+    Moves pending receipts to processing under a lease. Only rows this worker
+    flipped are returned; if it dies, the stale sweep re-queues them.
+    """
+    lease_until = _lease_until(datetime.utcnow())
+    claimed = []
+    for receipt_id in receipt_ids:
+        updated = Receipt.query.filter_by(id=receipt_id, ocr_status='pending').update(
+            {'ocr_status': 'processing', 'ocr_lease_until': lease_until, 'ocr_attempts': Receipt.ocr_attempts + 1},
+            synchronize_session=False
+        )
+        if updated:
+            claimed.append(receipt_id)
+    db.session.commit()
+    return Receipt.query.filter(Receipt.id.in_(claimed)).all() if claimed else []
+
+def apply_ocr_result(receipt, data):
+    receipt.ocr_lease_until = None
+    if isinstance(data, Exception):
+        receipt.ocr_status = 'failed'
+        receipt.raw_ocr_data = {'error': str(data)}
+        return
+
+    receipt.vendor_name = data.get('vendor_name')
+    receipt.total_amount = data.get('total_amount')
+    receipt.currency = data.get('currency') or 'USD'
+    if data.get('date'):
+        try:
+            receipt.date = datetime.fromisoformat(data['date'])
+        except ValueError:
+            pass
+    receipt.ocr_status = 'completed'
+    receipt.raw_ocr_data = data
+
+@celery.task(name='ocr.process_receipts')
+def process_receipts(receipt_ids):
+    receipts = _claim(receipt_ids)
+    if not receipts:
+        return 0
+
+    # Identical files (same company, same hash) share one model call
+    groups = {}
+    for receipt in receipts:
+        cached = ocr_cache.get(receipt.company_id, receipt.content_hash)
+        if cached is not None:
+            apply_ocr_result(receipt, cached)
+            continue
+        key = (receipt.company_id, receipt.content_hash) if receipt.content_hash else ('receipt', receipt.id)
+        groups.setdefault(key, []).append(receipt)
+
+    if groups:
+        keys = list(groups)
+        service = get_ocr_service(current_app.config['OCR_BACKEND'])
+        try:
+            results = service.scan_batch(
+                [groups[key][0].file_path for key in keys],
+                max_concurrency=current_app.config['OCR_MAX_CONCURRENCY']
+            )
+        except Exception as e:
+            results = [e] * len(keys)
+
+        for key, data in zip(keys, results):
+            for receipt in groups[key]:
+                apply_ocr_result(receipt, data)
+            if not isinstance(data, Exception) and key[0] != 'receipt':
+                ocr_cache.put(key[0], key[1], data)
+
+    db.session.commit()
+    return len(receipts)
+
+def enqueue_receipts(receipt_ids):
+    batch_size = current_app.config['OCR_BATCH_SIZE']
+    for i in range(0, len(receipt_ids), batch_size):
+        process_receipts.delay(receipt_ids[i:i + batch_size])
+
+@celery.task(name='ocr.requeue_stale_receipts')
+def requeue_stale_receipts():
+    """
+    Periodic: re-queues receipts whose lease ran out, i.e. pending rows whose
+    job was never enqueued or never ran and processing rows whose worker died.
+    Receipts already claimed OCR_MAX_ATTEMPTS times are marked failed instead.
+    """
+    now = datetime.utcnow()
+    stale = (receipts_table.c.ocr_status.in_(('pending', 'processing')), receipts_table.c.ocr_lease_until <= now)
+
+    try:
+        db.session.execute(receipts_table.update().where(
+            *stale, receipts_table.c.ocr_status == 'processing',
+            receipts_table.c.ocr_attempts >= current_app.config['OCR_MAX_ATTEMPTS']
+        ).values(ocr_status='failed', ocr_lease_until=None, raw_ocr_data={'error': 'OCR did not finish'}))
+
+        due = select(receipts_table.c.id).where(*stale).order_by(receipts_table.c.ocr_lease_until) \
+            .limit(current_app.config['OCR_REQUEUE_BATCH_SIZE'])
+        requeue = receipts_table.update().where(receipts_table.c.id.in_(due), *stale).values(
+            ocr_status='pending', ocr_lease_until=_lease_until(now)
+        ).returning(receipts_table.c.id)
+        receipt_ids = sorted(receipt_id for (receipt_id,) in db.session.execute(requeue))
+        db.session.commit()
+    except Exception:
+        db.session.rollback()
+        raise
+
+    enqueue_receipts(receipt_ids)
+    return len(receipt_ids)
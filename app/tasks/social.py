@@ -0,0 +1,18 @@
+from flask import current_app
+from app.extensions import celery
+from app.services.social_dispatch import claim_due_posts, publish_posts
+
+@celery.task(name='social.dispatch_due_posts')
+def dispatch_due_posts():
+    """
+    Periodic: claims one batch of due posts and publishes it. A full batch means
+    more are waiting, so another dispatch is queued first and idle workers
+    drain the backlog in parallel.
+    """
+    batch_size = current_app.config['SOCIAL_DISPATCH_BATCH_SIZE']
+    post_ids = claim_due_posts(batch_size)
+    if not post_ids:
+        return {}
+    if len(post_ids) == batch_size:
+        dispatch_due_posts.delay()
+    return publish_posts(post_ids)
@@ -0,0 +1,64 @@
+import csv
+import io
+import json
+from datetime import date, datetime
+from decimal import Decimal
+from flask import Response, request, abort, stream_with_context
+
+BATCH_SIZE = 1000
+
+def _to_text(value):
+    if isinstance(value, Decimal):
+        return str(value)
+    if isinstance(value, (datetime, date)):
+        return value.isoformat()
+    return value
+
+def _ndjson_chunks(names, rows):
+    lines = []
+    for row in rows:
+        lines.append(json.dumps({n: _to_text(v) for n, v in zip(names, row)}))
+        if len(lines) >= BATCH_SIZE:
+            yield '\n'.join(lines) + '\n'
+            lines = []
+    if lines:
+        yield '\n'.join(lines) + '\n'
+
+def _csv_chunks(names, rows):
+    buffer = io.StringIO()
+    writer = csv.writer(buffer)
+    writer.writerow(names)
+    count = 0
+    for row in rows:
+        writer.writerow([_to_text(v) for v in row])
+        count += 1
+        if count % BATCH_SIZE == 0:
+            yield buffer.getvalue()
+            buffer.seek(0)
+            buffer.truncate()
+    yield buffer.getvalue()
+
+def stream_export(query, fields, filename):
+    """
+    Streams query as NDJSON (default) or CSV depending on ?format=.
+
+    Rows are fetched through a server-side cursor in BATCH_SIZE chunks so
+    memory use stays flat regardless of how many rows are exported.
+    """
+    fmt = request.args.get('format', 'ndjson')
+    if fmt not in ('ndjson', 'csv'):
+        abort(400, description="format must be 'ndjson' or 'csv'.")
+
+    names = list(fields)
+    rows = query.with_entities(*fields.values()).yield_per(BATCH_SIZE)
+
+    if fmt == 'csv':
+        body, mimetype = _csv_chunks(names, rows), 'text/csv'
+    else:
+        body, mimetype = _ndjson_chunks(names, rows), 'application/x-ndjson'
+
+    return Response(
+        stream_with_context(body),
+        mimetype=mimetype,
+        headers={'Content-Disposition': f'attachment; filename={filename}.{fmt}'}
+    )
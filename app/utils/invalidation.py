@@ -0,0 +1,73 @@
+import threading
+import time
+import redis
+from flask import current_app
+
+class InvalidationChannel:
+    """
+    Redis pub/sub channel that tells every worker which ids' cached copies are
+    stale. url_key and channel_key name the config settings to use; an unset URL
+    keeps invalidation per process. Each worker's listener thread calls
+    on_message(id) per message, and on_reset() whenever it (re)subscribes,
+    because anything published in between was missed.
+    """
+
+    def __init__(self, url_key, channel_key, on_message, on_reset):
+        self.url_key = url_key
+        self.channel_key = channel_key
+        self.on_message = on_message
+        self.on_reset = on_reset
+        self._lock = threading.Lock()
+        self._listener = None
+        self._redis = None
+        self._redis_url = None
+
+    def _get_redis(self):
+        url = current_app.config.get(self.url_key)
+        if not url:
+            return None
+        if self._redis is None or self._redis_url != url:
+            self._redis = redis.Redis.from_url(url, socket_timeout=0.1)
+            self._redis_url = url
+        return self._redis
+
+    def publish(self, ids):
+        client = self._get_redis()
+        if client is None:
+            return
+        channel = current_app.config[self.channel_key]
+        try:
+            for id in ids:
+                client.publish(channel, id)
+        except redis.RedisError:
+            # Other workers catch up when their copies expire
+            pass
+
+    def listen(self):
+        # Started lazily so it runs in the worker process, not in a pre-fork parent
+        url = current_app.config.get(self.url_key)
+        if not url or (self._listener is not None and self._listener.is_alive()):
+            return
+        with self._lock:
+            if self._listener is None or not self._listener.is_alive():
+                self._listener = threading.Thread(
+                    target=self._run, args=(url, current_app.config[self.channel_key]),
+                    name=f'{current_app.config[self.channel_key]}-listener', daemon=True
+                )
+                self._listener.start()
+
+    def _run(self, url, channel):
+        client = redis.Redis.from_url(url)
+        while True:
+            try:
+                pubsub = client.pubsub(ignore_subscribe_messages=True)
+                pubsub.subscribe(channel)
+                self.on_reset()
+                for message in pubsub.listen():
+                    try:
+                        self.on_message(int(message['data']))
+                    except (TypeError, ValueError):
+                        continue
+            except redis.RedisError:
+                pass
+            time.sleep(1)
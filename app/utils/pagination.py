@@ -0,0 +1,69 @@
+import base64
+import json
+from datetime import datetime
+from decimal import Decimal
+from flask import request, abort
+from sqlalchemy import tuple_
+from app.extensions import db
+
+DEFAULT_LIMIT = 50
+MAX_LIMIT = 200
+
+def _encode_cursor(values):
+    raw = json.dumps([v.isoformat() if isinstance(v, datetime) else v for v in values])
+    return base64.urlsafe_b64encode(raw.encode('utf-8')).decode('ascii')
+
+def _decode_cursor(cursor, keyset):
+    try:
+        values = json.loads(base64.urlsafe_b64decode(cursor.encode('ascii')))
+        if len(values) != len(keyset):
+            raise ValueError(cursor)
+        return [
+            datetime.fromisoformat(v) if isinstance(col.type, db.DateTime) else v
+            for col, v in zip(keyset, values)
+        ]
+    except (ValueError, TypeError):
+        abort(400, description="Invalid cursor.")
+
+def _serialize(value):
+    # Money and stock columns have always been returned as strings
+    if isinstance(value, Decimal):
+        return str(value)
+    return value
+
+def paginate(query, fields, keyset, descending=False):
+    """
+    Keyset-paginates query using the limit, cursor and fields query params.
+
+    fields maps response keys to columns; only the requested ones are selected.
+    keyset is the ordered list of columns that uniquely orders the rows,
+    e.g. [Model.id] or [Model.created_at, Model.id].
+    """
+    limit = request.args.get('limit', DEFAULT_LIMIT, type=int)
+    limit = max(1, min(limit, MAX_LIMIT))
+
+    requested = request.args.get('fields')
+    names = [n for n in requested.split(',') if n] if requested else list(fields)
+    unknown = [n for n in names if n not in fields]
+    if unknown or not names:
+        abort(400, description=f"Unknown fields: {', '.join(unknown)}")
+
+    cursor = request.args.get('cursor')
+    if cursor:
+        key = tuple_(*keyset)
+        after = tuple_(*_decode_cursor(cursor, keyset))
+        query = query.filter(key < after if descending else key > after)
+
+    order = [col.desc() if descending else col.asc() for col in keyset]
+    columns = [fields[n] for n in names] + list(keyset)
+    rows = query.with_entities(*columns).order_by(*order).limit(limit + 1).all()
+
+    next_cursor = None
+    if len(rows) > limit:
+        rows = rows[:limit]
+        next_cursor = _encode_cursor(rows[-1][len(names):])
+
+    return {
+        "items": [{n: _serialize(row[i]) for i, n in enumerate(names)} for row in rows],
+        "next_cursor": next_cursor
+    }
@@ -0,0 +1,113 @@
+from sqlalchemy import text
+from app.extensions import db
+from app.models.client import Client, ProjectUpdate
+from app.models.booking import Service, Booking
+from app.models.invoice import Invoice, InvoiceItem, Receipt
+from app.models.inventory import Product, StockMovement
+from app.models.reports import Survey, SurveyQuestionStats, SurveyAnswerCount
+from app.models.social import SocialPlatform, SocialPost, SocialPostTarget
+
+# (name, query factory, index the plan must use)
+# Values are placeholders; only the shape of the query matters to the planner.
+HOT_QUERIES = [
+    ('dashboard.clients',
+     lambda: Client.query.filter_by(company_id=1),
+     'ix_clients_company_id_status'),
+    ('dashboard.pending_bookings',
+     lambda: Booking.query.filter_by(company_id=1, status='pending'),
+     'ix_bookings_company_id_status'),
+    ('dashboard.unpaid_invoices',
+     lambda: Invoice.query.filter_by(company_id=1).filter(Invoice.status != 'paid'),
+     'ix_invoices_company_id_status'),
+    ('portal.get_updates',
+     lambda: ProjectUpdate.query.filter_by(client_id=1).order_by(ProjectUpdate.created_at.desc()),
+     'ix_project_updates_client_id_created_at'),
+    ('bookings.get_services',
+     lambda: Service.query.filter_by(company_id=1, is_active=True),
+     'ix_services_company_id_is_active'),
+    ('reports.get_surveys',
+     lambda: Survey.query.filter_by(company_id=1, is_active=True),
+     'ix_surveys_company_id_is_active'),
+    ('reports.survey_results',
+     lambda: SurveyQuestionStats.query.filter_by(survey_id=1),
+     'ix_survey_question_stats_survey_id'),
+    ('reports.survey_distributions',
+     lambda: SurveyAnswerCount.query.filter_by(survey_id=1),
+     'ix_survey_answer_counts_survey_id'),
+    ('inventory.get_products',
+     lambda: Product.query.filter_by(company_id=1),
+     'ix_products_company_id_is_active'),
+    ('inventory.low_stock_scan',
+     lambda: Product.query.filter(Product.current_stock < Product.min_stock_level, Product.is_active == True)
+                          .order_by(Product.company_id, Product.id),
+     'ix_products_low_stock'),
+    ('inventory.movements',
+     lambda: StockMovement.query.filter_by(product_id=1).order_by(StockMovement.created_at),
+     'ix_stock_movements_product_id_created_at'),
+    ('invoicing.get_invoices',
+     lambda: Invoice.query.filter_by(company_id=1),
+     'ix_invoices_company_id_status'),
+    ('invoicing.overdue_sweep',
+     lambda: Invoice.query.filter(Invoice.status == 'sent', Invoice.due_date < '2000-01-01').order_by(Invoice.id),
+     'ix_invoices_status_due_date'),
+    ('ocr.stale_receipts',
+     lambda: Receipt.query.filter(Receipt.ocr_status.in_(('pending', 'processing')), Receipt.ocr_lease_until <= '2000-01-01')
+                          .order_by(Receipt.ocr_lease_until),
+     'ix_receipts_ocr_status_ocr_lease_until'),
+    ('invoicing.items',
+     lambda: InvoiceItem.query.filter_by(invoice_id=1),
+     'ix_invoice_items_invoice_id'),
+    ('social.dispatch_claim',
+     lambda: SocialPost.query.filter(SocialPost.status == 'scheduled', SocialPost.scheduled_for <= '2000-01-01')
+                             .order_by(SocialPost.scheduled_for),
+     'ix_social_posts_status_scheduled_for'),
+    ('social.calendar',
+     lambda: SocialPost.query.filter(SocialPost.company_id == 1, SocialPost.scheduled_for >= '2000-01-01',
+                                     SocialPost.scheduled_for < '2000-02-01'),
+     'ix_social_posts_company_id_scheduled_for'),
+    ('social.platform_targets',
+     lambda: SocialPostTarget.query.filter_by(platform_id=1, status='pending'),
+     'ix_social_post_targets_platform_id_status'),
+    ('social.get_platforms',
+     lambda: SocialPlatform.query.filter_by(company_id=1),
+     'ix_social_platforms_company_id'),
+]
+
+def explain(query):
+    """Returns the list of index names the database plans to use for query."""
+    dialect = db.engine.dialect.name
+    sql = str(query.statement.compile(dialect=db.engine.dialect, compile_kwargs={'literal_binds': True}))
+
+    if dialect == 'sqlite':
+        rows = db.session.execute(text('EXPLAIN QUERY PLAN ' + sql)).all()
+        used = []
+        for row in rows:
+            detail = row[-1]
+            if ' INDEX ' in detail:
+                used.append(detail.split(' INDEX ', 1)[1].split(' ')[0])
+        return used
+
+    if dialect == 'postgresql':
+        # Tiny dev tables make sequential scans cheaper; we only care that the index is usable
+        db.session.execute(text('SET LOCAL enable_seqscan = off'))
+        plan = db.session.execute(text('EXPLAIN (FORMAT JSON) ' + sql)).scalar()
+        db.session.rollback()
+        used = []
+        stack = [plan[0]['Plan']]
+        while stack:
+            node = stack.pop()
+            if 'Index Name' in node:
+                used.append(node['Index Name'])
+            stack.extend(node.get('Plans', []))
+        return used
+
+    raise NotImplementedError(f"Query plan checks are not supported on {dialect}")
+
+def check_query_plans():
+    """Runs EXPLAIN for every hot query. Returns a list of (name, expected, used) failures."""
+    failures = []
+    for name, factory, expected in HOT_QUERIES:
+        used = explain(factory())
+        if expected not in used:
+            failures.append((name, expected, used))
+    return failures
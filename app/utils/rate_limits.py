@@ -0,0 +1,76 @@
+from flask import current_app, g, request
+from flask_jwt_extended import get_jwt, verify_jwt_in_request
+from flask_limiter.util import get_remote_address
+
+def _caller():
+    """('user' | 'client', identity) when the request carries a valid JWT, else None."""
+    if 'rate_limit_caller' not in g:
+        try:
+            verify_jwt_in_request(optional=True)
+            claims = get_jwt()
+        except Exception:
+            # Bad tokens are rejected by the view itself; limit them by address meanwhile
+            claims = {}
+        identity = claims.get('sub')
+        g.rate_limit_caller = (('client' if claims.get('is_client') else 'user'), str(identity)) if identity else None
+    return g.rate_limit_caller
+
+def rate_limit_key():
+    """Default key: the authenticated user or portal client, so callers behind one NAT don't share a bucket."""
+    caller = _caller()
+    if caller is None:
+        return f"ip:{get_remote_address()}"
+    return f"{caller[0]}:{caller[1]}"
+
+def caller_company_id():
+    """Company of the authenticated user or portal client, resolved once per request; None when anonymous."""
+    if 'rate_limit_company_id' in g:
+        return g.rate_limit_company_id
+
+    # Imported here: app.extensions imports this module before the models exist
+    from app.extensions import db
+    from app.models.client import Client
+    from app.utils.security import get_current_principal
+
+    company_id = None
+    caller = _caller()
+    if caller and caller[0] == 'client':
+        company_id = get_jwt().get('company_id')
+        if company_id is None:
+            # Portal tokens issued before the claim was added
+            client = db.session.get(Client, int(caller[1]))
+            company_id = client.company_id if client else None
+    elif caller:
+        principal = get_current_principal()
+        company_id = principal.company_id if principal else None
+    g.rate_limit_company_id = company_id
+    return company_id
+
+def tenant_key():
+    return f"company:{caller_company_id()}"
+
+def no_tenant():
+    return caller_company_id() is None
+
+def tenant_quota():
+    """Request quota shared by everyone in the caller's company, set by the company's tier."""
+    from app.services.company_settings import company_settings
+
+    tiers = current_app.config['RATE_LIMIT_TIERS']
+    settings = company_settings.get(caller_company_id())
+    tier = settings.quota_tier if settings else None
+    return tiers.get(tier) or tiers[current_app.config['RATE_LIMIT_DEFAULT_TIER']]
+
+def configured(name):
+    """Limit value read from the app config on each request."""
+    return lambda: current_app.config[name]
+
+def login_email_key():
+    # Caps guesses against one account from one address. Keyed on both, so
+    # failures sent from elsewhere can't lock the real owner out
+    data = request.get_json(silent=True) or {}
+    email = str(data.get('email') or '').strip().lower() if isinstance(data, dict) else ''
+    return f"login:{email}:{get_remote_address()}"
+
+def receipt_files():
+    return max(1, len(request.files.getlist('receipt') + request.files.getlist('receipts')))
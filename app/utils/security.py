@@ -1,26 +1,192 @@
+import threading
+import time
+from collections import OrderedDict
 from functools import wraps
-from flask import g, abort
-from flask_jwt_extended import get_jwt_identity, jwt_required
+from flask import g, abort, current_app, request
+from flask_jwt_extended import get_jwt, get_jwt_identity, jwt_required
+from sqlalchemy import event, inspect
+from sqlalchemy.orm import Session
 from app.models.user import User
+from app.services.company_settings import company_settings, MODULES
+from app.utils.invalidation import InvalidationChannel
+from app.utils.rate_limits import caller_company_id
+
+class Principal:
+    """The authenticated staff member for the current request."""
+
+    __slots__ = ('user_id', 'company_id', 'role', 'status', '_user')
+
+    def __init__(self, user_id, company_id, role, status, user=None):
+        self.user_id = user_id
+        self.company_id = company_id
+        self.role = role
+        self.status = status
+        self._user = user
+
+    @classmethod
+    def from_user(cls, user):
+        return cls(user.id, user.company_id, user.role, user.status, user=user)
+
+    @property
+    def user(self):
+        # Only hit the database when a handler needs more than the cached fields
+        if self._user is None:
+            self._user = User.query.get(self.user_id)
+        return self._user
+
+    def detached(self):
+        return Principal(self.user_id, self.company_id, self.role, self.status)
+
+class PrincipalCache:
+    """
+    Principals reused across requests, keyed by JWT jti, in an LRU of
+    PRINCIPAL_CACHE_SIZE entries. Committed role or status changes drop the
+    user's entries here and, through PRINCIPAL_CACHE_CHANNEL, in every worker.
+    """
+
+    def __init__(self):
+        self._entries = OrderedDict()  # jti -> (expires_at, Principal)
+        self._version = 0              # Bumped by every invalidation
+        self._lock = threading.Lock()
+        self._channel = InvalidationChannel('PRINCIPAL_CACHE_REDIS_URL', 'PRINCIPAL_CACHE_CHANNEL', self.invalidate, self.clear)
+
+    def get(self, jti):
+        """Returns (Principal or None, version); pass the version back to store()."""
+        with self._lock:
+            cached = self._entries.get(jti)
+            if cached is not None and cached[0] > time.monotonic():
+                self._entries.move_to_end(jti)
+                return cached[1], self._version
+            self._entries.pop(jti, None)
+            version = self._version
+        self._channel.listen()
+        return None, version
+
+    def store(self, jti, principal, version, ttl):
+        with self._lock:
+            # A change committed while the user was loading makes what we read stale
+            if self._version != version:
+                return
+            self._entries[jti] = (time.monotonic() + ttl, principal)
+            self._entries.move_to_end(jti)
+            while len(self._entries) > current_app.config['PRINCIPAL_CACHE_SIZE']:
+                self._entries.popitem(last=False)
+
+    def invalidate(self, user_id):
+        with self._lock:
+            self._version += 1
+            for jti in [jti for jti, (_, principal) in self._entries.items() if principal.user_id == user_id]:
+                del self._entries[jti]
+
+    def clear(self):
+        with self._lock:
+            self._version += 1
+            self._entries.clear()
+
+    def publish(self, user_ids):
+        """Invalidates user_ids here and in every worker subscribed to the channel."""
+        for user_id in user_ids:
+            self.invalidate(user_id)
+        self._channel.publish(user_ids)
+
+principal_cache = PrincipalCache()
+
+def _load_principal():
+    ttl = current_app.config.get('PRINCIPAL_CACHE_TTL', 0)
+    jti = get_jwt().get('jti')
+
+    if ttl and jti:
+        cached, version = principal_cache.get(jti)
+        if cached is not None:
+            return cached.detached()
+
+    user = User.query.get(get_jwt_identity())
+    if not user:
+        return None
+
+    principal = Principal.from_user(user)
+    if ttl and jti:
+        principal_cache.store(jti, principal.detached(), version, ttl)
+    return principal
+
+def get_current_principal():
+    """
+    Returns the principal for the current request, loading it at most once.
+    Must be called from inside a jwt_required view.
+    """
+    if 'principal' not in g:
+        g.principal = _load_principal()
+    return g.principal
 
 def require_permission(*permissions):
     def decorator(f):
         @wraps(f)
         @jwt_required()
         def decorated(*args, **kwargs):
-            user_id = get_jwt_identity()
-            user = User.query.get(user_id)
-            
-            if not user or user.status != 'active':
+            principal = get_current_principal()
+
+            if not principal or principal.status != 'active':
                 abort(403, description="Account inactive or not found.")
-                
+
             # Basic RBAC logic (as per PRD 4.1)
             # This is a placeholder for more complex logic if permissions are stored in DB
-            if user.role == 'owner' or user.role == 'admin':
+            if principal.role == 'owner' or principal.role == 'admin':
                 return f(*args, **kwargs)
-                
+
             # TODO: Add granular permission check logic
-            
+
             abort(403)
         return decorated
     return decorator
+
+def check_module(company_id, module):
+    """Aborts with 403 unless the company has module enabled. Unknown companies are left to the view."""
+    settings = company_settings.get(company_id) if company_id is not None else None
+    if settings is not None and module not in settings.modules:
+        abort(403, description=f"The {module} module is not enabled for this company.")
+
+def _public_company_id():
+    company_id = request.args.get('company_id')
+    if company_id is None and request.is_json:
+        data = request.get_json(silent=True)
+        company_id = data.get('company_id') if isinstance(data, dict) else None
+    try:
+        return int(company_id)
+    except (TypeError, ValueError):
+        return None
+
+def require_module(module, public=False):
+    """
+    Gates a route on one of the Company module flags. The company is the
+    caller's own, or for public routes the one named by the company_id
+    parameter. Flags come from the company settings cache, so the check adds
+    no query once warm.
+    """
+    if module not in MODULES:
+        raise ValueError(f"Unknown module: {module}")
+
+    def decorator(f):
+        @wraps(f)
+        def decorated(*args, **kwargs):
+            check_module(_public_company_id() if public else caller_company_id(), module)
+            return f(*args, **kwargs)
+        return decorated
+    return decorator
+
+@event.listens_for(Session, 'after_flush')
+def _collect_access_changes(session, flush_context):
+    changed = {obj.id for obj in session.deleted if isinstance(obj, User)}
+    for obj in session.dirty:
+        if isinstance(obj, User):
+            state = inspect(obj)
+            if state.attrs.role.history.has_changes() or state.attrs.status.history.has_changes():
+                changed.add(obj.id)
+    if changed:
+        session.info.setdefault('principal_cache', set()).update(changed)
+
+@event.listens_for(Session, 'after_commit')
+def _invalidate_access_changes(session):
+    # After commit, so a request reloading the user sees the new role or status
+    changed = session.info.pop('principal_cache', None)
+    if changed:
+        principal_cache.publish(sorted(changed))
@@ -0,0 +1,6 @@
+from app import create_app
+from app.extensions import celery
+
+# Entry point for workers: celery -A celery_worker.celery worker
+app = create_app()
+app.app_context().push()
@@ -11,12 +11,115 @@ class Config:
     JWT_ACCESS_TOKEN_EXPIRES = timedelta(minutes=15)
     JWT_REFRESH_TOKEN_EXPIRES = timedelta(days=7)
     
+    # Seconds an authenticated principal is reused across requests (0 disables)
+    PRINCIPAL_CACHE_TTL = int(os.environ.get('PRINCIPAL_CACHE_TTL', 30))
+    PRINCIPAL_CACHE_SIZE = 10000 # Tokens kept per worker
+    
+    # Password hashing (see app.services.passwords)
+    BCRYPT_LOG_ROUNDS = int(os.environ.get('BCRYPT_LOG_ROUNDS', 12))
+    PASSWORD_HASH_WORKERS = int(os.environ.get('PASSWORD_HASH_WORKERS', 2))
+    PASSWORD_HASH_MAX_QUEUE = int(os.environ.get('PASSWORD_HASH_MAX_QUEUE', 64))
+    
+    # Booking slot engine
+    SLOT_STEP_MINUTES = 15
+    SLOT_CACHE_TTL = int(os.environ.get('SLOT_CACHE_TTL', 60))
+    SLOT_CACHE_SIZE = 20000 # Staff-days (and companies) kept per worker
+    SLOT_MAX_RANGE_DAYS = 62
+    
+    # Public read cache for booking widgets (see app.services.response_cache)
+    PUBLIC_CACHE_TTL = int(os.environ.get('PUBLIC_CACHE_TTL', 30)) # Seconds a worker serves its own copy; local writes invalidate at once
+    PUBLIC_CACHE_SIZE = 4096 # Responses kept per worker
+    PUBLIC_CACHE_REDIS_URL = os.environ.get('PUBLIC_CACHE_REDIS_URL') # Tier shared by all workers; unset disables it
+    PUBLIC_CACHE_REDIS_TTL = 300
+    PUBLIC_CACHE_MAX_AGE = 0 # Browsers revalidate every time, with If-None-Match
+    
+    # Inventory
+    STOCK_BULK_MAX_MOVEMENTS = 10000
+    LOW_STOCK_SCAN_INTERVAL = int(os.environ.get('LOW_STOCK_SCAN_INTERVAL', 3600)) # Seconds between reorder scans
+    REORDER_BATCH_SIZE = 500 # Products per emitted reorder batch
+    
     # Redis configuration
     REDIS_URL = os.environ.get('REDIS_URL', 'redis://localhost:6379/0')
     
     # Celery configuration
     CELERY_BROKER_URL = REDIS_URL
     CELERY_RESULT_BACKEND = REDIS_URL
+    
+    # Principal cache invalidation across workers (see app.utils.security)
+    PRINCIPAL_CACHE_REDIS_URL = os.environ.get('PRINCIPAL_CACHE_REDIS_URL', REDIS_URL) # Pub/sub for role and status changes; unset keeps them per worker
+    PRINCIPAL_CACHE_CHANNEL = 'principal-cache'
+    
+    # Cached company module flags and quota tier (see app.services.company_settings)
+    COMPANY_SETTINGS_REDIS_URL = os.environ.get('COMPANY_SETTINGS_REDIS_URL', REDIS_URL) # Pub/sub for changes; unset keeps them per worker
+    COMPANY_SETTINGS_CHANNEL = 'company-settings'
+    COMPANY_SETTINGS_TTL = 300 # Seconds a worker trusts its copy if a change message is missed
+    
+    # Rate limiting (see app.utils.rate_limits); counters live in Redis so every worker shares them
+    RATELIMIT_STORAGE_URI = os.environ.get('RATELIMIT_STORAGE_URI', REDIS_URL)
+    RATELIMIT_STRATEGY = 'sliding-window-counter'
+    RATELIMIT_HEADERS_ENABLED = True
+    RATELIMIT_IN_MEMORY_FALLBACK_ENABLED = True # Per-process limits while Redis is unreachable
+    RATE_LIMIT_TIERS = { # Requests per company across all routes, by Company.quota_tier
+        'free': '300/minute;5000/hour',
+        'standard': '1200/minute;30000/hour',
+        'enterprise': '6000/minute;200000/hour'
+    }
+    RATE_LIMIT_DEFAULT_TIER = 'standard'
+    RATE_LIMIT_LOGIN = '10/minute;100/hour' # Per address
+    RATE_LIMIT_LOGIN_EMAIL = '5/minute;30/hour' # Per account and address
+    RATE_LIMIT_RECEIPT_SCAN = '200/hour' # Receipt files per company
+    RATE_LIMIT_BOOKING = '20/minute;200/hour' # Per address
+    
+    # Receipt OCR pipeline
+    OCR_BACKEND = os.environ.get('OCR_BACKEND', 'anthropic') # anthropic / stub
+    OCR_BATCH_SIZE = 8 # Receipts per worker job
+    OCR_MAX_CONCURRENCY = 4 # Parallel model calls per job
+    OCR_MAX_UPLOAD_FILES = 50
+    OCR_RESULT_CACHE_SIZE = 1024 # In-process LRU entries in front of the ocr_results table
+    OCR_CLAIM_LEASE = 600 # Seconds a queued or claimed receipt waits before it is re-queued
+    OCR_REQUEUE_INTERVAL = 120 # Seconds between stale receipt sweeps
+    OCR_REQUEUE_BATCH_SIZE = 500 # Receipts re-queued per sweep
+    OCR_MAX_ATTEMPTS = 3 # Claims before a receipt that keeps killing workers is marked failed
+    RECEIPT_UPLOAD_DIR = os.environ.get('RECEIPT_UPLOAD_DIR', 'uploads/receipts')
+    
+    # Bulk client import
+    CLIENT_IMPORT_DIR = os.environ.get('CLIENT_IMPORT_DIR', 'uploads/imports')
+    CLIENT_IMPORT_BATCH_SIZE = 500 # Rows validated, hashed and inserted per commit
+    CLIENT_IMPORT_HASH_WORKERS = int(os.environ.get('CLIENT_IMPORT_HASH_WORKERS', os.cpu_count() or 1)) # 0 hashes inline
+    CLIENT_IMPORT_MAX_ERRORS = 1000 # Row errors kept on the job; all are counted
+    CLIENT_DEFAULT_PASSWORD = os.environ.get('CLIENT_DEFAULT_PASSWORD', 'ChangeMe123!')
+    
+    # Invoice numbering
+    INVOICE_NUMBER_FORMAT = os.environ.get('INVOICE_NUMBER_FORMAT', 'INV-{number:06d}')
+    
+    # Invoice PDFs
+    INVOICE_PDF_DIR = os.environ.get('INVOICE_PDF_DIR', 'uploads/invoices')
+    INVOICE_PDF_PARALLELISM = int(os.environ.get('INVOICE_PDF_PARALLELISM', 4)) # Concurrent render jobs for bulk runs
+    INVOICE_PDF_REDIS_URL = os.environ.get('INVOICE_PDF_REDIS_URL', REDIS_URL) # Shares queued-render markers between workers; unset keeps them per worker
+    INVOICE_PDF_RENDER_TTL = 60 # Seconds before a render that never finished is queued again
+    
+    # Social post dispatcher
+    SOCIAL_PUBLISHER = os.environ.get('SOCIAL_PUBLISHER', 'live') # live / fake
+    SOCIAL_DISPATCH_INTERVAL = 30 # Seconds between dispatcher runs
+    SOCIAL_DISPATCH_BATCH_SIZE = 50 # Posts claimed per dispatch job
+    SOCIAL_CLAIM_LEASE = 300 # Seconds a claimed post is hidden from other workers
+    SOCIAL_PUBLISH_CONCURRENCY = 16 # In-flight platform calls per job
+    SOCIAL_PUBLISH_TIMEOUT = 30
+    SOCIAL_RATE_LIMITS = {'facebook': 10, 'instagram': 5, 'twitter': 5, 'linkedin': 5} # Calls per second per worker
+    SOCIAL_MAX_ATTEMPTS = 5
+    SOCIAL_RETRY_BACKOFF = 60 # Seconds, doubled on each attempt
+    SOCIAL_RETRY_BACKOFF_MAX = 3600
+    SOCIAL_CALENDAR_MAX_DAYS = 92
+    
+    # Overdue invoice sweeper
+    OVERDUE_SWEEP_INTERVAL = int(os.environ.get('OVERDUE_SWEEP_INTERVAL', 900)) # Seconds between sweeps
+    OVERDUE_SWEEP_BATCH_SIZE = 1000
+    
+    # Dashboard counters
+    DASHBOARD_RECONCILE_INTERVAL = int(os.environ.get('DASHBOARD_RECONCILE_INTERVAL', 3600)) # Seconds between drift repairs
+    
+    # Full-text search
+    SEARCH_MAX_RESULTS = 50
 
 class DevelopmentConfig(Config):
     DEBUG = True
@@ -26,6 +129,17 @@ class TestingConfig(Config):
     TESTING = True
     SQLALCHEMY_DATABASE_URI = os.environ.get('TEST_DATABASE_URL', 'sqlite:///:memory:')
     WTF_CSRF_ENABLED = False
+    PRINCIPAL_CACHE_TTL = 0
+    PRINCIPAL_CACHE_REDIS_URL = None
+    CELERY_TASK_ALWAYS_EAGER = True
+    RATELIMIT_STORAGE_URI = 'memory://'
+    COMPANY_SETTINGS_REDIS_URL = None
+    INVOICE_PDF_REDIS_URL = None
+    BCRYPT_LOG_ROUNDS = 4
+    PASSWORD_HASH_WORKERS = 0
+    OCR_BACKEND = 'stub'
+    CLIENT_IMPORT_HASH_WORKERS = 0
+    SOCIAL_PUBLISHER = 'fake'
 
 class ProductionConfig(Config):
     DEBUG = False
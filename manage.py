@@ -1,6 +1,418 @@
+import sys
+import click
 from app import create_app
 
 app = create_app()
 
+def _scratch_app(database_url=None):
+    """App for stress commands, on a throwaway SQLite file unless a database is given."""
+    import os
+    import tempfile
+
+    if database_url is None:
+        database_url = 'sqlite:///' + os.path.join(tempfile.mkdtemp(), 'stress.db')
+    # Stress runs measure the app, not the rate limiter
+    return create_app('testing', {'SQLALCHEMY_DATABASE_URI': database_url, 'RATELIMIT_ENABLED': False})
+
+def _scratch_company(name):
+    from datetime import datetime
+    from app.extensions import db
+    from app.models import Company, User
+    from app.services.company_settings import MODULES
+
+    db.create_all()
+    company = Company(name=name, slug=f'{name.lower()}-{datetime.utcnow().timestamp()}', status='active', **{m: True for m in MODULES})
+    db.session.add(company)
+    db.session.flush()
+    user = User(company_id=company.id, email=f'stress-{company.slug}@example.com', password_hash='-', role='owner', status='active')
+    db.session.add(user)
+    db.session.flush()
+    return company, user
+
+@app.cli.command('check-query-plans')
+def check_query_plans_command():
+    """Run EXPLAIN on hot queries and fail if one stops using its index."""
+    from app.utils.query_plans import check_query_plans, HOT_QUERIES
+
+    failures = check_query_plans()
+    for name, expected, used in failures:
+        click.echo(f"FAIL {name}: expected {expected}, plan used {used or 'no index'}")
+
+    click.echo(f"{len(HOT_QUERIES) - len(failures)}/{len(HOT_QUERIES)} hot queries use their index")
+    if failures:
+        sys.exit(1)
+
+@app.cli.command('reconcile-dashboard-stats')
+def reconcile_dashboard_stats_command():
+    """Recompute dashboard counters and repair drift. Safe to run from cron."""
+    from app.services.dashboard_stats import reconcile_company_stats
+
+    repaired = reconcile_company_stats()
+    click.echo(f"Repaired dashboard stats for {repaired} companies")
+
+@app.cli.command('set-company-modules')
+@click.argument('company_id', type=int)
+@click.option('--enable', multiple=True, help='Module to switch on; repeatable.')
+@click.option('--disable', multiple=True, help='Module to switch off; repeatable.')
+def set_company_modules_command(company_id, enable, disable):
+    """Switch a company's modules on or off and print the resulting flags."""
+    from app.extensions import db
+    from app.models import Company
+    from app.services.company_settings import module_flags, update_modules
+
+    company = db.session.get(Company, company_id)
+    if company is None:
+        raise click.ClickException(f"Company {company_id} not found")
+    try:
+        update_modules(company, {**{m: True for m in enable}, **{m: False for m in disable}})
+    except ValueError as e:
+        raise click.ClickException(str(e))
+    db.session.commit()
+    for module, enabled in module_flags(company).items():
+        click.echo(f"{module}: {'on' if enabled else 'off'}")
+
+@app.cli.command('rebuild-stock-snapshots')
+@click.option('--company-id', type=int, default=None, help='Only rebuild this company; defaults to all.')
+def rebuild_stock_snapshots_command(company_id):
+    """Recompute point-in-time stock snapshots from the movement ledger."""
+    from app.services.stock_snapshots import rebuild_snapshots
+
+    written = rebuild_snapshots(company_id)
+    click.echo(f"Wrote {written} stock snapshots")
+
+@app.cli.command('rebuild-survey-rollups')
+@click.option('--survey-id', type=int, default=None, help='Only rebuild this survey; defaults to all.')
+def rebuild_survey_rollups_command(survey_id):
+    """Recompute survey question stats and answer counts from the raw responses."""
+    from app.services.survey_rollups import recompute_survey_rollups
+
+    read = recompute_survey_rollups(survey_id)
+    click.echo(f"Rebuilt survey rollups from {read} responses")
+
+@app.cli.command('rebuild-search-index')
+@click.option('--company-id', type=int, default=None, help='Only rebuild this company; defaults to all.')
+def rebuild_search_index_command(company_id):
+    """Rebuild the full-text search documents from clients, products, updates and reports."""
+    from app.services.search import reindex
+
+    written = reindex(company_id)
+    click.echo(f"Indexed {written} search documents")
+
+@app.cli.command('recompute-invoice-totals')
+@click.option('--company-id', type=int, default=None, help='Only recompute this company; defaults to all.')
+def recompute_invoice_totals_command(company_id):
+    """Recompute line, tax and invoice totals and repair any that drifted."""
+    from app.services.invoice_totals import recompute_invoices
+
+    changed = recompute_invoices(company_id)
+    click.echo(f"Corrected totals on {changed} invoices")
+
+@app.cli.command('render-invoice-pdfs')
+@click.option('--month', default=None, help='YYYY-MM; defaults to the current month.')
+@click.option('--parallelism', type=int, default=None, help='Concurrent render jobs; defaults to INVOICE_PDF_PARALLELISM.')
+@click.option('--company-id', type=int, default=None, help='Only render this company; defaults to all.')
+def render_invoice_pdfs_command(month, parallelism, company_id):
+    """Queue PDF rendering for every invoice sent in a month."""
+    from app.tasks.invoices import render_month
+
+    year, month = (int(part) for part in month.split('-')) if month else (None, None)
+    queued = render_month(year, month, parallelism, company_id)
+    click.echo(f"Queued {queued} invoices for rendering")
+
+@app.cli.command('bench-login')
+@click.option('--requests', 'total', default=64, help='Password checks per pool size.')
+@click.option('--threads', default=16, help='Concurrent request threads.')
+@click.option('--pool-sizes', default='0,1,2,4', help='Comma separated PASSWORD_HASH_WORKERS values; 0 hashes inline.')
+def bench_login_command(total, threads, pool_sizes):
+    """Measure login password-check throughput at different hashing pool sizes."""
+    import time
+    from concurrent.futures import ThreadPoolExecutor
+    from app.services.passwords import password_hasher
+
+    original = app.config['PASSWORD_HASH_WORKERS']
+    stored = password_hasher.hash('benchmark-password')
+
+    def login():
+        with app.app_context():
+            return password_hasher.check(stored, 'benchmark-password')
+
+    click.echo(f"bcrypt cost {password_hasher.rounds}, {total} logins, {threads} threads")
+    try:
+        for size in [int(s) for s in pool_sizes.split(',')]:
+            app.config['PASSWORD_HASH_WORKERS'] = size
+            login()  # Warm up the pool outside the timed run
+            password_hasher.reset_stats()
+
+            started = time.perf_counter()
+            with ThreadPoolExecutor(max_workers=threads) as pool:
+                assert all(pool.map(lambda _: login(), range(total)))
+            elapsed = time.perf_counter() - started
+
+            stats = password_hasher.stats()
+            click.echo(f"pool={size}: {total / elapsed:.1f} logins/s, avg {stats['avg_latency_ms']} ms, max {stats['max_latency_ms']} ms")
+    finally:
+        app.config['PASSWORD_HASH_WORKERS'] = original
+
+@app.cli.command('stress-booking')
+@click.option('--requests', 'total', default=200, help='Simultaneous bookings fired at one slot.')
+@click.option('--database-url', default=None, help='Database to run against; defaults to a throwaway SQLite file.')
+def stress_booking_command(total, database_url):
+    """Fire concurrent bookings at one slot and check that exactly one succeeds."""
+    import threading
+    from datetime import datetime, timedelta
+    from concurrent.futures import ThreadPoolExecutor
+    from app.extensions import db
+    from app.models import Service
+
+    stress_app = _scratch_app(database_url)
+    with stress_app.app_context():
+        company, staff = _scratch_company('Booking')
+        service = Service(company_id=company.id, name='Stress', duration=30, price=0)
+        db.session.add(service)
+        db.session.commit()
+        payload = {
+            'company_id': company.id,
+            'service_id': service.id,
+            'staff_id': staff.id,
+            'booking_time': (datetime.utcnow() + timedelta(days=1)).replace(microsecond=0).isoformat(),
+            'client_name': 'Stress',
+            'client_email': 'stress@example.com'
+        }
+
+    barrier = threading.Barrier(min(total, 64))
+
+    def book(_):
+        client = stress_app.test_client()
+        try:
+            barrier.wait(timeout=5)
+        except threading.BrokenBarrierError:
+            pass
+        return client.post('/api/v1/bookings/book', json=payload).status_code
+
+    with ThreadPoolExecutor(max_workers=min(total, 64)) as pool:
+        codes = list(pool.map(book, range(total)))
+
+    summary = {code: codes.count(code) for code in sorted(set(codes))}
+    click.echo(f"Responses: {summary}")
+    if summary.get(201) != 1 or summary.get(201) + summary.get(409, 0) != total:
+        click.echo("FAIL: expected exactly one 201 and the rest 409")
+        sys.exit(1)
+    click.echo("OK: exactly one booking succeeded")
+
+@app.cli.command('stress-stock')
+@click.option('--threads', default=32, help='Concurrent writers.')
+@click.option('--updates', default=20, help='Stock updates per writer.')
+@click.option('--database-url', default=None, help='Database to run against; defaults to a throwaway SQLite file.')
+def stress_stock_command(threads, updates, database_url):
+    """Hammer one product with concurrent +1 stock updates and check none are lost."""
+    from decimal import Decimal
+    from concurrent.futures import ThreadPoolExecutor
+    from app.extensions import db
+    from app.models import Product, StockMovement
+    from app.services.stock import apply_stock_changes
+
+    stress_app = _scratch_app(database_url)
+    with stress_app.app_context():
+        company, user = _scratch_company('Stock')
+        product = Product(company_id=company.id, name='Hot SKU', unit_price=1, current_stock=0)
+        db.session.add(product)
+        db.session.commit()
+        company_id, user_id, product_id = company.id, user.id, product.id
+
+    def writer(_):
+        with stress_app.app_context():
+            for _ in range(updates):
+                apply_stock_changes(company_id, user_id, [(product_id, Decimal('1'), 'Stress')])
+
+    with ThreadPoolExecutor(max_workers=threads) as pool:
+        list(pool.map(writer, range(threads)))
+
+    with stress_app.app_context():
+        stock = db.session.get(Product, product_id).current_stock
+        movements = StockMovement.query.filter_by(product_id=product_id).count()
+
+    expected = threads * updates
+    click.echo(f"Expected {expected}, stock {stock}, movements {movements}")
+    if stock != expected or movements != expected:
+        click.echo("FAIL: stock updates were lost")
+        sys.exit(1)
+    click.echo("OK: no updates lost")
+
+@app.cli.command('stress-invoice-numbers')
+@click.option('--threads', default=16, help='Concurrent writers.')
+@click.option('--transactions', default=25, help='Transactions per writer.')
+@click.option('--block', default=3, help='Invoices per transaction, numbered as one block.')
+@click.option('--database-url', default=None, help='Database to run against; defaults to a throwaway SQLite file.')
+def stress_invoice_numbers_command(threads, transactions, block, database_url):
+    """Create invoices from many threads and check numbers are unique and gap-free."""
+    import re
+    from concurrent.futures import ThreadPoolExecutor
+    from app.extensions import db
+    from app.models import Invoice
+
+    stress_app = _scratch_app(database_url)
+    with stress_app.app_context():
+        company, _ = _scratch_company('Numbers')
+        db.session.commit()
+        company_id = company.id
+
+    def writer(worker):
+        committed = 0
+        with stress_app.app_context():
+            for n in range(transactions):
+                # Numbers come from the before_flush allocator in one block per transaction
+                db.session.add_all([Invoice(company_id=company_id, status='draft') for _ in range(block)])
+                db.session.flush()
+                # Every 7th transaction rolls back; its numbers must be reused, not skipped
+                if (worker + n) % 7 == 0:
+                    db.session.rollback()
+                    continue
+                db.session.commit()
+                committed += block
+        return committed
+
+    with ThreadPoolExecutor(max_workers=threads) as pool:
+        expected = sum(pool.map(writer, range(threads)))
+
+    with stress_app.app_context():
+        numbers = [number for (number,) in db.session.query(Invoice.invoice_number).filter_by(company_id=company_id)]
+    values = sorted(int(re.sub(r'\D', '', number)) for number in numbers)
+
+    click.echo(f"Committed {expected} invoices, {len(set(numbers))} distinct numbers, range {values[:1]}..{values[-1:]}")
+    if len(numbers) != expected or len(set(numbers)) != expected:
+        click.echo("FAIL: duplicate or missing invoice numbers")
+        sys.exit(1)
+    if values != list(range(1, expected + 1)):
+        click.echo("FAIL: gaps in the invoice sequence")
+        sys.exit(1)
+    click.echo("OK: numbers are unique and gap-free")
+
+@app.cli.command('bench-invoice-totals')
+@click.option('--invoices', default=5000, help='Invoices to generate.')
+@click.option('--items', default=5, help='Line items per invoice.')
+@click.option('--batch-size', default=1000, help='Invoices per recompute batch.')
+@click.option('--database-url', default=None, help='Database to run against; defaults to a throwaway SQLite file.')
+def bench_invoice_totals_command(invoices, items, batch_size, database_url):
+    """Time the recompute-all-invoices job on generated data."""
+    import random
+    import time
+    from app.extensions import db
+    from app.models import Invoice, InvoiceItem
+    from app.services.invoice_totals import recompute_invoices
+
+    bench_app = _scratch_app(database_url)
+    with bench_app.app_context():
+        company, _ = _scratch_company('Invoices')
+        rng = random.Random(42)
+        # Core inserts skip the flush hooks, so every stored total starts out stale
+        db.session.execute(Invoice.__table__.insert(), [{
+            'company_id': company.id,
+            'invoice_number': f'BENCH-{n:06d}',
+            'status': 'draft',
+            'tax_rate': rng.choice([0, 5, 7.5, 20]),
+            'total_amount': 0,
+            'tax_amount': 0
+        } for n in range(invoices)])
+        first_id = db.session.query(db.func.min(Invoice.id)).scalar()
+        db.session.execute(InvoiceItem.__table__.insert(), [{
+            'invoice_id': first_id + n,
+            'description': 'Line',
+            'quantity': rng.randint(1, 20),
+            'unit_price': f'{rng.randint(1, 99999) / 100:.2f}',
+            'total_price': 0
+        } for n in range(invoices) for _ in range(items)])
+        db.session.commit()
+
+        for label in ('cold (all stale)', 'warm (no changes)'):
+            started = time.perf_counter()
+            changed = recompute_invoices(company.id, batch_size=batch_size)
+            elapsed = time.perf_counter() - started
+            click.echo(f"{label}: {changed} invoices changed in {elapsed:.2f}s ({invoices / elapsed:.0f} invoices/s)")
+
+@app.cli.command('bench-public-reads')
+@click.option('--requests', 'total', default=5000, help='Requests per scenario.')
+@click.option('--services', default=50, help='Services on the benchmark company.')
+@click.option('--database-url', default=None, help='Database to run against; defaults to a throwaway SQLite file.')
+def bench_public_reads_command(total, services, database_url):
+    """Measure GET /bookings/services throughput uncached, cached and revalidated (304)."""
+    import time
+    from app.extensions import db
+    from app.models import Service
+    from app.services.response_cache import response_cache
+
+    bench_app = _scratch_app(database_url)
+    with bench_app.app_context():
+        company, _ = _scratch_company('Widgets')
+        db.session.add_all(Service(company_id=company.id, name=f'Service {n}', duration=30, price=10) for n in range(services))
+        db.session.commit()
+        url = f'/api/v1/bookings/services?company_id={company.id}'
+
+    client = bench_app.test_client()
+    etag = client.get(url).headers['ETag']
+
+    def run(label, headers=None, uncached=False):
+        started = time.perf_counter()
+        for _ in range(total):
+            if uncached:
+                response_cache.clear()
+            status = client.get(url, headers=headers).status_code
+        elapsed = time.perf_counter() - started
+        click.echo(f"{label}: {total / elapsed:.0f} req/s (last status {status})")
+
+    run('uncached', uncached=True)
+    run('cached')
+    run('revalidated', headers={'If-None-Match': etag})
+
+    # A write invalidates the company's cached pages
+    with bench_app.app_context():
+        db.session.add(Service(company_id=company.id, name='New', duration=30, price=10))
+        db.session.commit()
+    changed = client.get(url, headers={'If-None-Match': etag})
+    click.echo(f"after a write: status {changed.status_code}, ETag changed: {changed.headers['ETag'] != etag}")
+
+@app.cli.command('bench-module-gate')
+@click.option('--requests', 'total', default=5000, help='Gated requests per scenario.')
+@click.option('--database-url', default=None, help='Database to run against; defaults to a throwaway SQLite file.')
+def bench_module_gate_command(total, database_url):
+    """Measure the cost of the module gate per request, with the company settings cache warm and cold."""
+    import time
+    from flask_jwt_extended import create_access_token
+    from sqlalchemy import event
+    from app.extensions import db
+    from app.services.company_settings import company_settings
+    from app.utils.security import check_module
+
+    bench_app = _scratch_app(database_url)
+    with bench_app.app_context():
+        company, user = _scratch_company('Gated')
+        db.session.commit()
+        company_id = company.id
+        headers = {'Authorization': 'Bearer ' + create_access_token(identity=str(user.id))}
+
+        for label, cold in (('warm', False), ('cold', True)):
+            started = time.perf_counter()
+            for _ in range(total):
+                if cold:
+                    company_settings.clear()
+                check_module(company_id, 'inventory')
+            elapsed = time.perf_counter() - started
+            click.echo(f"check_module {label}: {elapsed / total * 1e6:.2f} us per check")
+
+        statements = []
+        event.listen(db.engine, 'before_cursor_execute', lambda *args: statements.append(args[2]))
+
+    client = bench_app.test_client()
+    url = '/api/v1/inventory/products'
+    for label, cold in (('warm', False), ('cold', True)):
+        client.get(url, headers=headers)
+        statements.clear()
+        started = time.perf_counter()
+        for _ in range(total):
+            if cold:
+                company_settings.clear()
+            status = client.get(url, headers=headers).status_code
+        elapsed = time.perf_counter() - started
+        click.echo(f"GET {url} {label}: {total / elapsed:.0f} req/s, {len(statements) / total:.2f} queries per request (last status {status})")
+
 if __name__ == '__main__':
     app.run()
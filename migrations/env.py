@@ -51,6 +51,23 @@ def get_metadata():
     return target_db.metadata
 
 
+# Search index objects created with raw DDL in the search documents migration;
+# they have no model, so autogenerate would otherwise try to drop them
+UNMAPPED_SEARCH_OBJECTS = {
+    'search_vector',
+    'ix_search_documents_search_vector',
+}
+
+
+def include_object(object, name, type_, reflected, compare_to):
+    if reflected and compare_to is None:
+        if type_ == 'table' and name.startswith('search_documents_fts'):
+            return False
+        if name in UNMAPPED_SEARCH_OBJECTS:
+            return False
+    return True
+
+
 def run_migrations_offline():
     """Run migrations in 'offline' mode.
 
@@ -65,7 +82,8 @@ def run_migrations_offline():
     """
     url = config.get_main_option("sqlalchemy.url")
     context.configure(
-        url=url, target_metadata=get_metadata(), literal_binds=True
+        url=url, target_metadata=get_metadata(), literal_binds=True,
+        include_object=include_object
     )
 
     with context.begin_transaction():
@@ -93,6 +111,7 @@ def run_migrations_online():
     conf_args = current_app.extensions['migrate'].configure_args
     if conf_args.get("process_revision_directives") is None:
         conf_args["process_revision_directives"] = process_revision_directives
+    conf_args.setdefault("include_object", include_object)
 
     connectable = get_engine()
 
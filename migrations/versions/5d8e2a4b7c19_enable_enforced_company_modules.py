@@ -0,0 +1,34 @@
+"""Enable company modules in use before enforcement
+
+Revision ID: 5d8e2a4b7c19
+Revises: 4f2b7c9d0e16
+Create Date: 2026-10-19 10:12:31.906214
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '5d8e2a4b7c19'
+down_revision = '4f2b7c9d0e16'
+branch_labels = None
+depends_on = None
+
+# Routes for these modules now check the flags, which used to default to off
+MODULES = ('inventory', 'field_reports', 'surveys', 'social_scheduler')
+# Modules that defaulted to on; rows that never had them set were using them too
+DEFAULT_ON = ('client_portal', 'bookings', 'invoicing')
+
+
+def upgrade():
+    companies = sa.table('companies', *(sa.column(module, sa.Boolean) for module in MODULES + DEFAULT_ON))
+    op.execute(companies.update().values(**{module: True for module in MODULES}))
+    for module in DEFAULT_ON:
+        op.execute(companies.update().where(companies.c[module].is_(None)).values(**{module: True}))
+
+
+def downgrade():
+    # Which companies had these flags off before can't be recovered, and
+    # leaving them on keeps the behaviour from before enforcement
+    pass
@@ -0,0 +1,35 @@
+import fakeredis
+import pytest
+import redis
+from app import create_app
+from app.extensions import db
+from app.services.company_settings import company_settings
+
+@pytest.fixture
+def redis_server():
+    """One fake Redis server; every app built against it shares its data, like workers sharing Redis."""
+    return fakeredis.FakeServer()
+
+@pytest.fixture
+def make_app(tmp_path, redis_server):
+    """Builds an app as a separate worker would: own limiter storage and connection pool, shared database."""
+    database_uri = f"sqlite:///{tmp_path / 'test.db'}"
+
+    def make(server=None, **overrides):
+        pool = redis.ConnectionPool(connection_class=fakeredis.FakeConnection, server=server or redis_server)
+        app = create_app('testing', {
+            'SQLALCHEMY_DATABASE_URI': database_uri,
+            # The limiter is shared by every app, so each one sets enabled explicitly
+            'RATELIMIT_ENABLED': True,
+            'RATELIMIT_STORAGE_URI': 'redis://localhost:6379/0',
+            'RATELIMIT_STORAGE_OPTIONS': {'connection_pool': pool},
+            'RATELIMIT_IN_MEMORY_FALLBACK_ENABLED': False,
+            **overrides
+        })
+        with app.app_context():
+            db.create_all()
+        return app
+
+    company_settings.clear()
+    yield make
+    company_settings.clear()
@@ -0,0 +1,68 @@
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime, timedelta
+from app.extensions import db
+from app.models import Booking, Company, Service, User
+from app.services.company_settings import MODULES
+
+def _service(app):
+    with app.app_context():
+        company = Company(name='Salon', slug='salon', status='active', **{m: True for m in MODULES})
+        db.session.add(company)
+        db.session.flush()
+        staff = User(company_id=company.id, email='staff@example.com', password_hash='-', role='staff', status='active')
+        service = Service(company_id=company.id, name='Cut', duration=30, price=0)
+        db.session.add_all([staff, service])
+        db.session.commit()
+        return company.id, service.id, staff.id
+
+def test_concurrent_bookings_for_one_slot_admit_exactly_one(make_app):
+    app = make_app(RATELIMIT_ENABLED=False)
+    company_id, service_id, staff_id = _service(app)
+    payload = {
+        'company_id': company_id,
+        'service_id': service_id,
+        'staff_id': staff_id,
+        'booking_time': (datetime.utcnow() + timedelta(days=1)).replace(microsecond=0).isoformat(),
+        'client_name': 'Guest',
+        'client_email': 'guest@example.com'
+    }
+    total, threads = 200, 32
+    barrier = threading.Barrier(threads)
+
+    def book(n):
+        client = app.test_client()
+        # Release the first wave together so the requests really race
+        if n < threads:
+            barrier.wait(timeout=10)
+        return client.post('/api/v1/bookings/book', json=payload).status_code
+
+    with ThreadPoolExecutor(max_workers=threads) as pool:
+        codes = list(pool.map(book, range(total)))
+
+    assert codes.count(201) == 1
+    assert codes.count(409) == total - 1
+    with app.app_context():
+        assert Booking.query.filter_by(staff_id=staff_id).count() == 1
+
+def test_booking_with_another_companys_staff_is_rejected(make_app):
+    app = make_app(RATELIMIT_ENABLED=False)
+    company_id, service_id, _ = _service(app)
+    with app.app_context():
+        other = Company(name='Other', slug='other', status='active')
+        db.session.add(other)
+        db.session.flush()
+        outsider = User(company_id=other.id, email='outsider@example.com', password_hash='-', role='staff', status='active')
+        db.session.add(outsider)
+        db.session.commit()
+        outsider_id = outsider.id
+
+    response = app.test_client().post('/api/v1/bookings/book', json={
+        'company_id': company_id,
+        'service_id': service_id,
+        'staff_id': outsider_id,
+        'booking_time': (datetime.utcnow() + timedelta(days=1)).replace(microsecond=0).isoformat(),
+        'client_name': 'Guest',
+        'client_email': 'guest@example.com'
+    })
+    assert response.status_code == 404
@@ -0,0 +1,28 @@
+from app.extensions import celery, db
+from app.models import Company, Invoice
+from app.services.dashboard_stats import get_company_stats
+from app.tasks.dashboard import reconcile_stats
+
+def test_periodic_reconcile_repairs_drift(make_app):
+    app = make_app()
+    with app.app_context():
+        company = Company(name='Books', slug='books', status='active')
+        db.session.add(company)
+        db.session.flush()
+        db.session.add_all([Invoice(company_id=company.id, status='sent') for _ in range(3)])
+        db.session.commit()
+        assert get_company_stats(company.id).unpaid_invoices == 3
+
+        # A bulk UPDATE bypasses the ORM events that keep the counters current
+        Invoice.query.filter_by(company_id=company.id).update({'status': 'paid'}, synchronize_session=False)
+        db.session.commit()
+        assert get_company_stats(company.id).unpaid_invoices == 3
+
+        assert reconcile_stats.delay().get() == 1
+        db.session.expire_all()
+        assert get_company_stats(company.id).unpaid_invoices == 0
+
+def test_reconcile_runs_on_the_beat_schedule(make_app):
+    make_app(DASHBOARD_RECONCILE_INTERVAL=120)
+    entry = celery.conf.beat_schedule['dashboard.reconcile-stats']
+    assert entry == {'task': 'dashboard.reconcile_stats', 'schedule': 120}
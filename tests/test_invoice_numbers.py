@@ -0,0 +1,77 @@
+from concurrent.futures import ThreadPoolExecutor
+import pytest
+from sqlalchemy import func
+from sqlalchemy.exc import IntegrityError
+from app.extensions import db
+from app.models import Company, Invoice
+from app.services.invoice_numbers import allocate_invoice_numbers, NUMBER_RE
+
+def _companies(app, count):
+    with app.app_context():
+        companies = [Company(name=f'Biller {n}', slug=f'biller-{n}', status='active') for n in range(count)]
+        db.session.add_all(companies)
+        db.session.commit()
+        return [company.id for company in companies]
+
+def _numbers(company_id):
+    return sorted(int(NUMBER_RE.search(number).group(1)) for (number,) in
+                  db.session.query(Invoice.invoice_number).filter_by(company_id=company_id))
+
+def test_concurrent_allocation_is_unique_and_gap_free(make_app):
+    app = make_app(RATELIMIT_ENABLED=False)
+    company_ids = _companies(app, 2)
+    threads, transactions, block = 12, 15, 3
+
+    def writer(worker):
+        committed = dict.fromkeys(company_ids, 0)
+        with app.app_context():
+            for n in range(transactions):
+                company_id = company_ids[(worker + n) % len(company_ids)]
+                if n % 3 == 0:
+                    # One at a time, numbered by the before_flush allocator
+                    invoices = [Invoice(company_id=company_id, status='draft')]
+                elif n % 3 == 1:
+                    # A block numbered by the allocator in one flush
+                    invoices = [Invoice(company_id=company_id, status='draft') for _ in range(block)]
+                else:
+                    # A block reserved up front, as bulk imports do
+                    invoices = [Invoice(company_id=company_id, status='draft', invoice_number=number)
+                                for number in allocate_invoice_numbers(company_id, block)]
+                db.session.add_all(invoices)
+                db.session.flush()
+                # Rolled-back numbers must be handed out again, not skipped
+                if (worker + n) % 7 == 0:
+                    db.session.rollback()
+                    continue
+                db.session.commit()
+                committed[company_id] += len(invoices)
+        return committed
+
+    with ThreadPoolExecutor(max_workers=threads) as pool:
+        results = list(pool.map(writer, range(threads)))
+
+    with app.app_context():
+        for company_id in company_ids:
+            expected = sum(result[company_id] for result in results)
+            assert _numbers(company_id) == list(range(1, expected + 1))
+
+        # Nothing slipped past the (company_id, invoice_number) unique index
+        duplicates = db.session.query(Invoice.company_id, Invoice.invoice_number) \
+            .group_by(Invoice.company_id, Invoice.invoice_number).having(func.count() > 1).all()
+        assert duplicates == []
+
+        taken = Invoice.query.filter_by(company_id=company_ids[0]).first().invoice_number
+        db.session.add(Invoice(company_id=company_ids[0], status='draft', invoice_number=taken))
+        with pytest.raises(IntegrityError):
+            db.session.commit()
+        db.session.rollback()
+
+def test_counter_continues_after_existing_numbers(make_app):
+    app = make_app(RATELIMIT_ENABLED=False)
+    company_id = _companies(app, 1)[0]
+    with app.app_context():
+        db.session.add(Invoice(company_id=company_id, status='sent', invoice_number='LEGACY-0041'))
+        db.session.commit()
+        db.session.add(Invoice(company_id=company_id, status='draft'))
+        db.session.commit()
+        assert _numbers(company_id) == [41, 42]
@@ -0,0 +1,21 @@
+import os
+import pytest
+from flask_migrate import upgrade
+from app import create_app
+from app.extensions import db
+from app.utils.query_plans import check_query_plans, HOT_QUERIES
+
+MIGRATIONS = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), 'migrations')
+
+@pytest.mark.parametrize('schema', ['models', 'migrations'])
+def test_hot_queries_use_their_indexes(tmp_path, schema):
+    app = create_app('testing', {'SQLALCHEMY_DATABASE_URI': f"sqlite:///{tmp_path / 'plans.db'}"})
+    with app.app_context():
+        # The migrated schema is what production runs, so a migration dropping an index fails here
+        if schema == 'migrations':
+            upgrade(directory=MIGRATIONS)
+        else:
+            db.create_all()
+
+        assert HOT_QUERIES
+        assert check_query_plans() == []
@@ -0,0 +1,85 @@
+from flask_jwt_extended import create_access_token
+from app.extensions import db
+from app.models import Company, User
+from app.services.company_settings import MODULES
+
+TIERS = {'free': '2/minute', 'standard': '4/minute', 'enterprise': '8/minute'}
+
+def _owner(app, email, quota_tier='standard', password='secret'):
+    with app.app_context():
+        company = Company(name=email, slug=email, status='active', quota_tier=quota_tier, **{m: True for m in MODULES})
+        db.session.add(company)
+        db.session.flush()
+        user = User(company_id=company.id, email=email, role='owner', status='active')
+        user.set_password(password)
+        db.session.add(user)
+        db.session.commit()
+        return company.id, {'Authorization': 'Bearer ' + create_access_token(identity=str(user.id))}
+
+def _login(app, email, password, address='10.0.0.1'):
+    return app.test_client().post(
+        '/api/v1/auth/login', json={'email': email, 'password': password},
+        environ_base={'REMOTE_ADDR': address}
+    ).status_code
+
+def _statuses(app, headers, count):
+    client = app.test_client()
+    return [client.get('/api/v1/dashboard/stats', headers=headers).status_code for _ in range(count)]
+
+def test_login_counter_is_shared_between_workers(make_app):
+    first = make_app(RATE_LIMIT_LOGIN='3/minute')
+    _owner(first, 'owner@example.com')
+    assert [_login(first, 'nobody@example.com', 'x') for _ in range(2)] == [401, 401]
+
+    # A second worker on the same Redis continues the same count
+    second = make_app(RATE_LIMIT_LOGIN='3/minute')
+    assert [_login(second, 'nobody@example.com', 'x') for _ in range(2)] == [401, 429]
+
+def test_workers_on_separate_redis_count_separately(make_app):
+    import fakeredis
+
+    first = make_app(RATE_LIMIT_LOGIN='2/minute')
+    assert [_login(first, 'nobody@example.com', 'x') for _ in range(3)] == [401, 401, 429]
+    other = make_app(server=fakeredis.FakeServer(), RATE_LIMIT_LOGIN='2/minute')
+    assert _login(other, 'nobody@example.com', 'x') == 401
+
+def test_failures_from_one_address_do_not_lock_out_another(make_app):
+    app = make_app(RATE_LIMIT_LOGIN_EMAIL='3/minute')
+    _owner(app, 'owner@example.com')
+    attempts = [_login(app, 'owner@example.com', 'wrong', address='203.0.113.9') for _ in range(4)]
+    assert attempts == [401, 401, 401, 429]
+    assert _login(app, 'owner@example.com', 'secret', address='198.51.100.7') == 200
+
+def test_successful_logins_are_not_deducted(make_app):
+    app = make_app(RATE_LIMIT_LOGIN_EMAIL='2/minute')
+    _owner(app, 'owner@example.com')
+    assert [_login(app, 'owner@example.com', 'secret') for _ in range(4)] == [200] * 4
+
+def test_tenant_quota_follows_company_tier(make_app):
+    app = make_app(RATE_LIMIT_TIERS=TIERS)
+    _, free = _owner(app, 'free@example.com', quota_tier='free')
+    _, enterprise = _owner(app, 'big@example.com', quota_tier='enterprise')
+    assert _statuses(app, free, 3) == [200, 200, 429]
+    assert _statuses(app, enterprise, 8) == [200] * 8
+    assert _statuses(app, enterprise, 1) == [429]
+
+def test_unknown_tier_falls_back_to_default(make_app):
+    app = make_app(RATE_LIMIT_TIERS=TIERS)
+    _, headers = _owner(app, 'odd@example.com', quota_tier='legacy')
+    assert _statuses(app, headers, 5) == [200] * 4 + [429]
+
+def test_tier_change_applies_without_waiting_for_a_cache(make_app):
+    app = make_app(RATE_LIMIT_TIERS=TIERS)
+    company_id, headers = _owner(app, 'upgrade@example.com', quota_tier='free')
+    assert _statuses(app, headers, 3) == [200, 200, 429]
+    with app.app_context():
+        db.session.get(Company, company_id).quota_tier = 'enterprise'
+        db.session.commit()
+    assert _statuses(app, headers, 1) == [200]
+
+def test_tenant_quota_is_shared_between_workers(make_app):
+    first = make_app(RATE_LIMIT_TIERS=TIERS)
+    _, headers = _owner(first, 'shared@example.com', quota_tier='free')
+    assert _statuses(first, headers, 1) == [200]
+    second = make_app(RATE_LIMIT_TIERS=TIERS)
+    assert _statuses(second, headers, 2) == [200, 429]
@@ -0,0 +1,66 @@
+from datetime import date, datetime, time, timedelta
+import pytest
+from app.extensions import db
+from app.models import Availability, Booking, Company, Service, User
+from app.services.slots import slot_engine
+
+TOMORROW = date.today() + timedelta(days=1)
+NINE = datetime.combine(TOMORROW, time(9))
+
+@pytest.fixture
+def salon(make_app):
+    """A company open 9-12 every day, with one staff member and a 30 minute service."""
+    app = make_app(SLOT_CACHE_TTL=300)
+    with app.app_context():
+        company = Company(name='Salon', slug='salon', status='active')
+        db.session.add(company)
+        db.session.flush()
+        staff = User(company_id=company.id, email='staff@example.com', password_hash='-', role='staff', status='active')
+        service = Service(company_id=company.id, name='Cut', duration=30, price=0)
+        db.session.add_all([staff, service] + [
+            Availability(company_id=company.id, day_of_week=day, start_time=time(9), end_time=time(12)) for day in range(7)
+        ])
+        db.session.commit()
+        ids = company.id, service.id, staff.id
+    slot_engine.clear()
+    yield (app,) + ids
+    slot_engine.clear()
+
+def _slots(app, company_id, service_id):
+    with app.app_context():
+        return slot_engine.find_slots(company_id, db.session.get(Service, service_id), TOMORROW, TOMORROW)
+
+def test_booking_read_before_commit_is_not_cached_as_free(salon):
+    app, company_id, service_id, staff_id = salon
+    with app.app_context():
+        db.session.add(Booking(company_id=company_id, service_id=service_id, staff_id=staff_id, booking_time=NINE))
+        db.session.flush()
+        # Another request, on its own session, reads before the booking commits
+        assert NINE in _slots(app, company_id, service_id)[staff_id]
+        db.session.commit()
+
+    assert NINE not in _slots(app, company_id, service_id)[staff_id]
+
+def test_service_duration_change_refreshes_busy_intervals(salon):
+    app, company_id, service_id, staff_id = salon
+    with app.app_context():
+        db.session.add(Booking(company_id=company_id, service_id=service_id, staff_id=staff_id, booking_time=NINE))
+        db.session.commit()
+    assert NINE + timedelta(minutes=30) in _slots(app, company_id, service_id)[staff_id]
+
+    with app.app_context():
+        db.session.get(Service, service_id).duration = 60
+        db.session.commit()
+    slots = _slots(app, company_id, service_id)[staff_id]
+    # The 9:00 booking now runs to 10:00, and new 60 minute bookings can't start before it ends
+    assert NINE + timedelta(minutes=30) not in slots
+    assert NINE + timedelta(minutes=60) in slots
+
+def test_deactivated_staff_lose_their_slots(salon):
+    app, company_id, service_id, staff_id = salon
+    assert staff_id in _slots(app, company_id, service_id)
+
+    with app.app_context():
+        db.session.get(User, staff_id).status = 'inactive'
+        db.session.commit()
+    assert staff_id not in _slots(app, company_id, service_id)
@@ -0,0 +1,50 @@
+from datetime import datetime, timedelta
+from flask_jwt_extended import create_access_token
+import pytest
+from app.extensions import db
+from app.models import Company, SocialPlatform, SocialPost, User
+from app.services.company_settings import MODULES
+
+def _owner_with_platform(app):
+    with app.app_context():
+        company = Company(name='Brand', slug='brand', status='active', **{m: True for m in MODULES})
+        db.session.add(company)
+        db.session.flush()
+        user = User(company_id=company.id, email='owner@example.com', password_hash='-', role='owner', status='active')
+        platform = SocialPlatform(company_id=company.id, platform_name='twitter', account_name='@brand')
+        db.session.add_all([user, platform])
+        db.session.commit()
+        return platform.id, {'Authorization': 'Bearer ' + create_access_token(identity=str(user.id))}
+
+def _schedule(app, headers, **fields):
+    payload = {'content': 'Launch day', 'scheduled_for': (datetime.utcnow() + timedelta(hours=1)).isoformat(), **fields}
+    return app.test_client().post('/api/v1/social/posts', headers=headers, json=payload)
+
+def test_schedule_post(make_app):
+    app = make_app()
+    platform_id, headers = _owner_with_platform(app)
+    response = _schedule(app, headers, platform_ids=[platform_id, platform_id])
+    assert response.status_code == 201
+    with app.app_context():
+        post = db.session.get(SocialPost, response.get_json()['id'])
+        assert [target.platform_id for target in post.targets] == [platform_id]
+
+@pytest.mark.parametrize('platform_ids', [None, [], [[1]], [{}], ['1'], [True], 1, 'abc', [999]])
+def test_invalid_platform_ids_are_rejected(make_app, platform_ids):
+    app = make_app()
+    _, headers = _owner_with_platform(app)
+    response = _schedule(app, headers, platform_ids=platform_ids)
+    assert response.status_code == 400
+    assert response.get_json()['message'] == "platform_ids must list this company's platforms"
+
+@pytest.mark.parametrize('content', [None, '', '   ', 42, ['text']])
+def test_missing_content_is_rejected(make_app, content):
+    app = make_app()
+    platform_id, headers = _owner_with_platform(app)
+    fields = {'platform_ids': [platform_id]}
+    if content is not None:
+        fields['content'] = content
+    response = app.test_client().post('/api/v1/social/posts', headers=headers, json={
+        'scheduled_for': (datetime.utcnow() + timedelta(hours=1)).isoformat(), **fields
+    })
+    assert response.status_code == 400
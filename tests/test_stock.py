@@ -0,0 +1,63 @@
+from concurrent.futures import ThreadPoolExecutor
+from decimal import Decimal
+from flask_jwt_extended import create_access_token
+import pytest
+from app.extensions import db
+from app.models import Company, Product, StockMovement, User
+from app.services.company_settings import MODULES
+from app.services.stock import apply_stock_changes
+
+def _product(app):
+    with app.app_context():
+        company = Company(name='Shop', slug='shop', status='active', **{m: True for m in MODULES})
+        db.session.add(company)
+        db.session.flush()
+        user = User(company_id=company.id, email='owner@example.com', password_hash='-', role='owner', status='active')
+        product = Product(company_id=company.id, name='Hot SKU', unit_price=1, current_stock=0)
+        db.session.add_all([user, product])
+        db.session.commit()
+        headers = {'Authorization': 'Bearer ' + create_access_token(identity=str(user.id))}
+        return company.id, user.id, product.id, headers
+
+def test_concurrent_stock_updates_lose_nothing(make_app):
+    app = make_app(RATELIMIT_ENABLED=False)
+    company_id, user_id, product_id = _product(app)[:3]
+    threads, updates = 16, 20
+    # Mixed signs and fractions, so a lost update can't hide behind a coincidence
+    deltas = [[Decimal(worker % 5 - 1) + Decimal('0.25') * (n % 3) for n in range(updates)] for worker in range(threads)]
+
+    def writer(worker):
+        with app.app_context():
+            for delta in deltas[worker]:
+                apply_stock_changes(company_id, user_id, [(product_id, delta, 'Concurrent')])
+
+    with ThreadPoolExecutor(max_workers=threads) as pool:
+        list(pool.map(writer, range(threads)))
+
+    with app.app_context():
+        assert db.session.get(Product, product_id).current_stock == sum(sum(worker) for worker in deltas)
+        assert StockMovement.query.filter_by(product_id=product_id).count() == threads * updates
+
+@pytest.mark.parametrize('prevent_negative', ['false', 0, None, [True]])
+def test_prevent_negative_must_be_a_boolean(make_app, prevent_negative):
+    app = make_app(RATELIMIT_ENABLED=False)
+    _, _, product_id, headers = _product(app)
+    client = app.test_client()
+
+    single = client.post('/api/v1/inventory/stock/update', headers=headers, json={
+        'product_id': product_id, 'change_amount': -1, 'prevent_negative': prevent_negative
+    })
+    bulk = client.post('/api/v1/inventory/stock/bulk-update', headers=headers, json={
+        'movements': [{'product_id': product_id, 'change_amount': -1}], 'prevent_negative': prevent_negative
+    })
+    assert (single.status_code, bulk.status_code) == (400, 400)
+    with app.app_context():
+        assert db.session.get(Product, product_id).current_stock == 0
+
+def test_prevent_negative_true_refuses_overdraw(make_app):
+    app = make_app(RATELIMIT_ENABLED=False)
+    _, _, product_id, headers = _product(app)
+    response = app.test_client().post('/api/v1/inventory/stock/update', headers=headers, json={
+        'product_id': product_id, 'change_amount': -1, 'prevent_negative': True
+    })
+    assert response.status_code == 409